@@ -1,11 +1,26 @@
 from pybullet_industrial.robot_base import *
 from pybullet_industrial.utility import *
+from pybullet_industrial.transforms import *
 from pybullet_industrial.endeffector_tool import *
 from pybullet_industrial.sensors import *
+from pybullet_industrial.event_log import *
 from pybullet_industrial.extruder import *
+from pybullet_industrial.spatial_hash import *
+from pybullet_industrial.particle_store import *
 from pybullet_industrial.material import *
+from pybullet_industrial.paint_texture import *
+from pybullet_industrial.snapshot import *
+from pybullet_industrial.cutter import *
+from pybullet_industrial.workpiece import *
 from pybullet_industrial.raycaster import *
 from pybullet_industrial.remover import *
 from pybullet_industrial.toolpath import *
-from pybullet_industrial.interpolation import circular_interpolation, linear_interpolation, spline_interpolation
+from pybullet_industrial.interpolation import (arc_interpolation, batch_arc_interpolation,
+                                               batch_circular_interpolation,
+                                               batch_helical_interpolation,
+                                               batch_linear_interpolation,
+                                               circular_interpolation, helical_interpolation,
+                                               linear_interpolation, spline_interpolation,
+                                               SplinePath)
 from pybullet_industrial.path_builders import *
+from pybullet_industrial.gcode import *
@@ -0,0 +1,202 @@
+import numpy as np
+
+from pybullet_industrial.transforms import quaternion_to_matrix
+
+
+class Cutter:
+
+    def __init__(self, radius: float, corner_radius: float = 0.0, length: float = None):
+        """A rotationally symmetric milling cutter which can be swept along a path.
+           The tip of the cutter is located at the tool center point
+           and its body extends along the positive z-axis of the tcp frame.
+           A corner radius of 0 describes a flat end mill (cylinder),
+           a corner radius equal to the radius a ball end mill and
+           everything in between a bull-nose end mill.
+
+        Args:
+            radius (float): The radius of the cutter
+            corner_radius (float, optional): The radius of the rounded cutting edge.
+                                             Defaults to 0.0.
+            length (float, optional): The cutting length of the tool measured from the tip.
+                                      Defaults to None in which case the cutter is unbounded.
+
+        Raises:
+            ValueError: If the corner radius is not within [0,radius]
+        """
+        if corner_radius < 0 or corner_radius > radius:
+            raise ValueError("The corner radius needs to be within [0," +
+                             str(radius)+"]")
+        self.radius = radius
+        self.corner_radius = corner_radius
+        self.length = np.inf if length is None else length
+
+    def profile(self, radial_distance: np.array):
+        """Returns the height of the lower cutter surface above the tip.
+
+        Args:
+            radial_distance (np.array): The distances from the tool axis
+
+        Returns:
+            np.array: The heights of the cutter surface.
+                      Distances outside of the cutter radius return infinity.
+        """
+        radial_distance = np.asarray(radial_distance, dtype=float)
+        flat_radius = self.radius-self.corner_radius
+        corner_distance = np.maximum(radial_distance-flat_radius, 0)
+        height = self.corner_radius - \
+            np.sqrt(np.maximum(self.corner_radius**2-corner_distance**2, 0))
+        return np.where(radial_distance <= self.radius, height, np.inf)
+
+    def split_path(self, positions: np.array, tolerance: float = None):
+        """Splits a path of tip positions into short linear segments.
+           Each segment is at most as long as the cutter radius
+           and changes its height by at most the given tolerance.
+
+        Args:
+            positions (np.array(3,n)): Subsequent positions of the cutter tip
+            tolerance (float, optional): The maximum height change per segment.
+                                         Defaults to None in which case
+                                         a tenth of the cutter radius is used.
+
+        Returns:
+            np.array(3,m): The start points of the segments
+            np.array(3,m): The end points of the segments
+        """
+        if tolerance is None:
+            tolerance = 0.1*self.radius
+        positions = np.array(positions, dtype=float).reshape(3, -1)
+        if positions.shape[1] == 1:
+            return positions, positions
+
+        steps = np.diff(positions, axis=1)
+        splits = np.maximum(np.ceil(np.linalg.norm(steps[:2], axis=0)/self.radius),
+                            np.ceil(np.abs(steps[2])/tolerance))
+        splits = np.maximum(splits, 1).astype(int)
+
+        segment_index = np.repeat(np.arange(len(splits)), splits)
+        first_split = np.cumsum(splits)-splits
+        split_index = np.arange(len(segment_index))-first_split[segment_index]
+        fraction = split_index/splits[segment_index]
+        starts = positions[:, segment_index]+fraction*steps[:, segment_index]
+        ends = starts+steps[:, segment_index]/splits[segment_index]
+        return starts, ends
+
+    def lower_envelope(self, start: np.array, end: np.array, x: np.array, y: np.array):
+        """Returns the lower surface of the volume swept by a vertical cutter
+           moving linearly from start to end.
+           The result is exact for moves parallel to the xy-plane and for plunges.
+           Ramps should be split using split_path to bound the error.
+
+        Args:
+            start (np.array(3,m)): The start positions of the cutter tip
+            end (np.array(3,m)): The end positions of the cutter tip
+            x (np.array(m,k)): The x coordinates at which the surface is evaluated
+            y (np.array(m,k)): The y coordinates at which the surface is evaluated
+
+        Returns:
+            np.array(m,k): The z coordinates of the lower surface.
+                           Coordinates outside of the swept volume return infinity.
+        """
+        start = np.array(start, dtype=float).reshape(3, -1)
+        end = np.array(end, dtype=float).reshape(3, -1)
+        step = end-start
+        offset_x = x-start[0, :, None]
+        offset_y = y-start[1, :, None]
+
+        squared_length = step[0]**2+step[1]**2
+        safe_length = np.where(squared_length > 0, squared_length, 1)
+        closest = (offset_x*step[0, :, None]+offset_y*step[1, :, None]) / \
+            safe_length[:, None]
+        closest = np.where(squared_length[:, None] > 0,
+                           np.clip(closest, 0, 1), 0)
+
+        envelope = np.full(np.broadcast(offset_x, offset_y).shape, np.inf)
+        for fraction in (closest, 0.0, 1.0):
+            radial_distance = np.hypot(offset_x-fraction*step[0, :, None],
+                                       offset_y-fraction*step[1, :, None])
+            height = start[2, :, None]+fraction*step[2, :, None]
+            envelope = np.minimum(envelope,
+                                  height+self.profile(radial_distance))
+        return envelope
+
+    def get_aabb(self, positions: np.array, orientation: np.array = None):
+        """Returns the axis aligned bounding box of the volume swept by the cutter along a path.
+
+        Args:
+            positions (np.array(3,m)): Subsequent positions of the cutter tip
+            orientation (np.array, optional): A quaternion describing the tcp orientation.
+                                              Defaults to None in which case
+                                              the cutter points downwards along the z-axis.
+
+        Raises:
+            ValueError: If the cutter length is unbounded
+
+        Returns:
+            np.array: The minimum corner of the bounding box in world coordinates
+            np.array: The maximum corner of the bounding box in world coordinates
+        """
+        if not np.isfinite(self.length):
+            raise ValueError(
+                "The bounding box of a cutter requires a finite length")
+        positions = np.array(positions, dtype=float).reshape(3, -1)
+        corners = np.array([[x, y, z] for x in (-self.radius, self.radius)
+                            for y in (-self.radius, self.radius)
+                            for z in (0, self.length)]).transpose()
+        if orientation is not None:
+            corners = quaternion_to_matrix(orientation)@corners
+        swept_corners = positions[:, :, None]+corners[:, None, :]
+        return swept_corners.min(axis=(1, 2)), swept_corners.max(axis=(1, 2))
+
+    def contains(self, points: np.array, positions: np.array, orientation: np.array = None,
+                 tolerance: float = None):
+        """Checks which points lie inside the volume swept by the cutter along a path.
+           Each segment is only evaluated for the points within its x range
+           and all segment point pairs are processed in vectorized chunks.
+
+        Args:
+            points (np.array(3,n)): The points which should be checked
+            positions (np.array(3,m)): Subsequent positions of the cutter tip
+            orientation (np.array, optional): A quaternion describing the tcp orientation.
+                                              Defaults to None in which case
+                                              the cutter points downwards along the z-axis.
+            tolerance (float, optional): The maximum height change per segment.
+                                         Defaults to None in which case
+                                         a tenth of the cutter radius is used.
+
+        Returns:
+            np.array(n): A boolean array which is true for all points inside the swept volume
+        """
+        points = np.array(points, dtype=float).reshape(3, -1)
+        positions = np.array(positions, dtype=float).reshape(3, -1)
+        if orientation is not None:
+            rot_matrix = quaternion_to_matrix(orientation)
+            points = rot_matrix.T@points
+            positions = rot_matrix.T@positions
+
+        starts, ends = self.split_path(positions, tolerance)
+        tops = np.maximum(starts[2], ends[2])+self.length
+
+        # pair every segment with the points within its x range,
+        # found by a binary search over the points sorted along the x-axis
+        order = np.argsort(points[0])
+        sorted_x = points[0, order]
+        first = np.searchsorted(sorted_x, np.minimum(starts[0], ends[0])-self.radius, 'left')
+        last = np.searchsorted(sorted_x, np.maximum(starts[0], ends[0])+self.radius, 'right')
+        counts = last-first
+        segment_index = np.repeat(np.arange(len(counts)), counts)
+        pair_offset = np.arange(len(segment_index))-(np.cumsum(counts)-counts)[segment_index]
+        point_index = order[first[segment_index]+pair_offset]
+
+        inside = np.zeros(points.shape[1], dtype=bool)
+        chunk_size = 2**18
+        for chunk_start in range(0, len(point_index), chunk_size):
+            chunk = slice(chunk_start, chunk_start+chunk_size)
+            segments = segment_index[chunk]
+            candidates = point_index[chunk]
+            envelope = self.lower_envelope(starts[:, segments], ends[:, segments],
+                                           points[0, candidates, None],
+                                           points[1, candidates, None])[:, 0]
+            heights = points[2, candidates]
+            hit = (heights >= envelope) & (heights <= tops[segments])
+            inside[candidates[hit]] = True
+        return inside
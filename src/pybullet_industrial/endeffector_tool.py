@@ -2,6 +2,7 @@ import numpy as np
 import pybullet as p
 
 from pybullet_industrial import RobotBase
+from pybullet_industrial.transforms import invert_transform, multiply_transforms
 
 
 class EndeffectorTool:
@@ -51,8 +52,10 @@ class EndeffectorTool:
             base_pos = link_state[0]
             base_ori = link_state[1]
 
-        self._tcp_translation, self._tcp_rotation = p.multiplyTransforms(
-            *p.invertTransform(base_pos, base_ori), *self.get_tool_pose(tcp_frame))
+        self._tcp_translation, self._tcp_rotation = multiply_transforms(
+            *invert_transform(base_pos, base_ori), *self.get_tool_pose(tcp_frame))
+        self._tcp_translation_inv, self._tcp_rotation_inv = invert_transform(
+            self._tcp_translation, self._tcp_rotation)
 
         self._coupled_robot = None
         self._coupling_link = None
@@ -172,10 +175,9 @@ class EndeffectorTool:
 
         if self.is_coupled():
 
-            tcp_translation_inv, tcp_rotation_inv = p.invertTransform(
-                self._tcp_translation, self._tcp_rotation)
-            adj_target_position, adj_target_orientation = p.multiplyTransforms(
-                target_position, target_orientation, tcp_translation_inv, tcp_rotation_inv)
+            adj_target_position, adj_target_orientation = multiply_transforms(
+                target_position, target_orientation,
+                self._tcp_translation_inv, self._tcp_rotation_inv)
 
             self._coupled_robot.set_endeffector_pose(
                 adj_target_position, adj_target_orientation, endeffector_name=self._coupling_link)
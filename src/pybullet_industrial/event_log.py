@@ -0,0 +1,141 @@
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+EXTRUSION_EVENT = 0
+REMOVAL_EVENT = 1
+
+EVENT_DTYPE = np.dtype([('time', np.float64),
+                        ('event', np.uint8),
+                        ('tcp position', np.float64, (3,)),
+                        ('tcp orientation', np.float64, (4,)),
+                        ('position', np.float64, (3,)),
+                        ('body id', np.int32),
+                        ('material', 'S16')])
+
+_MAGIC = b'PBIEVLOG'
+
+
+class EventLog:
+
+    def __init__(self, path: str, buffer_size: int = 65536, clock=None):
+        """An append-only binary log of particle events.
+           Events are collected in a structured NumPy buffer
+           which is written to disk whenever it is full.
+           The file starts with a header describing the record layout
+           and can be read back memory mapped using read_event_log.
+
+        Args:
+            path (str): The path of the log file. An existing file is overwritten.
+            buffer_size (int, optional): The number of events buffered
+                                         before they are written. Defaults to 65536.
+            clock (callable, optional): A function returning the current time of an event.
+                                        Defaults to None in which case the wall time
+                                        since the creation of the log is used.
+        """
+        self.path = path
+        self.clock = self._get_elapsed_time if clock is None else clock
+        self._start_time = time.perf_counter()
+        self.number_of_events = 0
+
+        self._buffer = np.zeros(buffer_size, dtype=EVENT_DTYPE)
+        self._buffered_events = 0
+        self._file = open(path, 'wb')
+        header = json.dumps(np.lib.format.dtype_to_descr(EVENT_DTYPE)).encode()
+        self._file.write(_MAGIC+struct.pack('<I', len(header))+header)
+
+    def record(self, event: int, positions: np.array, body_ids: np.array, materials: list,
+               tcp_position: np.array, tcp_orientation: np.array):
+        """Appends events sharing their time and tcp pose to the log.
+
+        Args:
+            event (int): The event type, EXTRUSION_EVENT or REMOVAL_EVENT
+            positions (np.array(n,3)): The positions of the particles
+            body_ids (np.array(n)): The pybullet body ids of the particles
+            materials (list): The material class names of the particles
+            tcp_position (np.array): The position of the tool center point
+            tcp_orientation (np.array): The orientation of the tool center point
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        events = np.zeros(len(positions), dtype=EVENT_DTYPE)
+        events['time'] = self.clock()
+        events['event'] = event
+        events['tcp position'] = tcp_position
+        events['tcp orientation'] = tcp_orientation
+        events['position'] = positions
+        events['body id'] = body_ids
+        events['material'] = materials
+
+        written_events = 0
+        while written_events < len(events):
+            chunk = events[written_events:written_events +
+                           len(self._buffer)-self._buffered_events]
+            self._buffer[self._buffered_events:
+                         self._buffered_events+len(chunk)] = chunk
+            self._buffered_events += len(chunk)
+            written_events += len(chunk)
+            if self._buffered_events == len(self._buffer):
+                self.flush()
+        self.number_of_events += len(events)
+
+    def flush(self):
+        """Writes all buffered events to disk.
+        """
+        self._file.write(self._buffer[:self._buffered_events].tobytes())
+        self._file.flush()
+        self._buffered_events = 0
+
+    def close(self):
+        """Writes all buffered events and closes the log file.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def _get_elapsed_time(self):
+        """Internal function returning the wall time since the creation of the log.
+
+        Returns:
+            float: The elapsed time in seconds
+        """
+        return time.perf_counter()-self._start_time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_event_log(path: str):
+    """Reads an event log as memory mapped structured array.
+       Only the events flushed to disk are returned.
+
+    Args:
+        path (str): The path of the log file
+
+    Raises:
+        ValueError: If the file is not an event log
+
+    Returns:
+        np.memmap: The events with the fields 'time', 'event', 'tcp position',
+                   'tcp orientation', 'position', 'body id' and 'material'
+    """
+    with open(path, 'rb') as log_file:
+        magic = log_file.read(len(_MAGIC))
+        if magic != _MAGIC:
+            raise ValueError("The file "+path+" is not an event log")
+        header_length = struct.unpack('<I', log_file.read(4))[0]
+        descr = json.loads(log_file.read(header_length).decode())
+    dtype = np.lib.format.descr_to_dtype(
+        [tuple(field) if len(field) == 2 else (field[0], field[1], tuple(field[2]))
+         for field in descr])
+    offset = len(_MAGIC)+4+header_length
+    number_of_events = (os.path.getsize(path)-offset)//dtype.itemsize
+    if number_of_events == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset,
+                     shape=(number_of_events,))
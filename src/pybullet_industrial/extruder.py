@@ -2,7 +2,8 @@ from typing import Dict
 
 import numpy as np
 
-from pybullet_industrial.material import Plastic
+from pybullet_industrial.event_log import EXTRUSION_EVENT
+from pybullet_industrial.material import Plastic, freeze_region, particle_registry
 from pybullet_industrial.raycaster import RayCaster
 from pybullet_industrial import RobotBase
 
@@ -25,6 +26,8 @@ class Extruder(RayCaster):
                                        'material properties': {'particle size':0.03,
                                                                'color' : [1, 0, 0, 1]},
                                        'maximum distance':1,'material':Particle,
+                                       'extrusion distance':0,'flow rate':0,'spacing':0,
+                                       'event log':None
             coupled_robot (RobotBase, optional): A pybullet_industrial.RobotBase object if
                                                  the robot is coupled from the start.
                                                  Defaults to None.
@@ -45,23 +48,137 @@ class Extruder(RayCaster):
         self.properties['material'] = Plastic
         self.properties['material properties'] = {
             'particle size': 0.03, 'color': [1, 0, 0, 1]}
+        self.properties['extrusion distance'] = 0
+        self.properties['flow rate'] = 0
+        self.properties['spacing'] = 0
+        self.properties['event log'] = None
+
+        self._last_extrusion_position = None
+        self._travelled_distance = 0
+        self._pending_particles = 0
 
         self.change_properties(extruder_properties)
 
-    def extrude(self, tcp_frame: str = None):
+    def extrude(self, tcp_frame: str = None, time_step: float = None):
         """Extrudes material from the specified tcp_frame.
+           By default material is extruded once per call.
+           If an 'extrusion distance' is set, material is emitted each time the tcp
+           travelled this distance since the last emission.
+           Otherwise, if a 'flow rate' in particles per second is set,
+           material is emitted according to the elapsed simulation time
+           which has to be passed as time_step.
+           The emissions are distributed along the tcp movement since the last call.
+           If a 'spacing' is set, hits closer than this distance to an existing particle
+           of the same material are rejected. The spacing requires a material
+           with a static position since only those are in the spatial index.
+           Use reset_extrusion to move the tool without extruding.
+           If an 'event log' is set, every extruded particle is recorded in it.
 
         Args:
             tcp_frame (str, optional): the name of the link from which to extrude the material.
                                        Defaults to None in which case the default tcp is used
+            time_step (float, optional): the simulation time elapsed since the last call.
+                                         Required if a flow rate is set. Defaults to None.
+
+        Raises:
+            ValueError: If a flow rate is set without a time step or
+                        a spacing is set for a material without a static position
+
+        Returns:
+            list[Particle]: The extruded particles
         """
+        if self.properties['spacing'] > 0 and not self.properties['material'].static_position:
+            raise ValueError("A spacing can only be used for materials with a static position")
         position, orientation = self.get_tool_pose(tcp_frame)
-        ray_cast_results = self.cast_rays(position, orientation)
+        emission_positions = self._get_emission_positions(position, time_step)
+        self._last_extrusion_position = position
 
+        material = self.properties['material']
+        spacing = self.properties['spacing']
         particle_list = []
-        for ray_intersection in ray_cast_results:
-            if ray_intersection[0] != -1:
-                particle = self.properties['material'](ray_intersection,
-                                                       self.properties['material properties'])
+        hit_positions = []
+        for emission_position in emission_positions:
+            ray_cast_results = self.cast_rays(emission_position, orientation)
+            for ray_intersection in ray_cast_results:
+                if ray_intersection[0] == -1:
+                    continue
+                if spacing > 0 and len(particle_registry.query_radius(
+                        ray_intersection[3], spacing, material)):
+                    continue
+                particle = material(ray_intersection,
+                                    self.properties['material properties'])
                 particle_list.append(particle)
+                hit_positions.append(ray_intersection[3])
+
+        event_log = self.properties['event log']
+        if event_log is not None and particle_list:
+            event_log.record(EXTRUSION_EVENT, hit_positions,
+                             [particle.particle_id for particle in particle_list],
+                             [material.__name__]*len(particle_list),
+                             position, orientation)
         return particle_list
+
+    def freeze(self, box_min: np.array, box_max: np.array, max_shapes: int = 1024):
+        """Merges the extruded material inside an axis aligned box into compound bodies.
+           Freezing finished layers keeps the number of bodies in the simulation small.
+
+        Args:
+            box_min (np.array): The minimum corner of the box
+            box_max (np.array): The maximum corner of the box
+            max_shapes (int, optional): The maximum number of particles per compound body.
+                                        Defaults to 1024.
+
+        Returns:
+            list: The ids of the created compound bodies
+        """
+        return freeze_region(box_min, box_max, self.properties['material'], max_shapes)
+
+    def reset_extrusion(self):
+        """Forgets the last extrusion position and any partially accumulated
+           distance or flow so that the next extrusion starts afresh.
+        """
+        self._last_extrusion_position = None
+        self._travelled_distance = 0
+        self._pending_particles = 0
+
+    def _get_emission_positions(self, position: np.array, time_step: float = None):
+        """Internal function determining the positions along the tcp movement
+           at which material is emitted.
+
+        Args:
+            position (np.array): The current tcp position
+            time_step (float, optional): the simulation time elapsed since the last call.
+
+        Raises:
+            ValueError: If a flow rate is set without a time step
+
+        Returns:
+            list: The emission positions
+        """
+        extrusion_distance = self.properties['extrusion distance']
+        flow_rate = self.properties['flow rate']
+        last_position = self._last_extrusion_position
+        if last_position is None or (extrusion_distance <= 0 and flow_rate <= 0):
+            return [position]
+
+        movement = position-last_position
+        movement_length = np.linalg.norm(movement)
+        if extrusion_distance > 0:
+            emission_distances = np.arange(extrusion_distance-self._travelled_distance,
+                                           movement_length+10**-12, extrusion_distance)
+            if len(emission_distances):
+                self._travelled_distance = movement_length-emission_distances[-1]
+            else:
+                self._travelled_distance += movement_length
+            fractions = emission_distances / \
+                movement_length if movement_length > 0 else emission_distances
+        else:
+            if time_step is None:
+                raise ValueError("The elapsed simulation time has to be passed as time_step" +
+                                 " when extruding with a flow rate")
+            self._pending_particles += flow_rate*time_step
+            number_of_particles = int(self._pending_particles)
+            self._pending_particles -= number_of_particles
+            fractions = np.arange(1, number_of_particles+1)/number_of_particles \
+                if number_of_particles else np.zeros(0)
+        return [last_position+fraction*movement for fraction in fractions]
@@ -0,0 +1,333 @@
+import mmap
+import os
+import re
+
+import numpy as np
+
+from pybullet_industrial.toolpath import ToolPath
+
+_COMMENT = re.compile(r'\(.*?\)|;.*')
+_WORD = re.compile(r'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+
+# the modal states of a program tracked across blocks
+_MODAL_STATES = ['motion', 'plane', 'unit', 'distance', 'extrusion distance', 'spindle']
+_COORDINATES = ['X', 'Y', 'Z', 'I', 'J', 'K', 'R', 'E']
+
+# the in-plane axes, the linear axis and the center offset words of the arc planes
+_ARC_PLANES = {17: ((0, 1), 2, ('I', 'J')),
+               18: ((2, 0), 1, ('K', 'I')),
+               19: ((1, 2), 0, ('J', 'K'))}
+
+
+def read_gcode(path: str, chunk_size: int = 10000, arc_resolution: float = 0.001,
+               scale: float = 0.001, orientation: np.array = None,
+               block_size: int = 1 << 20):
+    """Reads a G-code program as a sequence of ToolPath chunks.
+       The file is memory mapped and parsed block by block so that
+       the memory usage does not depend on the program size.
+       Supported are the moves G0 to G3 with arcs given by I, J, K or R
+       in the planes G17 to G19, the units G20 and G21,
+       the distance modes G90 and G91 as well as M82 and M83 for the extrusion axis
+       and G92 to set the current position of the X, Y, Z and extrusion axes.
+       Arcs without an end point describe full circles.
+       A pose is active if its move extrudes material or the spindle is switched on by M3 or M4.
+
+    Args:
+        path (str): The path of the G-code file
+        chunk_size (int, optional): The maximum number of poses per ToolPath chunk.
+                                    Defaults to 10000.
+        arc_resolution (float, optional): The maximum distance between
+                                          two interpolated arc poses. Defaults to 0.001.
+        scale (float, optional): The factor converting millimeters into path units.
+                                 Defaults to 0.001 which results in meters.
+        orientation (np.array, optional): The orientation of all path poses.
+                                          Defaults to None in which case
+                                          the orientation [0,0,0,1] is used.
+        block_size (int, optional): The number of bytes parsed at once.
+                                    Defaults to 1 << 20.
+
+    Yields:
+        ToolPath: The subsequent chunks of the program
+    """
+    if orientation is None:
+        orientation = np.array([0, 0, 0, 1])
+    orientation = np.asarray(orientation, dtype=float)
+
+    state = {'motion': 0, 'plane': 17, 'unit': 1.0, 'distance': 90,
+             'extrusion distance': 82, 'spindle': 5,
+             'position': np.zeros(3), 'offset': np.zeros(3), 'extrusion': 0.0}
+    pending_positions = np.zeros((3, 0))
+    pending_activations = np.zeros(0, dtype=bool)
+
+    for text in _read_blocks(path, block_size):
+        positions, activations = _parse_block(text, state, arc_resolution/scale)
+        pending_positions = np.concatenate([pending_positions, positions*scale], axis=1)
+        pending_activations = np.concatenate([pending_activations, activations])
+        while len(pending_activations) >= chunk_size:
+            yield _build_chunk(pending_positions[:, :chunk_size],
+                               pending_activations[:chunk_size], orientation)
+            pending_positions = pending_positions[:, chunk_size:]
+            pending_activations = pending_activations[chunk_size:]
+    if len(pending_activations) > 0:
+        yield _build_chunk(pending_positions, pending_activations, orientation)
+
+
+def _read_blocks(path: str, block_size: int):
+    """Internal function splitting a memory mapped file into blocks of whole lines.
+
+    Args:
+        path (str): The path of the file
+        block_size (int): The minimal number of bytes per block
+
+    Yields:
+        str: The upper case text of the subsequent blocks
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as gcode_file, \
+            mmap.mmap(gcode_file.fileno(), 0, access=mmap.ACCESS_READ) as memory_map:
+        start = 0
+        while start < len(memory_map):
+            end = memory_map.find(b'\n', min(start+block_size, len(memory_map)))
+            end = len(memory_map) if end == -1 else end+1
+            yield memory_map[start:end].decode('ascii', errors='ignore').upper()
+            start = end
+
+
+def _parse_block(text: str, state: dict, arc_resolution: float):
+    """Internal function converting a block of G-code lines into path poses.
+       The words of all lines are collected into arrays first
+       after which the modal states and moves are evaluated vectorized.
+       Positions are tracked in program coordinates, the offsets set by G92
+       are added to obtain the returned machine positions.
+
+    Args:
+        text (str): The G-code lines
+        state (dict): The modal state at the start of the block which is updated
+        arc_resolution (float): The maximum distance between two arc poses in millimeters
+
+    Returns:
+        np.array(3,n): The positions of the poses in millimeters
+        np.array(n): The tool activations of the poses
+    """
+    lines = text.splitlines()
+    if not lines:
+        return np.zeros((3, 0)), np.zeros(0, dtype=bool)
+    words = {name: np.full(len(lines), np.nan)
+             for name in _MODAL_STATES+_COORDINATES}
+    reset = np.zeros(len(lines), dtype=bool)
+    for i, line in enumerate(lines):
+        for letter, value in _WORD.findall(_COMMENT.sub('', line)):
+            value = float(value)
+            if letter == 'G':
+                if value in (0, 1, 2, 3):
+                    words['motion'][i] = value
+                elif value in (17, 18, 19):
+                    words['plane'][i] = value
+                elif value in (20, 21):
+                    words['unit'][i] = 25.4 if value == 20 else 1.0
+                elif value in (90, 91):
+                    words['distance'][i] = value
+                elif value == 92:
+                    reset[i] = True
+            elif letter == 'M':
+                if value in (3, 4, 5):
+                    words['spindle'][i] = value
+                elif value in (82, 83):
+                    words['extrusion distance'][i] = value
+            elif letter in words:
+                words[letter][i] = value
+
+    modal = {name: _forward_fill(words[name], state[name]) for name in _MODAL_STATES}
+    for name in _COORDINATES:
+        if name != 'E':
+            words[name] = words[name]*modal['unit']
+
+    relative = modal['distance'] == 91
+    centered_arc = (modal['motion'] >= 2) & \
+        np.any([~np.isnan(words[axis]) for axis in 'IJK'], axis=0)
+    move = ~reset & (np.any([~np.isnan(words[axis]) for axis in 'XYZ'], axis=0) |
+                     centered_arc)
+    program_positions = np.zeros((3, len(lines)))
+    offsets = np.zeros((3, len(lines)))
+    for i, axis in enumerate('XYZ'):
+        given = (move | reset) & ~np.isnan(words[axis])
+        program_positions[i] = _accumulate(words[axis], given & (reset | ~relative),
+                                           given & ~reset & relative, state['position'][i])
+        # G92 shifts the program coordinates so that the machine does not move
+        previous_positions = np.concatenate([[state['position'][i]],
+                                             program_positions[i, :-1]])
+        offsets[i] = state['offset'][i]+np.cumsum(
+            np.where(given & reset, previous_positions-program_positions[i], 0))
+    end_positions = program_positions+offsets
+    start_positions = np.concatenate(
+        [(state['position']+state['offset'])[:, None], end_positions[:, :-1]], axis=1)
+
+    given_extrusion = ~np.isnan(words['E'])
+    relative_extrusion = modal['extrusion distance'] == 83
+    extrusion = _accumulate(words['E'], given_extrusion & (reset | ~relative_extrusion),
+                            given_extrusion & ~reset & relative_extrusion,
+                            state['extrusion'])
+    extruded = np.diff(extrusion, prepend=state['extrusion']) > 0
+    activations = (extruded & ~reset) | (modal['spindle'] != 5)
+
+    for name in _MODAL_STATES:
+        state[name] = modal[name][-1]
+    state['position'] = program_positions[:, -1].copy()
+    state['offset'] = offsets[:, -1].copy()
+    state['extrusion'] = extrusion[-1]
+
+    moves = np.flatnonzero(move)
+    positions, move_index = _expand_moves(
+        start_positions[:, moves], end_positions[:, moves],
+        {name: words[name][moves] for name in ['I', 'J', 'K', 'R']},
+        modal['motion'][moves], modal['plane'][moves], arc_resolution)
+    return positions, activations[moves][move_index]
+
+
+def _forward_fill(values: np.array, initial_value: float):
+    """Internal function replacing missing values by the last given value.
+
+    Args:
+        values (np.array): The values with NaN marking missing entries
+        initial_value (float): The value used before the first given value
+
+    Returns:
+        np.array: The filled values
+    """
+    last_given = np.maximum.accumulate(
+        np.where(np.isnan(values), -1, np.arange(len(values))))
+    return np.where(last_given >= 0, values[np.maximum(last_given, 0)], initial_value)
+
+
+def _accumulate(values: np.array, absolute: np.array, relative: np.array,
+                initial_value: float):
+    """Internal function evaluating an axis which mixes absolute and relative values.
+       Each value equals the last absolute value plus all following relative values.
+
+    Args:
+        values (np.array): The given values
+        absolute (np.array): A mask of the values setting the axis
+        relative (np.array): A mask of the values moving the axis
+        initial_value (float): The axis value before the first entry
+
+    Returns:
+        np.array: The axis values after each entry
+    """
+    increments = np.cumsum(np.where(relative, values, 0))
+    last_absolute = np.maximum.accumulate(
+        np.where(absolute, np.arange(len(values)), -1))
+    safe_index = np.maximum(last_absolute, 0)
+    return np.where(last_absolute >= 0,
+                    values[safe_index]+increments-increments[safe_index],
+                    initial_value+increments)
+
+
+def _expand_moves(start_positions: np.array, end_positions: np.array, arc_words: dict,
+                  motions: np.array, planes: np.array, arc_resolution: float):
+    """Internal function interpolating moves into path poses.
+       Linear moves result in their end pose while arcs are sampled vectorized.
+
+    Args:
+        start_positions (np.array(3,n)): The start positions of the moves
+        end_positions (np.array(3,n)): The end positions of the moves
+        arc_words (dict): The I, J, K and R words of the moves
+        motions (np.array(n)): The motion modes of the moves
+        planes (np.array(n)): The arc planes of the moves
+        arc_resolution (float): The maximum distance between two arc poses
+
+    Raises:
+        ValueError: If an arc radius is too small to connect its start and end point
+
+    Returns:
+        np.array(3,m): The positions of the poses
+        np.array(m): The index of the move of each pose
+    """
+    arcs = np.flatnonzero(motions >= 2)
+    if len(arcs) == 0:
+        return end_positions, np.arange(len(motions))
+
+    centers = np.zeros((2, len(arcs)))
+    radii = np.zeros(len(arcs))
+    sweeps = np.zeros(len(arcs))
+    start_angles = np.zeros(len(arcs))
+    for plane, (plane_axes, _, offset_words) in _ARC_PLANES.items():
+        in_plane = planes[arcs] == plane
+        plane_arcs = arcs[in_plane]
+        start = start_positions[plane_axes, :][:, plane_arcs]
+        end = end_positions[plane_axes, :][:, plane_arcs]
+        clockwise = motions[plane_arcs] == 2
+
+        radius_words = arc_words['R'][plane_arcs]
+        center = start+np.nan_to_num([arc_words[offset_words[0]][plane_arcs],
+                                      arc_words[offset_words[1]][plane_arcs]])
+        radius_arcs = ~np.isnan(radius_words)
+        if np.any(radius_arcs):
+            chord = end[:, radius_arcs]-start[:, radius_arcs]
+            chord_length = np.linalg.norm(chord, axis=0)
+            radius = np.abs(radius_words[radius_arcs])
+            if np.any(radius < chord_length/2-1e-9):
+                raise ValueError("An arc radius is too small for the distance " +
+                                 "between its start and end point")
+            height = np.sqrt(np.maximum(radius**2-chord_length**2/4, 0))
+            side = np.where(clockwise[radius_arcs], -1, 1)*np.sign(radius_words[radius_arcs])
+            left = np.array([-chord[1], chord[0]])/np.maximum(chord_length, 1e-12)
+            center[:, radius_arcs] = start[:, radius_arcs]+chord/2+side*height*left
+
+        start_angle = np.arctan2(start[1]-center[1], start[0]-center[0])
+        end_angle = np.arctan2(end[1]-center[1], end[0]-center[0])
+        sweep = np.where(clockwise, -np.mod(start_angle-end_angle, 2*np.pi),
+                         np.mod(end_angle-start_angle, 2*np.pi))
+        full_circle = np.isclose(sweep, 0) & ~radius_arcs
+        sweep = np.where(full_circle, np.where(clockwise, -2*np.pi, 2*np.pi), sweep)
+
+        centers[:, in_plane] = center
+        radii[in_plane] = np.linalg.norm(start-center, axis=0)
+        sweeps[in_plane] = sweep
+        start_angles[in_plane] = start_angle
+
+    samples = np.ones(len(motions), dtype=int)
+    samples[arcs] = np.maximum(
+        np.ceil(np.abs(sweeps)*radii/arc_resolution), 1).astype(int)
+    move_index = np.repeat(np.arange(len(motions)), samples)
+    offsets = np.cumsum(samples)-samples
+    fractions = (np.arange(len(move_index))-offsets[move_index]+1)/samples[move_index]
+    positions = end_positions[:, move_index].copy()
+
+    arc_index = np.full(len(motions), -1)
+    arc_index[arcs] = np.arange(len(arcs))
+    arc_poses = np.flatnonzero(arc_index[move_index] >= 0)
+    pose_arcs = arc_index[move_index[arc_poses]]
+    pose_moves = move_index[arc_poses]
+    fraction = fractions[arc_poses]
+    start = start_positions[:, pose_moves]
+    end = end_positions[:, pose_moves]
+    angles = start_angles[pose_arcs]+fraction*sweeps[pose_arcs]
+    for plane, (plane_axes, linear_axis, _) in _ARC_PLANES.items():
+        in_plane = planes[pose_moves] == plane
+        center = centers[:, pose_arcs[in_plane]]
+        start_radius = radii[pose_arcs[in_plane]]
+        end_radius = np.linalg.norm(end[plane_axes, :][:, in_plane]-center, axis=0)
+        # the radius is blended towards the end point to absorb rounding in the program
+        radius = start_radius+fraction[in_plane]*(end_radius-start_radius)
+        poses = arc_poses[in_plane]
+        positions[plane_axes[0], poses] = center[0]+radius*np.cos(angles[in_plane])
+        positions[plane_axes[1], poses] = center[1]+radius*np.sin(angles[in_plane])
+        positions[linear_axis, poses] = start[linear_axis, in_plane]+fraction[in_plane] * \
+            (end[linear_axis, in_plane]-start[linear_axis, in_plane])
+    return positions, move_index
+
+
+def _build_chunk(positions: np.array, activations: np.array, orientation: np.array):
+    """Internal function building a ToolPath chunk with a constant orientation.
+
+    Args:
+        positions (np.array(3,n)): The positions of the poses
+        activations (np.array(n)): The tool activations of the poses
+        orientation (np.array): The orientation of all poses
+
+    Returns:
+        ToolPath: The ToolPath chunk
+    """
+    orientations = np.repeat(orientation[:, None], len(activations), axis=1)
+    return ToolPath(positions.copy(), orientations, activations.copy())
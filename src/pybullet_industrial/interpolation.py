@@ -2,6 +2,7 @@ import numpy as np
 import scipy.interpolate as sci
 
 from pybullet_industrial.toolpath import ToolPath
+from pybullet_industrial.transforms import quaternion_slerp
 
 
 def build_circular_path(center: np.array, radius: float,
@@ -21,66 +22,72 @@ def build_circular_path(center: np.array, radius: float,
         np.array: array of 2 dimensional path points
     """
 
-    circular_path = np.zeros((2, step_num))
-    for j in range(step_num):
-        if clockwise:
-            path_angle = min_angle-j*(max_angle-min_angle)/step_num
-        else:
-            path_angle = min_angle+j*(max_angle-min_angle)/step_num
-        new_position = center + radius * \
-            np.array([np.cos(path_angle), np.sin(path_angle)])
-        circular_path[:, j] = new_position
-    return circular_path
+    direction = -1 if clockwise else 1
+    path_angles = min_angle+direction*np.arange(step_num)*(max_angle-min_angle)/step_num
+    return np.asarray(center)[:, None] + \
+        radius*np.array([np.cos(path_angles), np.sin(path_angles)])
 
 
-def linear_interpolation(start_point: np.array, end_point: np.array, samples: int):
+def linear_interpolation(start_point: np.array, end_point: np.array, samples: int,
+                         start_orientation: np.array = None, end_orientation: np.array = None):
     """Performs a linear interpolation betwenn two points in 3D space
 
     Args:
         start_point (np.array): The start point of the interpolation
         end_point (np.array): The end point of the interpolation
         samples (int): The number of samples used to interpolate
+        start_orientation (np.array, optional): The orientation at the start point.
+                                                Defaults to None in which case
+                                                the end orientation is used.
+        end_orientation (np.array, optional): The orientation at the end point.
+                                              Defaults to None in which case
+                                              the start orientation is used.
 
     Returns:
         ToolPath: A ToolPath object of the interpolated path
     """
-    final_path = np.linspace(start_point, end_point, num=samples)
-    return ToolPath(final_path.transpose())
+    return batch_linear_interpolation(np.asarray(start_point)[:, None],
+                                      np.asarray(end_point)[:, None], samples,
+                                      start_orientation, end_orientation)
 
 
-def planar_circular_interpolation(start_point: np.array, end_point: np.array,
-                                  radius: float, samples: int, clockwise: bool = True):
-    connecting_line = end_point-start_point
-    distance_between_points = np.linalg.norm(connecting_line)
-    if radius <= distance_between_points/2:
-        raise ValueError("The radius needs to be at least " +
-                         str(distance_between_points/2))
-
-    center_distance_from_connecting_line = np.sqrt(
-        radius**2-distance_between_points**2/4)
-
-    if clockwise:
-        orthogonal_vector = np.array(
-            [connecting_line[1], -1*connecting_line[0]])
-    else:
-        orthogonal_vector = np.array(
-            [-1*connecting_line[1], connecting_line[0]])
+def batch_linear_interpolation(start_points: np.array, end_points: np.array,
+                               samples: np.array, start_orientations: np.array = None,
+                               end_orientations: np.array = None):
+    """Performs linear interpolations of many segments at once
+       and joins them into a single path.
 
-    circle_center = start_point+connecting_line/2+center_distance_from_connecting_line * \
-        orthogonal_vector/np.linalg.norm(orthogonal_vector)
-
-    angle_range = np.arccos(center_distance_from_connecting_line/radius)*2
-    initial_angle = np.arctan2(
-        start_point[1]-circle_center[1], start_point[0]-circle_center[0])
+    Args:
+        start_points (np.array(3,m)): The start points of the segments
+        end_points (np.array(3,m)): The end points of the segments
+        samples (np.array(m)): The number of samples of each segment or a single number
+        start_orientations (np.array(4,m), optional): The orientations at the start points
+                                                      or a single orientation.
+                                                      Defaults to None in which case
+                                                      the end orientations are used.
+        end_orientations (np.array(4,m), optional): The orientations at the end points
+                                                    or a single orientation.
+                                                    Defaults to None in which case
+                                                    the start orientations are used.
 
-    planar_path = build_circular_path(
-        circle_center, radius, initial_angle, initial_angle+angle_range, samples, clockwise)
-    return planar_path
+    Returns:
+        ToolPath: A ToolPath object of the joined segments
+    """
+    start_points = np.asarray(start_points, dtype=float)
+    end_points = np.asarray(end_points, dtype=float)
+    number_of_segments = len(start_points[0])
+    segment_index, _, fractions = _expand_segments(samples, number_of_segments)
+    path = start_points[:, segment_index] + \
+        fractions*(end_points[:, segment_index]-start_points[:, segment_index])
+    return ToolPath(path, _interpolate_orientations(start_orientations, end_orientations,
+                                                    number_of_segments, segment_index,
+                                                    fractions))
 
 
 def circular_interpolation(start_point: np.array, end_point: np.array,
-                           radius: float, samples: int, axis: int = 2, clockwise: bool = True):
-    """AI is creating summary for circular_interpolation
+                           radius: float, samples: int, axis: int = 2, clockwise: bool = True,
+                           start_orientation: np.array = None, end_orientation: np.array = None):
+    """Performs a circular interpolation between two points around a coordinate axis
 
     Args:
         start_point (np.array): The start point of the interpolation
@@ -90,49 +97,459 @@ def circular_interpolation(start_point: np.array, end_point: np.array,
         axis (int, optional): The axis around which the circle is interpolated.
                               Defaults to 2 which corresponds to the z-axis (0=x,1=y).
         clockwise (bool, optional): The direction of circular travel. Defaults to True.
+        start_orientation (np.array, optional): The orientation at the start point.
+                                                Defaults to None in which case
+                                                the end orientation is used.
+        end_orientation (np.array, optional): The orientation at the end point.
+                                              Defaults to None in which case
+                                              the start orientation is used.
+
+    Returns:
+        ToolPath: A ToolPath object of the interpolated path
+    """
+
+    return batch_circular_interpolation(np.asarray(start_point)[:, None],
+                                        np.asarray(end_point)[:, None], radius, samples,
+                                        axis, clockwise, start_orientation, end_orientation)
+
+
+def batch_circular_interpolation(start_points: np.array, end_points: np.array,
+                                 radii: np.array, samples: np.array, axes: np.array = 2,
+                                 clockwise: np.array = True,
+                                 start_orientations: np.array = None,
+                                 end_orientations: np.array = None):
+    """Performs circular interpolations of many segments at once
+       and joins them into a single path.
+       Each segment is interpolated like in circular_interpolation.
+
+    Args:
+        start_points (np.array(3,m)): The start points of the segments
+        end_points (np.array(3,m)): The end points of the segments
+        radii (np.array(m)): The radii of the circles or a single radius
+        samples (np.array(m)): The number of samples of each segment or a single number
+        axes (np.array(m), optional): The axes around which the circles are interpolated
+                                      or a single axis. Defaults to 2.
+        clockwise (np.array(m), optional): The directions of circular travel
+                                           or a single direction. Defaults to True.
+        start_orientations (np.array(4,m), optional): The orientations at the start points
+                                                      or a single orientation.
+                                                      Defaults to None in which case
+                                                      the end orientations are used.
+        end_orientations (np.array(4,m), optional): The orientations at the end points
+                                                    or a single orientation.
+                                                    Defaults to None in which case
+                                                    the start orientations are used.
+
+    Raises:
+        ValueError: If a radius is too small to connect its start and end point
+
+    Returns:
+        ToolPath: A ToolPath object of the joined segments
+    """
+    start_points = np.asarray(start_points, dtype=float)
+    end_points = np.asarray(end_points, dtype=float)
+    number_of_segments = len(start_points[0])
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), number_of_segments)
+    axes = np.broadcast_to(np.asarray(axes, dtype=int), number_of_segments)
+    clockwise = np.broadcast_to(np.asarray(clockwise, dtype=bool), number_of_segments)
+
+    plane_axes = np.array([[1, 2], [0, 2], [0, 1]])[axes].T
+    segments = np.arange(number_of_segments)
+    planar_start_points = start_points[plane_axes, segments]
+    connecting_lines = end_points[plane_axes, segments]-planar_start_points
+    distances_between_points = np.linalg.norm(connecting_lines, axis=0)
+    too_small = radii <= distances_between_points/2
+    if np.any(too_small):
+        raise ValueError("The radius needs to be at least " +
+                         str(distances_between_points[too_small][0]/2))
+
+    center_distances_from_connecting_lines = np.sqrt(
+        radii**2-distances_between_points**2/4)
+    direction = np.where(clockwise, 1, -1)
+    orthogonal_vectors = direction * \
+        np.array([connecting_lines[1], -1*connecting_lines[0]])
+    circle_centers = planar_start_points+connecting_lines/2 + \
+        center_distances_from_connecting_lines*orthogonal_vectors / \
+        np.linalg.norm(orthogonal_vectors, axis=0)
+    angle_ranges = np.arccos(center_distances_from_connecting_lines/radii)*2
+    initial_angles = np.arctan2(planar_start_points[1]-circle_centers[1],
+                                planar_start_points[0]-circle_centers[0])
+
+    segment_index, sample_number, fractions = _expand_segments(samples, number_of_segments)
+    samples = np.broadcast_to(np.asarray(samples), number_of_segments)
+    # like build_circular_path the angles advance by the angle range divided by the samples
+    path_angles = initial_angles[segment_index]-direction[segment_index] * \
+        sample_number*angle_ranges[segment_index]/samples[segment_index]
+
+    poses = np.arange(len(segment_index))
+    path = np.zeros((3, len(segment_index)))
+    path[plane_axes[0, segment_index], poses] = circle_centers[0, segment_index] + \
+        radii[segment_index]*np.cos(path_angles)
+    path[plane_axes[1, segment_index], poses] = circle_centers[1, segment_index] + \
+        radii[segment_index]*np.sin(path_angles)
+    path[axes[segment_index], poses] = start_points[axes, segments][segment_index] + \
+        fractions*(end_points[axes, segments]-start_points[axes, segments])[segment_index]
+    return ToolPath(path, _interpolate_orientations(start_orientations, end_orientations,
+                                                    number_of_segments, segment_index,
+                                                    fractions))
+
+
+def arc_interpolation(start_point: np.array, intermediate_point: np.array,
+                      end_point: np.array, samples: int, start_orientation: np.array = None,
+                      end_orientation: np.array = None):
+    """Performs a circular interpolation through three points in an arbitrary plane
+
+    Args:
+        start_point (np.array): The start point of the interpolation
+        intermediate_point (np.array): A point on the arc between the start and end point
+        end_point (np.array): The end point of the interpolation
+        samples (int): The number of samples used to interpolate
+        start_orientation (np.array, optional): The orientation at the start point.
+                                                Defaults to None in which case
+                                                the end orientation is used.
+        end_orientation (np.array, optional): The orientation at the end point.
+                                              Defaults to None in which case
+                                              the start orientation is used.
+
+    Returns:
+        ToolPath: A ToolPath object of the interpolated path
+    """
+    return batch_arc_interpolation(np.asarray(start_point)[:, None],
+                                   np.asarray(intermediate_point)[:, None],
+                                   np.asarray(end_point)[:, None], samples,
+                                   start_orientation, end_orientation)
+
+
+def batch_arc_interpolation(start_points: np.array, intermediate_points: np.array,
+                            end_points: np.array, samples: np.array,
+                            start_orientations: np.array = None,
+                            end_orientations: np.array = None):
+    """Performs circular interpolations through three points of many arcs at once
+       and joins them into a single path.
+
+    Args:
+        start_points (np.array(3,m)): The start points of the arcs
+        intermediate_points (np.array(3,m)): Points on the arcs between their start and end
+        end_points (np.array(3,m)): The end points of the arcs
+        samples (np.array(m)): The number of samples of each arc or a single number
+        start_orientations (np.array(4,m), optional): The orientations at the start points
+                                                      or a single orientation.
+                                                      Defaults to None in which case
+                                                      the end orientations are used.
+        end_orientations (np.array(4,m), optional): The orientations at the end points
+                                                    or a single orientation.
+                                                    Defaults to None in which case
+                                                    the start orientations are used.
+
+    Raises:
+        ValueError: If the three points of an arc are collinear
+
+    Returns:
+        ToolPath: A ToolPath object of the joined arcs
+    """
+    start_points = np.asarray(start_points, dtype=float)
+    to_intermediate = np.asarray(intermediate_points, dtype=float)-start_points
+    to_end = np.asarray(end_points, dtype=float)-start_points
+    normals = np.cross(to_intermediate, to_end, axis=0)
+    squared_normal_lengths = np.sum(normals**2, axis=0)
+    if np.any(squared_normal_lengths <= 1e-12*np.sum(to_intermediate**2, axis=0) *
+              np.sum(to_end**2, axis=0)):
+        raise ValueError("The points of an arc can not be collinear")
+
+    centers = start_points+(np.sum(to_intermediate**2, axis=0) *
+                            np.cross(to_end, normals, axis=0) +
+                            np.sum(to_end**2, axis=0) *
+                            np.cross(normals, to_intermediate, axis=0)) / \
+        (2*squared_normal_lengths)
+    normals = normals/np.sqrt(squared_normal_lengths)
+    # the normal orients the arc counterclockwise from the start over the intermediate point
+    start_radii = start_points-centers
+    end_radii = start_points+to_end-centers
+    angles = np.arctan2(np.sum(normals*np.cross(start_radii, end_radii, axis=0), axis=0),
+                        np.sum(start_radii*end_radii, axis=0))
+    angles = np.mod(angles, 2*np.pi)
+    return batch_helical_interpolation(start_points, centers, normals, angles, samples,
+                                       0, start_orientations, end_orientations)
+
+
+def helical_interpolation(start_point: np.array, center: np.array, normal: np.array,
+                          angle: float, samples: int, pitch: float = 0,
+                          start_orientation: np.array = None,
+                          end_orientation: np.array = None):
+    """Performs a circular or helical interpolation around an arbitrary axis
+
+    Args:
+        start_point (np.array): The start point of the interpolation
+        center (np.array): A point on the axis of the circle
+        normal (np.array): The direction of the axis
+        angle (float): The angle of travel in radians which is counterclockwise
+                       around the normal if positive. Can exceed a full turn.
+        samples (int): The number of samples used to interpolate
+        pitch (float, optional): The advance along the normal per full turn. Defaults to 0.
+        start_orientation (np.array, optional): The orientation at the start point.
+                                                Defaults to None in which case
+                                                the end orientation is used.
+        end_orientation (np.array, optional): The orientation at the end point.
+                                              Defaults to None in which case
+                                              the start orientation is used.
 
     Returns:
         ToolPath: A ToolPath object of the interpolated path
     """
+    return batch_helical_interpolation(np.asarray(start_point)[:, None],
+                                       np.asarray(center)[:, None],
+                                       np.asarray(normal)[:, None], angle, samples, pitch,
+                                       start_orientation, end_orientation)
+
 
-    all_axis = [0, 1, 2]
-    all_axis.remove(axis)
-    planar_start_point = np.array(
-        [start_point[all_axis[0]], start_point[all_axis[1]]])
-    planar_end_point = np.array(
-        [end_point[all_axis[0]], end_point[all_axis[1]]])
+def batch_helical_interpolation(start_points: np.array, centers: np.array,
+                                normals: np.array, angles: np.array, samples: np.array,
+                                pitches: np.array = 0, start_orientations: np.array = None,
+                                end_orientations: np.array = None):
+    """Performs circular or helical interpolations of many arcs at once
+       and joins them into a single path.
 
-    planar_path = planar_circular_interpolation(
-        planar_start_point, planar_end_point, radius, samples, clockwise)
+    Args:
+        start_points (np.array(3,m)): The start points of the arcs
+        centers (np.array(3,m)): Points on the axes of the arcs
+        normals (np.array(3,m)): The directions of the axes
+        angles (np.array(m)): The angles of travel in radians which are counterclockwise
+                              around the normals if positive or a single angle
+        samples (np.array(m)): The number of samples of each arc or a single number
+        pitches (np.array(m), optional): The advances along the normals per full turn
+                                         or a single pitch. Defaults to 0.
+        start_orientations (np.array(4,m), optional): The orientations at the start points
+                                                      or a single orientation.
+                                                      Defaults to None in which case
+                                                      the end orientations are used.
+        end_orientations (np.array(4,m), optional): The orientations at the end points
+                                                    or a single orientation.
+                                                    Defaults to None in which case
+                                                    the start orientations are used.
+
+    Raises:
+        ValueError: If a normal has zero length
+
+    Returns:
+        ToolPath: A ToolPath object of the joined arcs
+    """
+    start_points = np.asarray(start_points, dtype=float)
+    number_of_segments = len(start_points[0])
+    normals = np.asarray(normals, dtype=float)
+    normal_lengths = np.linalg.norm(normals, axis=0)
+    if np.any(normal_lengths == 0):
+        raise ValueError("The normals of the arcs need to have a length")
+    normals = normals/normal_lengths
+    angles = np.broadcast_to(np.asarray(angles, dtype=float), number_of_segments)
+    pitches = np.broadcast_to(np.asarray(pitches, dtype=float), number_of_segments)
 
-    path = np.zeros((3, samples))
-    for i in range(2):
-        path[all_axis[i]] = planar_path[i]
-    path[axis] = np.linspace(start_point[axis], end_point[axis], samples)
-    return ToolPath(path)
+    segment_index, _, fractions = _expand_segments(samples, number_of_segments)
+    radii = (start_points-np.asarray(centers, dtype=float))[:, segment_index]
+    axes = normals[:, segment_index]
+    path_angles = fractions*angles[segment_index]
+    cos_angles = np.cos(path_angles)
+    # Rodrigues' rotation of the start radius around the normal
+    path = start_points[:, segment_index]-radii+radii*cos_angles + \
+        np.cross(axes, radii, axis=0)*np.sin(path_angles) + \
+        axes*np.sum(axes*radii, axis=0)*(1-cos_angles) + \
+        axes*pitches[segment_index]*path_angles/(2*np.pi)
+    return ToolPath(path, _interpolate_orientations(start_orientations, end_orientations,
+                                                    number_of_segments, segment_index,
+                                                    fractions))
 
 
-def spline_interpolation(points: np.array, samples: int):
+def spline_interpolation(points: np.array, samples: int, orientations: np.array = None):
     """Interpolates between a number of points in cartesian space.
 
     Args:
         points (np.array(3,n)): A 3 dimensional array whith each dimension containing
                                    subsequent positions.
         samples (int): The number of samples used to interpolate
+        orientations (np.array(4,n), optional): The orientations at the given points
+                                                which are interpolated spherically.
+                                                Defaults to None in which case
+                                                the orientation [0,0,0,1] is assumed.
 
     Returns:
         ToolPath: A ToolPath object of the interpolated path
     """
-    s = np.linspace(0, 1, len(points[0]))
+    return SplinePath(points, orientations).evaluate_parameters(np.linspace(0, 1, samples))
+
+
+class SplinePath:
+
+    def __init__(self, points: np.array, orientations: np.array = None,
+                 lookup_resolution: int = 100):
+        """A cubic spline through a number of points which can be evaluated by arc length.
+           The spline is fitted once and a table mapping arc lengths to spline parameters
+           is built on the first arc length query, so that resampling the path
+           for different spacings or feed rates only requires table lookups.
+
+        Args:
+            points (np.array(3,n)): A 3 dimensional array whith each dimension containing
+                                       subsequent positions.
+            orientations (np.array(4,n), optional): The orientations at the given points
+                                                    which are interpolated spherically.
+                                                    Defaults to None in which case
+                                                    the orientation [0,0,0,1] is assumed.
+            lookup_resolution (int, optional): The number of lookup table entries
+                                               between two subsequent points.
+                                               Defaults to 100.
+        """
+        self.key_parameters = np.linspace(0, 1, len(points[0]))
+        self.spline = sci.CubicSpline(self.key_parameters, np.asarray(points), axis=1)
+        self.orientations = None if orientations is None else \
+            np.asarray(orientations, dtype=float)
+        self.lookup_resolution = lookup_resolution
+        self._lookup_parameters = None
+        self._lookup_lengths = None
+
+    @property
+    def length(self):
+        """The arc length of the spline.
+
+        Returns:
+            float: The arc length
+        """
+        return self._get_lookup_table()[1][-1]
+
+    def get_parameters(self, arc_lengths: np.array):
+        """Converts arc lengths along the spline into spline parameters.
+
+        Args:
+            arc_lengths (np.array(n)): The arc lengths from the start of the spline
+
+        Returns:
+            np.array(n): The spline parameters between 0 and 1
+        """
+        lookup_parameters, lookup_lengths = self._get_lookup_table()
+        return np.interp(arc_lengths, lookup_lengths, lookup_parameters)
+
+    def evaluate_parameters(self, parameters: np.array):
+        """Evaluates the spline at given spline parameters.
+
+        Args:
+            parameters (np.array(n)): The spline parameters between 0 and 1
+
+        Returns:
+            ToolPath: A ToolPath object of the evaluated poses
+        """
+        parameters = np.asarray(parameters, dtype=float)
+        path_orientations = None
+        if self.orientations is not None:
+            key_frame = np.clip(np.searchsorted(self.key_parameters, parameters,
+                                                side='right')-1,
+                                0, len(self.key_parameters)-2)
+            fractions = (parameters-self.key_parameters[key_frame]) / \
+                (self.key_parameters[key_frame+1]-self.key_parameters[key_frame])
+            path_orientations = quaternion_slerp(self.orientations[:, key_frame],
+                                                 self.orientations[:, key_frame+1],
+                                                 fractions)
+        return ToolPath(self.spline(parameters), path_orientations)
+
+    def evaluate(self, arc_lengths: np.array):
+        """Evaluates the spline at given arc lengths.
+
+        Args:
+            arc_lengths (np.array(n)): The arc lengths from the start of the spline
+
+        Returns:
+            ToolPath: A ToolPath object of the evaluated poses
+        """
+        return self.evaluate_parameters(self.get_parameters(arc_lengths))
+
+    def resample(self, spacing: float):
+        """Samples the spline with a constant distance along its arc.
+
+        Args:
+            spacing (float): The maximum distance between two samples along the arc
+
+        Returns:
+            ToolPath: A ToolPath object of the evenly spaced poses
+        """
+        samples = int(np.ceil(self.length/spacing))+1
+        return self.evaluate(np.linspace(0, self.length, samples))
+
+    def sample_time(self, feed_rate: float, time_step: float):
+        """Samples the spline at the poses reached at a constant feed rate
+           after each time step. The end of the spline is always included.
+
+        Args:
+            feed_rate (float): The speed along the spline
+            time_step (float): The time between two samples
+
+        Raises:
+            ValueError: If the feed rate or the time step is not positive
+
+        Returns:
+            ToolPath: A ToolPath object of the poses
+        """
+        if feed_rate <= 0 or time_step <= 0:
+            raise ValueError("The feed rate and the time step need to be positive")
+        arc_lengths = np.arange(0, self.length, feed_rate*time_step)
+        return self.evaluate(np.append(arc_lengths, self.length))
+
+    def _get_lookup_table(self):
+        """Internal function returning the arc length lookup table which is built once.
+
+        Returns:
+            np.array: The spline parameters of the table entries
+            np.array: The arc lengths of the table entries
+        """
+        if self._lookup_parameters is None:
+            parameters = np.linspace(0, 1, (len(self.key_parameters)-1) *
+                                     self.lookup_resolution+1)
+            chord_lengths = np.linalg.norm(np.diff(self.spline(parameters), axis=1), axis=0)
+            self._lookup_parameters = parameters
+            self._lookup_lengths = np.concatenate([[0], np.cumsum(chord_lengths)])
+        return self._lookup_parameters, self._lookup_lengths
+
+
+def _expand_segments(samples: np.array, number_of_segments: int):
+    """Internal function distributing the samples of path segments.
+
+    Args:
+        samples (np.array(m)): The number of samples of each segment or a single number
+        number_of_segments (int): The number of segments
+
+    Returns:
+        np.array(n): The segment of each sample
+        np.array(n): The number of each sample within its segment
+        np.array(n): The fraction of each sample along its segment from 0 to 1
+    """
+    samples = np.broadcast_to(np.asarray(samples, dtype=int), number_of_segments)
+    segment_index = np.repeat(np.arange(number_of_segments), samples)
+    sample_number = np.arange(len(segment_index)) - \
+        np.repeat(np.cumsum(samples)-samples, samples)
+    fractions = sample_number/np.maximum(samples[segment_index]-1, 1)
+    return segment_index, sample_number, fractions
+
 
-    path = np.zeros((3, samples))
-    cs_x = sci.CubicSpline(s, points[0])
-    cs_y = sci.CubicSpline(s, points[1])
-    cs_z = sci.CubicSpline(s, points[2])
+def _interpolate_orientations(start_orientations: np.array, end_orientations: np.array,
+                              number_of_segments: int, segment_index: np.array,
+                              fractions: np.array):
+    """Internal function spherically interpolating between the orientations of path segments.
 
-    cs_s = np.linspace(0, 1, samples)
-    path[0] = cs_x(cs_s)
-    path[1] = cs_y(cs_s)
-    path[2] = cs_z(cs_s)
+    Args:
+        start_orientations (np.array(4,m)): The start orientations, a single orientation
+                                            or None
+        end_orientations (np.array(4,m)): The end orientations, a single orientation or None
+        number_of_segments (int): The number of segments
+        segment_index (np.array(n)): The segment of each sample
+        fractions (np.array(n)): The fraction of each sample along its segment
 
-    return ToolPath(path)
+    Returns:
+        np.array(4,n): The interpolated orientations or None if no orientation is given
+    """
+    if start_orientations is None and end_orientations is None:
+        return None
+    if start_orientations is None:
+        start_orientations = end_orientations
+    if end_orientations is None:
+        end_orientations = start_orientations
+    start_orientations = np.broadcast_to(np.asarray(
+        start_orientations, dtype=float).reshape(4, -1), (4, number_of_segments))
+    end_orientations = np.broadcast_to(np.asarray(
+        end_orientations, dtype=float).reshape(4, -1), (4, number_of_segments))
+    return quaternion_slerp(start_orientations[:, segment_index],
+                            end_orientations[:, segment_index], fractions)
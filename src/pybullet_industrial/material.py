@@ -3,35 +3,255 @@ from typing import Dict
 import pybullet as p
 import numpy as np
 
+from pybullet_industrial.particle_store import ParticleStore
+from pybullet_industrial.transforms import (quaternion_inverse, quaternion_rotate,
+                                            quaternion_to_matrix)
+
+
+particle_registry = ParticleStore()
+
+PARTICLE_COLLISION_GROUP = 0b10
+
+
+def visuals_enabled():
+    """Checks whether particles should be created with visual shapes and debug items.
+       This is controlled by the visuals attribute of the particle registry.
+       If it is None visuals are skipped for DIRECT physics clients
+       since nothing ever renders them.
+
+    Returns:
+        bool: True if visuals should be created
+    """
+    if particle_registry.visuals is not None:
+        return particle_registry.visuals
+    return p.getConnectionInfo()['connectionMethod'] != p.DIRECT
+
 
 class Particle():
+    __slots__ = ('_store', '_row')
+
+    default_properties = {'particle size': 0.3, 'color': [1, 0, 0, 1]}
+    static_position = True
+    collision_group = PARTICLE_COLLISION_GROUP
+    collision_mask = ~PARTICLE_COLLISION_GROUP
+
     def __init__(self, ray_cast_result: list, material_properties: Dict):
-        """A template class for material particles extruded by a extruder endeffector tool
+        """A template class for material particles extruded by a extruder endeffector tool.
+           Particles are lightweight handles referencing a row of the particle registry
+           which stores the particle data in contiguous columns.
+           The bodies of all materials are assigned to the collision group
+           and mask of their class. By default particles do not collide with each other
+           while robots, tools and rays still interact with them.
+           Setting the collision group to None keeps the pybullet defaults.
 
         Args:
-            ray_cast_result (list): The result of a pybullet ray_cast 
-                                    as performed by the Extruder class. 
-                                    It is made up of: [objectUniqueId, 
+            ray_cast_result (list): The result of a pybullet ray_cast
+                                    as performed by the Extruder class.
+                                    It is made up of: [objectUniqueId,
                                                        linkIndex,
                                                        hit fraction,
                                                        hit position,
                                                        hit normal]
             material_properties (Dict): A dictionary containing the properties of the material
         """
-        self.properties = {}
         pass
 
+    @classmethod
+    def _from_row(cls, store: ParticleStore, row: int):
+        """Internal function creating a handle for an existing row of a particle store.
+
+        Args:
+            store (ParticleStore): The store containing the particle data
+            row (int): The row of the particle
+
+        Returns:
+            Particle: The particle handle
+        """
+        particle = cls.__new__(cls)
+        particle._store = store
+        particle._row = row
+        return particle
+
+    @classmethod
+    def _merge_properties(cls, material_properties: Dict):
+        """Internal function merging given material properties with the defaults of a material
+
+        Args:
+            material_properties (Dict): A dictionary containing the properties of the material
+
+        Raises:
+            KeyError: If a key is not a valid material property
+
+        Returns:
+            Dict: The complete material properties
+        """
+        properties = {key: list(value) if isinstance(value, list) else value
+                      for key, value in cls.default_properties.items()}
+        for key in material_properties:
+            if not key in properties:
+                raise KeyError("The specified property keys are not valid" +
+                               " Valid keys are: "+str(properties.keys()))
+            properties[key] = material_properties[key]
+        return properties
+
+    @classmethod
+    def _get_shape_arguments(cls, particle_size: float):
+        """Internal function returning the pybullet shape arguments of a particle with a body.
+           By default particles are spheres. Materials with other shapes override this.
+
+        Args:
+            particle_size (float): The size of the particle
+
+        Returns:
+            Dict: The keyword arguments for p.createCollisionShape and p.createVisualShape
+        """
+        return {'shapeType': p.GEOM_SPHERE, 'radius': particle_size}
+
+    @classmethod
+    def _get_mesh(cls, particle_size: float):
+        """Internal function returning a triangle mesh approximating the particle geometry.
+           By default this is an icosahedron inscribed in the sphere of the particle.
+
+        Args:
+            particle_size (float): The size of the particle
+
+        Returns:
+            np.array(k,3): The vertices of the mesh
+            np.array(m): The vertex indices of the triangles
+        """
+        golden_ratio = 0.5*(1+np.sqrt(5))
+        vertices = np.array([[-1, golden_ratio, 0], [1, golden_ratio, 0],
+                             [-1, -golden_ratio, 0], [1, -golden_ratio, 0],
+                             [0, -1, golden_ratio], [0, 1, golden_ratio],
+                             [0, -1, -golden_ratio], [0, 1, -golden_ratio],
+                             [golden_ratio, 0, -1], [golden_ratio, 0, 1],
+                             [-golden_ratio, 0, -1], [-golden_ratio, 0, 1]])
+        vertices = particle_size*vertices/np.linalg.norm(vertices[0])
+        indices = np.array([0, 11, 5, 0, 5, 1, 0, 1, 7, 0, 7, 10, 0, 10, 11,
+                            1, 5, 9, 5, 11, 4, 11, 10, 2, 10, 7, 6, 7, 1, 8,
+                            3, 9, 4, 3, 4, 2, 3, 2, 6, 3, 6, 8, 3, 8, 9,
+                            4, 9, 5, 2, 4, 11, 6, 2, 10, 8, 6, 7, 9, 8, 1])
+        return vertices, indices
+
+    @classmethod
+    def _set_collision_filter(cls, body_ids: list):
+        """Internal function assigning the collision group and mask of the material to bodies.
+
+        Args:
+            body_ids (list): The ids of the pybullet bodies
+        """
+        if cls.collision_group is None:
+            return
+        for body_id in body_ids:
+            p.setCollisionFilterGroupMask(body_id, -1, cls.collision_group,
+                                          cls.collision_mask)
+
+    @classmethod
+    def _create_bodies(cls, positions: np.array, particle_size: float, color: list,
+                       visual: bool = True):
+        """Internal function creating the pybullet bodies of multiple particles
+           which share their size and color.
+           The bodies share their shapes. They are created one by one since
+           pybullet's batchPositions returns wrong ids once body ids are reused.
+
+        Args:
+            positions (np.array(n,3)): The positions of the particles
+            particle_size (float): The size of the particles
+            color (list): The color of the particles
+            visual (bool, optional): Whether the bodies get a visual shape.
+                                     Defaults to True.
+
+        Returns:
+            list: The ids of the created bodies
+        """
+        shape_arguments = cls._get_shape_arguments(particle_size)
+        visual_shape_id = -1
+        if visual:
+            visual_shape_id = p.createVisualShape(
+                rgbaColor=color, **shape_arguments)
+        collision_shape_id = p.createCollisionShape(**shape_arguments)
+        particle_ids = [p.createMultiBody(baseMass=0,
+                                          baseCollisionShapeIndex=collision_shape_id,
+                                          baseVisualShapeIndex=visual_shape_id,
+                                          basePosition=position)
+                        for position in np.asarray(positions).tolist()]
+        cls._set_collision_filter(particle_ids)
+        return particle_ids
+
+    @classmethod
+    def _create_visuals(cls, store: ParticleStore, rows: np.array):
+        """Internal function creating the missing visuals of particles.
+           Pybullet can not add visual shapes to existing bodies
+           so that the bodies are replaced.
+
+        Args:
+            store (ParticleStore): The store containing the particles
+            rows (np.array): The rows of particles sharing their size and color
+        """
+        old_particle_ids = store['particle id'][rows].tolist()
+        particle_ids = cls._create_bodies(store['position'][rows],
+                                          store['particle size'][rows[0]],
+                                          store['color'][rows[0]].tolist())
+        for particle_id in old_particle_ids:
+            p.removeBody(particle_id)
+        store.set_particle_ids(rows, particle_ids)
+
+    def _spawn(self, position: np.array, material_properties: Dict):
+        """Internal function creating the pybullet body of a static particle
+           and adding it to the particle registry.
+
+        Args:
+            position (np.array): The position of the particle
+            material_properties (Dict): A dictionary containing the properties of the material
+        """
+        properties = self._merge_properties(material_properties)
+        particle_size = properties['particle size']
+        color = properties['color']
+
+        visual = visuals_enabled()
+        particle_id = self._create_bodies([position], particle_size, color,
+                                          visual)[0]
+
+        self._store = particle_registry
+        self._row = particle_registry.add(type(self),
+                                          {'particle id': particle_id,
+                                           'position': position,
+                                           'particle size': particle_size,
+                                           'color': color,
+                                           'visual': visual})
+
+    @property
+    def properties(self):
+        """The material properties of the particle as stored in the particle registry
+        """
+        return {'particle size': float(self._store['particle size'][self._row]),
+                'color': self._store['color'][self._row].tolist()}
+
+    @property
+    def particle_id(self):
+        """The id of the pybullet body representing the particle
+        """
+        return int(self._store['particle id'][self._row])
+
     def get_position(self):
-        """Returns the position of a particle in the world frame
+        """Returns the position of a particle in the world frame.
+           Particles are static so that their stored position is returned.
+
+        Returns:
+            np.array: The three dimensional position of the particle
+                      in the world coordinate system
         """
-        pass
+        return self._store['position'][self._row].copy()
 
     def remove(self):
         """Function to actively remove the particle from the simulation.
            This function is deliberatly kept seperate from the __del__ method to prevent having
            to manually save particles if there is no intention of removing them.
         """
-        pass
+        if self.particle_id in self._store.frozen_bodies:
+            thaw_body(self.particle_id)
+        p.removeBody(self.particle_id)
+        self._store.remove_rows([self._row])
 
     def set_material_properties(self, new_properties: Dict):
         """Checks if the matieral properties contain the proper keys
@@ -43,14 +263,23 @@ class Particle():
         Raises:
             KeyError: If a key is not a valid extruder property
         """
+        properties = self.properties
         for key in new_properties:
-            if not key in self.properties:
+            if not key in properties:
                 raise KeyError("The specified property keys are not valid" +
-                               " Valid keys are: "+str(self.properties.keys()))
-            self.properties[key] = new_properties[key]
+                               " Valid keys are: "+str(properties.keys()))
+            self._store[key][self._row] = new_properties[key]
+
+    def __eq__(self, other):
+        return (isinstance(other, Particle) and self._store is other._store
+                and self._row == other._row)
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
 
 
 class Plastic(Particle):
+    __slots__ = ()
 
     def __init__(self, ray_cast_result: list,  material_properties: Dict):
         """A class for simply Plastic particles which can be used for 3d Printing.
@@ -59,7 +288,7 @@ class Plastic(Particle):
         Args:
             ray_cast_result (list): The result of a pybullet ray_cast
                                     as performed by the Extruder class.
-                                    It is made up of: [objectUniqueId, 
+                                    It is made up of: [objectUniqueId,
                                                        linkIndex,
                                                        hit fraction,
                                                        hit position,
@@ -68,40 +297,18 @@ class Plastic(Particle):
                                         The default properties for Plastic are:
                                         'particle size': 0.3, 'color': [1, 0, 0, 1]
         """
-        self.properties = {'particle size': 0.3, 'color': [1, 0, 0, 1]}
-        self.set_material_properties(material_properties)
-        particle_size = self.properties['particle size']
-        color = self.properties['color']
-
-        visual_shape_id = p.createVisualShape(
-            shapeType=p.GEOM_SPHERE, rgbaColor=color, radius=particle_size)
-        collision_shape_id = p.createCollisionShape(
-            shapeType=p.GEOM_SPHERE, radius=particle_size)
-
-        self.particle_id = p.createMultiBody(baseMass=0,
-                                             baseCollisionShapeIndex=collision_shape_id,
-                                             baseVisualShapeIndex=visual_shape_id,
-                                             basePosition=ray_cast_result[3])
-
-    def get_position(self):
-        """Returns the position of a particle in the world frame
-
-        Returns:
-            [float,float,float]: The three dimensional position of the particle 
-                                 in the world coordinate system 
-        """
-        position, _ = p.getBasePositionAndOrientation(self.particle_id)
-        return position
-
-    def remove(self):
-        p.removeBody(self.particle_id)
+        self._spawn(ray_cast_result[3], material_properties)
 
 
 class Paint(Particle):
+    __slots__ = ()
+
+    static_position = False
 
     def __init__(self, ray_cast_result: list, material_properties: Dict):
         """A class for simply Paint particles which stick to objects and move with them.
-           The Paint particles are purely visible and have neither mass nor a collision mesh
+           The Paint particles are purely visible and have neither mass nor a collision mesh.
+           If visuals are disabled they are pure data records.
 
         Args:
             ray_cast_result (list): The result of a pybullet ray_cast as performed by the extruder
@@ -109,51 +316,104 @@ class Paint(Particle):
                                         The default properties for Paint are:
                                         'particle size': 0.3, 'color': [1, 0, 0, 1]
         """
-        self.properties = {'particle size': 0.3, 'color': [1, 0, 0, 1]}
-        self.set_material_properties(material_properties)
-        particle_size = self.properties['particle size']
-        color = self.properties['color']
-
-        self.particle_ids = []
-        self.target_id = ray_cast_result[0]
-        self.target_link_id = ray_cast_result[1]
-        self.hit_position = ray_cast_result[3]
-        self.initial_target_position = self.get_target_pose(
-            self.target_id, self.target_link_id)[0]
-
-        if self.target_id != -1:
+        properties = self._merge_properties(material_properties)
+        particle_size = properties['particle size']
+        color = properties['color']
+
+        target_id = ray_cast_result[0]
+        target_link_id = ray_cast_result[1]
+        column_values = {'position': ray_cast_result[3],
+                         'particle size': particle_size,
+                         'color': color,
+                         'target id': target_id,
+                         'target link id': target_link_id}
+
+        if target_id != -1:
             target_position, target_orientation = self.get_target_pose(
-                self.target_id, self.target_link_id)
-
-            rot_matrix = p.getMatrixFromQuaternion(target_orientation)
-            rot_matrix = np.array(rot_matrix).reshape(3, 3)
-
-            self.adj_target_position = np.linalg.inv(
-                rot_matrix)@(np.array(ray_cast_result[3])-target_position)
-
-            steps = 3
-            width = particle_size*500
-            theta2 = np.linspace(-np.pi,  0, steps)
-            phi2 = np.linspace(0,  5 * 2*np.pi, steps)
-
-            x_coord = particle_size * \
-                np.sin(theta2) * np.cos(phi2) + self.adj_target_position[0]
-            y_coord = particle_size * \
-                np.sin(theta2) * np.sin(phi2) + self.adj_target_position[1]
-            z_coord = particle_size * \
-                np.cos(theta2) + self.adj_target_position[2]
-
-            path = np.array([x_coord, y_coord, z_coord])
-            path_steps = len(path[0])
-            for i in range(1, path_steps):
-                current_point = path[:, i]
-                previous_point = path[:, i-1]
-                self.particle_ids.append(p.addUserDebugLine(current_point, previous_point,
-                                                            lineColorRGB=color[:3],
-                                                            lineWidth=width,
-                                                            lifeTime=0,
-                                                            parentObjectUniqueId=self.target_id,
-                                                            parentLinkIndex=self.target_link_id))
+                target_id, target_link_id)
+
+            local_position = quaternion_rotate(
+                quaternion_inverse(target_orientation),
+                np.array(ray_cast_result[3])-target_position)
+            column_values['local position'] = local_position
+
+            if visuals_enabled():
+                column_values['debug item ids'] = self._add_debug_lines(
+                    local_position, particle_size, color, target_id, target_link_id)
+                column_values['visual'] = True
+        else:
+            column_values['visual'] = True
+
+        self._store = particle_registry
+        self._row = particle_registry.add(type(self), column_values)
+
+    @classmethod
+    def _add_debug_lines(cls, local_position: np.array, particle_size: float, color: list,
+                         target_id: int, target_link_id: int):
+        """Internal function drawing a paint particle using debug lines attached to its target.
+
+        Args:
+            local_position (np.array): The position of the particle in the target link frame
+            particle_size (float): The size of the particle
+            color (list): The color of the particle
+            target_id (int): The id of the pybullet body the particle sticks to
+            target_link_id (int): The id of the link the particle sticks to
+
+        Returns:
+            list: The ids of the debug lines
+        """
+        steps = 3
+        width = particle_size*500
+        theta2 = np.linspace(-np.pi,  0, steps)
+        phi2 = np.linspace(0,  5 * 2*np.pi, steps)
+
+        x_coord = particle_size * \
+            np.sin(theta2) * np.cos(phi2) + local_position[0]
+        y_coord = particle_size * \
+            np.sin(theta2) * np.sin(phi2) + local_position[1]
+        z_coord = particle_size * \
+            np.cos(theta2) + local_position[2]
+
+        path = np.array([x_coord, y_coord, z_coord])
+        path_steps = len(path[0])
+        debug_item_ids = []
+        for i in range(1, path_steps):
+            current_point = path[:, i]
+            previous_point = path[:, i-1]
+            debug_item_ids.append(p.addUserDebugLine(current_point, previous_point,
+                                                     lineColorRGB=color[:3],
+                                                     lineWidth=width,
+                                                     lifeTime=0,
+                                                     parentObjectUniqueId=target_id,
+                                                     parentLinkIndex=target_link_id))
+        return debug_item_ids
+
+    @classmethod
+    def _create_visuals(cls, store: ParticleStore, rows: np.array):
+        for row in np.asarray(rows).tolist():
+            store['debug item ids'][row] = cls._add_debug_lines(
+                store['local position'][row], store['particle size'][row],
+                store['color'][row].tolist(), store['target id'][row],
+                store['target link id'][row])
+
+    @property
+    def target_id(self):
+        """The id of the pybullet body the particle sticks to
+        """
+        return int(self._store['target id'][self._row])
+
+    @property
+    def target_link_id(self):
+        """The id of the link the particle sticks to
+        """
+        return int(self._store['target link id'][self._row])
+
+    @property
+    def particle_ids(self):
+        """The ids of the debug lines visualizing the particle
+        """
+        return [int(item_id) for item_id in self._store['debug item ids'][self._row]
+                if item_id != -1]
 
     @staticmethod
     def get_target_pose(target_id: int, target_link_id: int):
@@ -166,26 +426,53 @@ class Paint(Particle):
             target_orientation = np.array(target_link_state[1])
         return target_position, target_orientation
 
-    def get_position(self):
-        """Returns the position of a particle in the world frame
+    @classmethod
+    def get_world_positions(cls, rows: np.array = None):
+        """Returns the world positions of many paint particles at once.
+           The particles are grouped by the link they stick to
+           so that the pose of every link is only queried once.
+           Particles which did not hit a body keep their stored position.
+
+        Args:
+            rows (np.array, optional): The rows of the particles in the particle registry.
+                                       Defaults to None in which case
+                                       all particles of the material are used.
 
         Returns:
-            [float,float,float]: The three dimensional position of the particle 
-                                 in the world coordinate system 
+            np.array(n,3): The three dimensional positions of the particles
+                           in the world coordinate system
         """
-        hit_position = self.hit_position
-        initial_target_position = self.initial_target_position
-        diff_vector = np.array(hit_position)-np.array(initial_target_position)
-
-        target_position, target_orientation = self.get_target_pose(
-            self.target_id, self.target_link_id)
+        if rows is None:
+            rows = particle_registry.get_rows(cls)
+        rows = np.asarray(rows, dtype=int)
+        world_positions = particle_registry['position'][rows].copy()
+        attached = particle_registry['target id'][rows] != -1
+        rows = rows[attached]
+        targets = np.column_stack([particle_registry['target id'][rows],
+                                   particle_registry['target link id'][rows]])
+        links, link_index = np.unique(targets, axis=0, return_inverse=True)
+        link_index = link_index.ravel()
+
+        link_positions = np.zeros((len(links), 3))
+        link_orientations = np.zeros((4, len(links)))
+        for i, (target_id, target_link_id) in enumerate(links.tolist()):
+            link_positions[i], link_orientations[:, i] = cls.get_target_pose(
+                target_id, target_link_id)
+        rot_matrices = quaternion_to_matrix(link_orientations)
+
+        local_positions = particle_registry['local position'][rows]
+        world_positions[attached] = link_positions[link_index] + \
+            np.einsum('nij,nj->ni', rot_matrices[link_index], local_positions)
+        return world_positions
 
-        rot_matrix = p.getMatrixFromQuaternion(target_orientation)
-        rot_matrix = np.array(rot_matrix).reshape(3, 3)
-
-        coordinates = target_position+rot_matrix @ (diff_vector)
+    def get_position(self):
+        """Returns the position of a particle in the world frame
 
-        return coordinates
+        Returns:
+            [float,float,float]: The three dimensional position of the particle
+                                 in the world coordinate system
+        """
+        return self.get_world_positions([self._row])[0]
 
     def remove(self):
         """Function to actively remove the particle from the simulation.
@@ -193,52 +480,37 @@ class Paint(Particle):
            to manually save particles if there is no intention of removing them.
         """
         [p.removeUserDebugItem(id) for id in self.particle_ids]
+        self._store.remove_rows([self._row])
 
 
 class MetalVoxel(Particle):
+    __slots__ = ()
+
     def __init__(self, ray_cast_result: list,  material_properties: Dict):
         """A simple voxel class for cutting and milling simulations
 
         Args:
-            ray_cast_result (list): The result of a pybullet ray_cast 
+            ray_cast_result (list): The result of a pybullet ray_cast
                                     as performed by the Extruder class.
             material_properties (Dict): A dictionary containing the properties of the material.
                                         The default properties for a Metal Voxel are:
                                         'particle size': 0.3, 'color': [1, 0, 0, 1]
         """
-        self.properties = {'particle size': 0.3, 'color': [1, 0, 0, 1]}
-        self.set_material_properties(material_properties)
-        particle_size = self.properties['particle size']
-        color = self.properties['color']
+        self._spawn(ray_cast_result[3], material_properties)
 
+    @classmethod
+    def _get_shape_arguments(cls, particle_size: float):
         half_extents = particle_size*0.5
-        visual_shape_id = p.createVisualShape(shapeType=p.GEOM_BOX,
-                                              rgbaColor=color,
-                                              halfExtents=[half_extents,
-                                                           half_extents,
-                                                           half_extents])
-        collision_shape_id = p.createCollisionShape(shapeType=p.GEOM_BOX,
-                                                    halfExtents=[half_extents,
-                                                                 half_extents,
-                                                                 half_extents])
-
-        self.particle_id = p.createMultiBody(baseMass=0,
-                                             baseCollisionShapeIndex=collision_shape_id,
-                                             baseVisualShapeIndex=visual_shape_id,
-                                             basePosition=ray_cast_result[3])
+        return {'shapeType': p.GEOM_BOX,
+                'halfExtents': [half_extents, half_extents, half_extents]}
 
-    def get_position(self):
-        """Returns the position of a particle in the world frame
-
-        Returns:
-            [float,float,float]: The three dimensional position of the particle 
-                                 in the world coordinate system 
-        """
-        position, _ = p.getBasePositionAndOrientation(self.particle_id)
-        return position
-
-    def remove(self):
-        p.removeBody(self.particle_id)
+    @classmethod
+    def _get_mesh(cls, particle_size: float):
+        vertices = particle_size*(np.array([[x, y, z] for x in (0, 1)
+                                            for y in (0, 1) for z in (0, 1)])-0.5)
+        indices = np.array([0, 1, 3, 0, 3, 2, 4, 6, 7, 4, 7, 5, 0, 4, 5, 0, 5, 1,
+                            2, 3, 7, 2, 7, 6, 0, 2, 6, 0, 6, 4, 1, 5, 7, 1, 7, 3])
+        return vertices, indices
 
 
 def spawn_material_block(base_position: list, dimensions: list,
@@ -248,7 +520,7 @@ def spawn_material_block(base_position: list, dimensions: list,
     Args:
         base_position ([float,float,float]): The position of the lower left base corner of the block
         dimensions ([float,float,float]): The dimensions of the block in [width,breath,height]
-        material (Particle): A particle that should be spawned 
+        material (Particle): A particle that should be spawned
         material_properties (Dict): A dictionary containing the properties of the material.
                                     It needs to contain a key 'particle size'.
 
@@ -277,3 +549,219 @@ def spawn_material_block(base_position: list, dimensions: list,
         objects.append(particle)
 
     return objects
+
+
+def set_collision_policy(material: Particle, collision_group: int,
+                         collision_mask: int):
+    """Sets the collision group and mask of a material.
+       The policy is applied to all existing bodies of the material,
+       including frozen bodies, and to all bodies spawned afterwards.
+       With pybullet's default collision filter mode two bodies collide
+       if the group of either body shares a bit with the mask of the other.
+
+    Args:
+        material (Particle): The particle class
+        collision_group (int): The collision group bit field of the material.
+                               None restores the pybullet defaults.
+        collision_mask (int): The collision mask bit field of the material
+
+    Raises:
+        ValueError: If the material is not represented by pybullet bodies
+    """
+    if not material.static_position:
+        raise ValueError("The material "+material.__name__ +
+                         " is not represented by a pybullet body")
+    material.collision_group = collision_group
+    material.collision_mask = collision_mask
+    body_ids = particle_registry['particle id'][particle_registry.get_rows(material)]
+    if collision_group is None:
+        for body_id in np.unique(body_ids).tolist():
+            p.setCollisionFilterGroupMask(body_id, -1, 1, -1)
+    else:
+        material._set_collision_filter(np.unique(body_ids).tolist())
+
+
+def freeze_particles(particles: list, max_shapes: int = 1024):
+    """Merges static particles into a few static triangle mesh bodies with one visual each.
+       Particles sharing their material, size and color are merged together.
+       The particles stay queryable through the particle registry
+       and are thawed automatically when they are removed.
+
+    Args:
+        particles (list[Particle]): The particles which should be merged
+        max_shapes (int, optional): The maximum number of particles per compound body.
+                                    Defaults to 1024.
+
+    Returns:
+        list: The ids of the created compound bodies
+    """
+    rows = np.array([particle._row for particle in particles], dtype=int)
+    return _freeze_rows(particle_registry, rows, max_shapes)
+
+
+def freeze_region(box_min: np.array, box_max: np.array, material: Particle = Plastic,
+                  max_shapes: int = 1024):
+    """Merges all particles of a material inside an axis aligned box into compound bodies.
+       This can be used to freeze a finished layer of a 3D print.
+
+    Args:
+        box_min (np.array): The minimum corner of the box
+        box_max (np.array): The maximum corner of the box
+        material (Particle, optional): The material which should be frozen.
+                                       Defaults to Plastic.
+        max_shapes (int, optional): The maximum number of particles per compound body.
+                                    Defaults to 1024.
+
+    Returns:
+        list: The ids of the created compound bodies
+    """
+    rows = particle_registry.query_box(box_min, box_max, material)
+    return _freeze_rows(particle_registry, rows, max_shapes)
+
+
+def thaw_body(body_id: int):
+    """Splits a frozen compound body back into individual particle bodies.
+
+    Args:
+        body_id (int): The id of the compound body
+
+    Returns:
+        list[Particle]: The thawed particles
+    """
+    store = particle_registry
+    rows = store.thaw_rows(body_id)
+    p.removeBody(body_id)
+    for group_rows in _group_rows(store, rows):
+        material = store.materials[store['material'][group_rows[0]]]
+        particle_ids = material._create_bodies(store['position'][group_rows],
+                                               store['particle size'][group_rows[0]],
+                                               store['color'][group_rows[0]].tolist(),
+                                               visuals_enabled())
+        store.set_particle_ids(group_rows, particle_ids)
+        store['visual'][group_rows] = visuals_enabled()
+    return [store.get_particle(row) for row in rows]
+
+
+def create_missing_visuals():
+    """Creates the visuals of all particles which were spawned without them.
+       This allows attaching a renderer to a simulation which ran headless.
+       The bodies of static particles are replaced which changes their ids.
+
+    Returns:
+        int: The number of particles which received visuals
+    """
+    store = particle_registry
+    number_of_particles = 0
+    for body_id, rows in list(store.frozen_bodies.items()):
+        if store['visual'][rows].all():
+            continue
+        material = store.materials[store['material'][rows[0]]]
+        new_body_id = _create_mesh_body(material, store['position'][rows],
+                                        store['particle size'][rows[0]],
+                                        store['color'][rows[0]].tolist(), True)
+        p.removeBody(body_id)
+        store.thaw_rows(body_id)
+        store.freeze_rows(rows, new_body_id)
+        store['visual'][rows] = True
+        number_of_particles += len(rows)
+
+    rows = np.flatnonzero(store['alive'] & ~store['visual'])
+    for group_rows in _group_rows(store, rows):
+        material = store.materials[store['material'][group_rows[0]]]
+        material._create_visuals(store, group_rows)
+        store['visual'][group_rows] = True
+    return number_of_particles+len(rows)
+
+
+def _freeze_rows(store: ParticleStore, rows: np.array, max_shapes: int):
+    """Internal function merging the particles in the given rows into compound bodies.
+
+    Args:
+        store (ParticleStore): The store containing the particles
+        rows (np.array): The rows of the particles
+        max_shapes (int): The maximum number of particles per compound body
+
+    Returns:
+        list: The ids of the created compound bodies
+    """
+    particle_ids = store['particle id'][rows]
+    rows = rows[store['alive'][rows] & (particle_ids != -1) &
+                ~np.isin(particle_ids, list(store.frozen_bodies))]
+
+    body_ids = []
+    for group_rows in _group_rows(store, rows):
+        material = store.materials[store['material'][group_rows[0]]]
+        particle_size = store['particle size'][group_rows[0]]
+        color = store['color'][group_rows[0]].tolist()
+        visual = visuals_enabled()
+
+        for chunk_start in range(0, len(group_rows), max_shapes):
+            chunk_rows = group_rows[chunk_start:chunk_start+max_shapes]
+            body_id = _create_mesh_body(material, store['position'][chunk_rows],
+                                        particle_size, color, visual)
+            for particle_id in store['particle id'][chunk_rows].tolist():
+                p.removeBody(particle_id)
+            store.freeze_rows(chunk_rows, body_id)
+            store['visual'][chunk_rows] = visual
+            body_ids.append(body_id)
+    return body_ids
+
+
+def _create_mesh_body(material: Particle, positions: np.array, particle_size: float,
+                      color: list, visual: bool):
+    """Internal function creating a static triangle mesh body from particles.
+
+    Args:
+        material (Particle): The particle class of the particles
+        positions (np.array(n,3)): The positions of the particles
+        particle_size (float): The size of the particles
+        color (list): The color of the particles
+        visual (bool): Whether the body gets a visual shape
+
+    Returns:
+        int: The id of the created body
+    """
+    vertices, indices = material._get_mesh(particle_size)
+    center = positions.mean(axis=0)
+    mesh_vertices = (vertices[None, :, :] +
+                     (positions-center)[:, None, :]).reshape(-1, 3).tolist()
+    mesh_indices = (indices[None, :] +
+                    len(vertices)*np.arange(len(positions))[:, None]).ravel().tolist()
+
+    collision_shape_id = p.createCollisionShape(p.GEOM_MESH,
+                                                vertices=mesh_vertices,
+                                                indices=mesh_indices,
+                                                flags=p.GEOM_FORCE_CONCAVE_TRIMESH)
+    visual_shape_id = -1
+    if visual:
+        visual_shape_id = p.createVisualShape(p.GEOM_MESH,
+                                              vertices=mesh_vertices,
+                                              indices=mesh_indices)
+    body_id = p.createMultiBody(baseMass=0,
+                                baseCollisionShapeIndex=collision_shape_id,
+                                baseVisualShapeIndex=visual_shape_id,
+                                basePosition=center)
+    if visual:
+        p.changeVisualShape(body_id, -1, rgbaColor=color)
+    material._set_collision_filter([body_id])
+    return body_id
+
+
+def _group_rows(store: ParticleStore, rows: np.array):
+    """Internal function grouping rows by material, particle size and color.
+
+    Args:
+        store (ParticleStore): The store containing the particles
+        rows (np.array): The rows which should be grouped
+
+    Returns:
+        list[np.array]: The rows of each group
+    """
+    if len(rows) == 0:
+        return []
+    keys = np.column_stack([store['material'][rows],
+                            store['particle size'][rows],
+                            store['color'][rows]])
+    _, group_index = np.unique(keys, axis=0, return_inverse=True)
+    group_index = group_index.ravel()
+    return [rows[group_index == group] for group in range(group_index.max()+1)]
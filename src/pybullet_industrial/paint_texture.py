@@ -0,0 +1,403 @@
+import os
+import struct
+import tempfile
+import time
+from typing import Dict
+
+import numpy as np
+import pybullet as p
+
+from pybullet_industrial.material import (Paint, Particle, particle_registry,
+                                          visuals_enabled)
+from pybullet_industrial.transforms import (invert_transform, multiply_transforms,
+                                            quaternion_rotate, quaternion_to_matrix)
+
+
+class PaintTexture:
+
+    def __init__(self, target_id: int, target_link_id: int = -1, resolution: float = 0.01,
+                 axis: int = 2, base_color: list = [1, 1, 1],
+                 full_coverage_thickness: float = None, update_interval: float = 0.5):
+        """A surface grid accumulating paint droplets on a link of a pybullet body.
+           The grid lies in the plane orthogonal to an axis of the link frame
+           and spans the bounding box of the link in its own frame.
+           Droplets are projected along this axis onto the grid
+           so that the memory stays constant regardless of the number of droplets.
+           The grid can be pushed to the GUI as a texture of the link.
+           The texture is displayed correctly on links whose texture coordinates
+           span the painted face, like the faces of box primitives.
+
+        Args:
+            target_id (int): The id of the painted pybullet body
+            target_link_id (int, optional): The id of the painted link. Defaults to -1.
+            resolution (float, optional): The edge length of a grid cell. Defaults to 0.01.
+            axis (int, optional): The axis of the link frame along which
+                                  droplets are projected. Defaults to 2.
+            base_color (list, optional): The RGB color of unpainted cells. Defaults to [1, 1, 1].
+            full_coverage_thickness (float, optional): The paint thickness at which a cell shows
+                                                       the pure paint color. Defaults to None
+                                                       in which case any paint covers a cell.
+            update_interval (float, optional): The minimum time in seconds
+                                               between two texture updates. Defaults to 0.5.
+        """
+        self.target_id = target_id
+        self.target_link_id = target_link_id
+        self.resolution = resolution
+        self.axis = axis
+        self.grid_axes = [(axis+1) % 3, (axis+2) % 3]
+        self.base_color = np.array(base_color[:3], dtype=float)
+        self.full_coverage_thickness = full_coverage_thickness
+        self.update_interval = update_interval
+
+        self.bounds_min, self.bounds_max = self._get_local_bounds()
+
+        grid_size = np.ceil((self.bounds_max-self.bounds_min)[self.grid_axes] /
+                            resolution).astype(int)
+        grid_size = np.maximum(grid_size, 1)
+        self.thickness = np.zeros(grid_size)
+        self._color_sum = np.zeros((grid_size[0], grid_size[1], 3))
+
+        self.texture_id = None
+        self._changed = False
+        self._last_update = -np.inf
+
+    def deposit(self, positions: np.array, particle_size: float, color: list):
+        """Adds paint droplets to the grid.
+           The volume of each spherical droplet is spread evenly
+           over the cells within its radius.
+
+        Args:
+            positions (np.array(n,3)): The world positions at which the droplets hit the link
+            particle_size (float): The radius of the droplets
+            color (list): The color of the droplets
+
+        Returns:
+            int: The number of droplets which hit the grid
+        """
+        local_positions = self._to_link_frame(positions)
+        return self.deposit_local(local_positions,
+                                  np.full(len(local_positions), particle_size),
+                                  np.tile(np.array(color[:3], dtype=float),
+                                          (len(local_positions), 1)))
+
+    def deposit_local(self, local_positions: np.array, particle_sizes: np.array,
+                      colors: np.array, chunk_size: int = 65536):
+        """Adds paint droplets given in the link frame to the grid.
+           The droplets are binned in vectorized chunks.
+
+        Args:
+            local_positions (np.array(n,3)): The positions of the droplets in the link frame
+            particle_sizes (np.array(n)): The radii of the droplets
+            colors (np.array(n,3)): The RGB colors of the droplets
+            chunk_size (int, optional): The number of droplets binned at once.
+                                        Defaults to 65536.
+
+        Returns:
+            int: The number of droplets which hit the grid
+        """
+        cells = np.floor((np.asarray(local_positions)[:, self.grid_axes] -
+                          self.bounds_min[self.grid_axes])/self.resolution).astype(int)
+        inside = np.all((cells >= 0) & (cells < self.thickness.shape), axis=1)
+        cells = cells[inside]
+        particle_sizes = np.asarray(particle_sizes)[inside]
+        colors = np.asarray(colors, dtype=float)[inside, :3]
+
+        for particle_size in np.unique(particle_sizes):
+            size_mask = particle_sizes == particle_size
+            cell_radius = int(particle_size/self.resolution)
+            offset_range = np.arange(-cell_radius, cell_radius+1)
+            offsets = np.stack(np.meshgrid(offset_range, offset_range,
+                                           indexing='ij'), axis=-1).reshape(-1, 2)
+            offsets = offsets[np.linalg.norm(offsets, axis=1) <= max(cell_radius, 0.5)]
+            droplet_volume = 4/3*np.pi*particle_size**3
+            cell_thickness = droplet_volume/(len(offsets)*self.resolution**2)
+
+            size_cells = cells[size_mask]
+            size_colors = colors[size_mask]
+            for chunk_start in range(0, len(size_cells), chunk_size):
+                chunk_cells = size_cells[chunk_start:chunk_start+chunk_size]
+                splat = (chunk_cells[:, None, :]+offsets[None, :, :]).reshape(-1, 2)
+                splat_colors = np.repeat(size_colors[chunk_start:chunk_start+chunk_size],
+                                         len(offsets), axis=0)
+                valid = np.all((splat >= 0) & (splat < self.thickness.shape), axis=1)
+                splat = splat[valid]
+                np.add.at(self.thickness, (splat[:, 0], splat[:, 1]), cell_thickness)
+                np.add.at(self._color_sum, (splat[:, 0], splat[:, 1]),
+                          cell_thickness*splat_colors[valid])
+        self._changed = self._changed or len(cells) > 0
+        return len(cells)
+
+    def get_coverage(self, minimum_thickness: float = 0.0):
+        """Returns the fraction of the grid covered with paint.
+
+        Args:
+            minimum_thickness (float, optional): The thickness above which a cell
+                                                 counts as covered. Defaults to 0.0.
+
+        Returns:
+            float: The covered fraction of cells
+        """
+        return float(np.mean(self.thickness > minimum_thickness))
+
+    def get_statistics(self, minimum_thickness: float = 0.0):
+        """Returns coverage and thickness metrics of the grid.
+
+        Args:
+            minimum_thickness (float, optional): The thickness above which a cell
+                                                 counts as covered. Defaults to 0.0.
+
+        Returns:
+            Dict: A dictionary containing the covered fraction 'coverage',
+                  the 'mean thickness', 'thickness deviation', 'minimum thickness'
+                  and 'maximum thickness' of the covered cells,
+                  the thickness grid 'heatmap' and a boolean grid of 'uncovered' cells
+        """
+        covered = self.thickness > minimum_thickness
+        covered_thickness = self.thickness[covered]
+        if len(covered_thickness) == 0:
+            covered_thickness = np.zeros(1)
+        return {'coverage': float(np.mean(covered)),
+                'mean thickness': float(covered_thickness.mean()),
+                'thickness deviation': float(covered_thickness.std()),
+                'minimum thickness': float(covered_thickness.min()),
+                'maximum thickness': float(covered_thickness.max()),
+                'heatmap': self.thickness.copy(),
+                'uncovered': ~covered}
+
+    def get_pixels(self):
+        """Returns the RGB image of the grid blending the paint over the base color.
+
+        Returns:
+            np.array(n,m,3): The image as unsigned 8 bit integers
+        """
+        painted = self.thickness > 0
+        paint_color = np.zeros_like(self._color_sum)
+        paint_color[painted] = self._color_sum[painted] / \
+            self.thickness[painted, None]
+        if self.full_coverage_thickness is None:
+            alpha = painted.astype(float)
+        else:
+            alpha = np.clip(self.thickness/self.full_coverage_thickness, 0, 1)
+        pixels = (1-alpha[:, :, None])*self.base_color+alpha[:, :, None]*paint_color
+        return np.round(255*np.clip(pixels, 0, 1)).astype(np.uint8)
+
+    def write_tga(self, path: str):
+        """Writes the grid image to an uncompressed TGA file which pybullet can load as texture.
+
+        Args:
+            path (str): The path of the file
+        """
+        pixels = self.get_pixels()
+        header = struct.pack('<BBBHHBHHHHBB', 0, 0, 2, 0, 0, 0, 0, 0,
+                             pixels.shape[1], pixels.shape[0], 24, 0x20)
+        with open(path, 'wb') as tga_file:
+            tga_file.write(header+pixels[:, :, ::-1].tobytes())
+
+    def update_texture(self, force: bool = False):
+        """Pushes the grid image to the texture of the link.
+           The texture is loaded from a temporary file on the first call
+           which is deleted once pybullet has read it.
+           Updates are skipped if nothing changed or if the last update
+           happened less than update_interval seconds ago.
+
+        Args:
+            force (bool, optional): Whether to ignore the update interval. Defaults to False.
+
+        Returns:
+            bool: True if the texture was updated
+        """
+        now = time.perf_counter()
+        if not self._changed and self.texture_id is not None:
+            return False
+        if not force and now-self._last_update < self.update_interval:
+            return False
+
+        if self.texture_id is None:
+            file_descriptor, texture_path = tempfile.mkstemp(suffix='.tga')
+            os.close(file_descriptor)
+            try:
+                self.write_tga(texture_path)
+                self.texture_id = p.loadTexture(texture_path)
+            finally:
+                os.remove(texture_path)
+            p.changeVisualShape(self.target_id, self.target_link_id,
+                                textureUniqueId=self.texture_id)
+        else:
+            pixels = self.get_pixels()
+            p.changeTexture(self.texture_id, pixels.ravel().tolist(),
+                            pixels.shape[1], pixels.shape[0])
+        self._changed = False
+        self._last_update = now
+        return True
+
+    def _get_local_bounds(self):
+        """Internal function returning the bounding box of the link in the link frame.
+           The body is briefly moved so that the link frame coincides with the world frame.
+           Unlike the world bounding box of a rotated link this box is not inflated.
+
+        Returns:
+            np.array(3): The minimum corner of the bounding box
+            np.array(3): The maximum corner of the bounding box
+        """
+        base_position, base_orientation = p.getBasePositionAndOrientation(self.target_id)
+        link_position, link_orientation = Paint.get_target_pose(
+            self.target_id, self.target_link_id)
+        identity_pose = multiply_transforms(*invert_transform(link_position, link_orientation),
+                                            base_position, base_orientation)
+        p.resetBasePositionAndOrientation(self.target_id, *identity_pose)
+        aabb_min, aabb_max = p.getAABB(self.target_id, self.target_link_id)
+        p.resetBasePositionAndOrientation(self.target_id, base_position, base_orientation)
+        return np.array(aabb_min), np.array(aabb_max)
+
+    def _to_link_frame(self, positions: np.array):
+        """Internal function transforming world positions into the link frame.
+
+        Args:
+            positions (np.array(n,3)): The world positions
+
+        Returns:
+            np.array(n,3): The positions in the link frame
+        """
+        link_position, link_orientation = Paint.get_target_pose(
+            self.target_id, self.target_link_id)
+        return (np.asarray(positions, dtype=float).reshape(-1, 3) -
+                link_position)@quaternion_to_matrix(link_orientation)
+
+
+paint_textures = {}
+
+
+def get_paint_texture(target_id: int, target_link_id: int = -1, resolution: float = 0.01,
+                      axis: int = 2):
+    """Returns the paint texture of a link and creates it if necessary.
+       Textures are kept in the paint_textures dictionary
+       which should be cleared when the simulation is reset.
+
+    Args:
+        target_id (int): The id of the painted pybullet body
+        target_link_id (int, optional): The id of the painted link. Defaults to -1.
+        resolution (float, optional): The edge length of a grid cell of new textures.
+                                      Defaults to 0.01.
+        axis (int, optional): The projection axis of new textures. Defaults to 2.
+
+    Returns:
+        PaintTexture: The paint texture of the link
+    """
+    key = (target_id, target_link_id)
+    if key not in paint_textures:
+        paint_textures[key] = PaintTexture(target_id, target_link_id, resolution, axis)
+    return paint_textures[key]
+
+
+def analyze_paint(target_id: int, target_link_id: int = -1, resolution: float = 0.01,
+                  axis: int = 2, minimum_thickness: float = 0.0, material: Particle = Paint):
+    """Bins all paint particles on a link onto a surface grid and evaluates the coating.
+       The local positions of the particles are read from the particle registry
+       in one batch so that no pose queries per particle are needed.
+
+    Args:
+        target_id (int): The id of the painted pybullet body
+        target_link_id (int, optional): The id of the painted link. Defaults to -1.
+        resolution (float, optional): The edge length of a grid cell. Defaults to 0.01.
+        axis (int, optional): The axis of the link frame along which
+                              the particles are projected. Defaults to 2.
+        minimum_thickness (float, optional): The thickness above which a cell
+                                             counts as covered. Defaults to 0.0.
+        material (Particle, optional): The paint material. Defaults to Paint.
+
+    Returns:
+        Dict: The metrics returned by PaintTexture.get_statistics
+    """
+    rows = particle_registry.get_rows(material)
+    rows = rows[(particle_registry['target id'][rows] == target_id) &
+                (particle_registry['target link id'][rows] == target_link_id)]
+    texture = PaintTexture(target_id, target_link_id, resolution, axis)
+    texture.deposit_local(particle_registry['local position'][rows],
+                          particle_registry['particle size'][rows],
+                          particle_registry['color'][rows])
+    return texture.get_statistics(minimum_thickness)
+
+
+class TexturePaint(Particle):
+    __slots__ = ('texture', '_local_position', '_properties')
+
+    default_properties = {'particle size': 0.3, 'color': [1, 0, 0, 1],
+                          'resolution': 0.01, 'axis': 2}
+    static_position = False
+
+    def __init__(self, ray_cast_result: list, material_properties: Dict):
+        """A paint material which accumulates droplets in the paint texture of the hit link
+           instead of creating a particle for every droplet.
+           The droplets are neither stored in the particle registry
+           nor can they be removed individually.
+           In the GUI the texture is updated at a throttled rate,
+           call update_texture(force=True) on the texture to show the final state.
+
+        Args:
+            ray_cast_result (list): The result of a pybullet ray_cast as performed by the extruder
+            material_properties (Dict): A dictionary containing the properties of the material.
+                                        The default properties for TexturePaint are:
+                                        'particle size': 0.3, 'color': [1, 0, 0, 1],
+                                        'resolution': 0.01, 'axis': 2.
+                                        Resolution and axis only affect new textures.
+        """
+        self._properties = self._merge_properties(material_properties)
+        self.texture = get_paint_texture(ray_cast_result[0], ray_cast_result[1],
+                                         self._properties['resolution'],
+                                         self._properties['axis'])
+        self._local_position = self.texture._to_link_frame(ray_cast_result[3])[0]
+        self.texture.deposit(ray_cast_result[3], self._properties['particle size'],
+                             self._properties['color'])
+        if visuals_enabled():
+            self.texture.update_texture()
+
+    @property
+    def properties(self):
+        """The material properties of the droplet
+        """
+        return self._properties
+
+    @property
+    def particle_id(self):
+        """Texture paint droplets are not represented by a pybullet body
+        """
+        return -1
+
+    def get_position(self):
+        """Returns the position of the droplet in the world frame
+
+        Returns:
+            np.array: The three dimensional position of the droplet
+                      in the world coordinate system
+        """
+        link_position, link_orientation = Paint.get_target_pose(
+            self.texture.target_id, self.texture.target_link_id)
+        return link_position+quaternion_rotate(link_orientation, self._local_position)
+
+    def remove(self):
+        """Texture paint droplets are merged into the texture of their target
+           and are therefore not removed individually.
+           The call does nothing so that droplets can be handled like other particles.
+        """
+
+    def set_material_properties(self, new_properties: Dict):
+        """Updates the stored material properties of the droplet.
+           The paint already deposited in the texture is not changed.
+
+        Args:
+            new_properties (Dict): A dictionary containing the material properties
+
+        Raises:
+            KeyError: If a key is not a valid material property
+        """
+        for key in new_properties:
+            if not key in self._properties:
+                raise KeyError("The specified property keys are not valid" +
+                               " Valid keys are: "+str(self._properties.keys()))
+        self._properties.update(new_properties)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return id(self)
@@ -0,0 +1,417 @@
+from typing import Dict
+
+import numpy as np
+
+from pybullet_industrial.spatial_hash import SpatialHash
+
+
+class ParticleStore():
+
+    column_layout = {'particle id': (np.int32, (), -1),
+                     'position': (np.float64, (3,), 0),
+                     'particle size': (np.float64, (), 0),
+                     'color': (np.float32, (4,), 0),
+                     'material': (np.int16, (), -1),
+                     'alive': (np.bool_, (), False),
+                     'visual': (np.bool_, (), False),
+                     'target id': (np.int32, (), -1),
+                     'target link id': (np.int32, (), -1),
+                     'local position': (np.float64, (3,), 0),
+                     'debug item ids': (np.int32, (2,), -1)}
+
+    def __init__(self, capacity: int = 1024, cell_size: float = None):
+        """A struct-of-arrays storage for particles.
+           Every particle occupies one row in a set of contiguous NumPy columns
+           which grow by doubling their capacity.
+           Particle objects are lightweight handles referencing a row.
+           The store also acts as a scene level registry which maps
+           pybullet body ids to their particles.
+           Since pybullet reuses body ids after a reset or reconnection
+           the store should be cleared in these cases.
+           Particles with a static position are additionally kept
+           in a spatial hash enabling neighbour and region queries.
+           The visuals attribute controls whether materials create visual shapes.
+           None enables them for all but DIRECT physics clients.
+
+        Args:
+            capacity (int, optional): The initial number of rows. Defaults to 1024.
+            cell_size (float, optional): The cell size of the spatial hash.
+                                         Defaults to None in which case twice the
+                                         size of the first static particle is used.
+        """
+        self.materials = []
+        self._material_codes = {}
+        self._rows = {}
+        self.frozen_bodies = {}
+        self.visuals = None
+        self.size = 0
+        self.spatial_index = None if cell_size is None else SpatialHash(cell_size)
+        self._columns = {}
+        for name, (dtype, shape, default) in self.column_layout.items():
+            self._columns[name] = np.full((capacity,)+shape, default, dtype)
+
+    def __getitem__(self, column_name: str):
+        """Returns a view on a column containing all rows of the store.
+
+        Args:
+            column_name (str): The name of the column
+
+        Returns:
+            np.array: A view of the column
+        """
+        return self._columns[column_name][:self.size]
+
+    def add(self, material: type, column_values: Dict):
+        """Adds a particle to the store.
+
+        Args:
+            material (type): The particle class of the new particle
+            column_values (Dict): A dictionary containing the values of the columns.
+                                  Columns which are not specified are set to their defaults.
+
+        Returns:
+            int: The row of the new particle
+        """
+        return self.add_batch(material, 1, column_values)[0]
+
+    def add_batch(self, material: type, number: int, column_values: Dict):
+        """Adds multiple particles of the same material to the store.
+
+        Args:
+            material (type): The particle class of the new particles
+            number (int): The number of new particles
+            column_values (Dict): A dictionary containing the values of the columns.
+                                  Values are broadcasted over all new particles.
+
+        Returns:
+            np.array: The rows of the new particles
+        """
+        if self.size+number > len(self._columns['alive']):
+            self._grow(self.size+number)
+        rows = np.arange(self.size, self.size+number)
+        self.size += number
+
+        for name, value in column_values.items():
+            self._columns[name][rows] = value
+        self._columns['material'][rows] = self._get_material_code(material)
+        self._columns['alive'][rows] = True
+
+        for row, particle_id in zip(rows, self._columns['particle id'][rows]):
+            if particle_id != -1:
+                previous_row = self._rows.get(int(particle_id))
+                if previous_row is not None:
+                    self._columns['alive'][previous_row] = False
+                    self._remove_from_index([previous_row])
+                self._rows[int(particle_id)] = int(row)
+
+        if getattr(material, 'static_position', True):
+            if self.spatial_index is None:
+                particle_size = self._columns['particle size'][rows].max()
+                self.spatial_index = SpatialHash(
+                    2*particle_size if particle_size > 0 else 1.0)
+            self.spatial_index.insert(rows, self._columns['position'][rows])
+        return rows
+
+    def get(self, particle_id: int):
+        """Returns the particle represented by a pybullet body.
+
+        Args:
+            particle_id (int): A pybullet body id
+
+        Returns:
+            Particle: The registered particle or None if the body is not a particle
+        """
+        row = self.get_row(particle_id)
+        if row is None:
+            return None
+        return self.get_particle(row)
+
+    def get_row(self, particle_id: int):
+        """Returns the row of the particle represented by a pybullet body.
+
+        Args:
+            particle_id (int): A pybullet body id
+
+        Returns:
+            int: The row of the particle or None if the body is not a particle
+        """
+        return self._rows.get(particle_id)
+
+    def set_particle_ids(self, rows: np.array, particle_ids: np.array):
+        """Assigns new pybullet bodies to existing particles.
+
+        Args:
+            rows (np.array): The rows of the particles
+            particle_ids (np.array): The ids of the new pybullet bodies
+        """
+        for row, particle_id in zip(np.asarray(rows).tolist(),
+                                    self._columns['particle id'][rows].tolist()):
+            if self._rows.get(particle_id) == row:
+                del self._rows[particle_id]
+        self._columns['particle id'][rows] = particle_ids
+        for row, particle_id in zip(np.asarray(rows).tolist(),
+                                    np.asarray(particle_ids).tolist()):
+            self._rows[particle_id] = row
+
+    def freeze_rows(self, rows: np.array, body_id: int):
+        """Marks particles as merged into a single frozen pybullet body.
+           Frozen particles stay queryable but are no longer registered by body id.
+
+        Args:
+            rows (np.array): The rows of the merged particles
+            body_id (int): The id of the compound body
+        """
+        for particle_id in self._columns['particle id'][rows].tolist():
+            self._rows.pop(particle_id, None)
+        self._columns['particle id'][rows] = body_id
+        self.frozen_bodies[body_id] = np.asarray(rows)
+
+    def thaw_rows(self, body_id: int):
+        """Releases the particles of a frozen body.
+           New bodies need to be assigned using set_particle_ids.
+
+        Args:
+            body_id (int): The id of the compound body
+
+        Returns:
+            np.array: The rows of the alive particles which were merged into the body
+        """
+        rows = self.frozen_bodies.pop(body_id)
+        return rows[self._columns['alive'][rows]]
+
+    def get_particle(self, row: int):
+        """Returns a handle for the particle stored in a given row.
+
+        Args:
+            row (int): The row of the particle
+
+        Returns:
+            Particle: The particle handle
+        """
+        material = self.materials[self._columns['material'][row]]
+        return material._from_row(self, int(row))
+
+    def get_rows(self, material: type = None):
+        """Returns the rows of all particles in the simulation.
+
+        Args:
+            material (type, optional): A particle class to which the query is restricted.
+                                       Defaults to None in which case all materials are returned.
+
+        Returns:
+            np.array: The rows of the particles
+        """
+        return np.flatnonzero(self._get_mask(material))
+
+    def get_positions(self, material: type = None):
+        """Returns the stored positions of all particles in the simulation.
+
+        Args:
+            material (type, optional): A particle class to which the query is restricted.
+                                       Defaults to None in which case all materials are returned.
+
+        Returns:
+            np.array(n,3): The positions of the particles
+        """
+        return self['position'][self._get_mask(material)]
+
+    def get_particles(self, material: type = None):
+        """Returns handles for all particles in the simulation.
+
+        Args:
+            material (type, optional): A particle class to which the query is restricted.
+                                       Defaults to None in which case all materials are returned.
+
+        Returns:
+            list[Particle]: The particle handles
+        """
+        return [self.get_particle(row) for row in self.get_rows(material)]
+
+    def pop(self, particle_ids: list):
+        """Removes the particles of the given bodies from the store.
+           Ids which are not registered are ignored.
+
+        Args:
+            particle_ids (list): A list of pybullet body ids
+
+        Returns:
+            list[Particle]: The particles which were removed from the store
+        """
+        rows = [self._rows.pop(particle_id) for particle_id in particle_ids
+                if particle_id in self._rows]
+        self._columns['alive'][rows] = False
+        self._remove_from_index(rows)
+        return [self.get_particle(row) for row in rows]
+
+    def remove_rows(self, rows: np.array):
+        """Marks the particles in the given rows as removed.
+
+        Args:
+            rows (np.array): The rows of the removed particles
+        """
+        rows = np.asarray(rows, dtype=int)
+        self._columns['alive'][rows] = False
+        for particle_id in self._columns['particle id'][rows]:
+            self._rows.pop(int(particle_id), None)
+        self._remove_from_index(rows)
+
+    def query_box(self, box_min: np.array, box_max: np.array, material: type = None):
+        """Returns the rows of all particles with a static position inside an axis aligned box.
+
+        Args:
+            box_min (np.array): The minimum corner of the box
+            box_max (np.array): The maximum corner of the box
+            material (type, optional): A particle class to which the query is restricted.
+                                       Defaults to None in which case all materials are returned.
+
+        Returns:
+            np.array: The rows of the particles
+        """
+        rows = self._query_candidates(box_min, box_max, material)
+        positions = self._columns['position'][rows]
+        inside = np.all((positions >= box_min) & (positions <= box_max), axis=1)
+        return rows[inside]
+
+    def query_radius(self, center: np.array, radius: float, material: type = None):
+        """Returns the rows of all particles with a static position within a sphere.
+
+        Args:
+            center (np.array): The center of the sphere
+            radius (float): The radius of the sphere
+            material (type, optional): A particle class to which the query is restricted.
+                                       Defaults to None in which case all materials are returned.
+
+        Returns:
+            np.array: The rows of the particles
+        """
+        center = np.asarray(center, dtype=float)
+        rows = self._query_candidates(center-radius, center+radius, material)
+        distances = np.linalg.norm(self._columns['position'][rows]-center, axis=1)
+        return rows[distances <= radius]
+
+    def remove_region(self, box_min: np.array, box_max: np.array, material: type = None):
+        """Removes all particles with a static position inside an axis aligned box
+           from the simulation.
+
+        Args:
+            box_min (np.array): The minimum corner of the box
+            box_max (np.array): The maximum corner of the box
+            material (type, optional): A particle class to which the removal is restricted.
+                                       Defaults to None in which case all materials are removed.
+
+        Returns:
+            list[Particle]: The removed particles
+        """
+        removed_particles = [self.get_particle(row)
+                             for row in self.query_box(box_min, box_max, material)]
+        for particle in removed_particles:
+            particle.remove()
+        return removed_particles
+
+    def rebuild_spatial_index(self, cell_size: float):
+        """Rebuilds the spatial hash with a new cell size.
+
+        Args:
+            cell_size (float): The edge length of the grid cells
+        """
+        self.spatial_index = SpatialHash(cell_size)
+        static_materials = [code for code, material in enumerate(self.materials)
+                            if getattr(material, 'static_position', True)]
+        rows = np.flatnonzero(self['alive'] &
+                              np.isin(self['material'], static_materials))
+        self.spatial_index.insert(rows, self._columns['position'][rows])
+
+    def clear(self):
+        """Removes all particles from the store.
+           Since pybullet reuses body ids this needs to be called
+           after reconnecting to a physics server or resetting the simulation.
+           Otherwise new bodies may be mistaken for stale particles.
+        """
+        self._rows.clear()
+        self.frozen_bodies.clear()
+        if self.spatial_index is not None:
+            self.spatial_index.clear()
+        for name, (_, _, default) in self.column_layout.items():
+            self._columns[name][:self.size] = default
+        self.size = 0
+
+    def __contains__(self, particle_id: int):
+        return particle_id in self._rows
+
+    def __len__(self):
+        return int(np.count_nonzero(self['alive']))
+
+    def __iter__(self):
+        return iter(self.get_particles())
+
+    def _get_mask(self, material: type = None, rows: np.array = None):
+        """Internal function returning a mask of all alive particles of a material.
+
+        Args:
+            material (type, optional): The particle class. Defaults to None.
+            rows (np.array, optional): The rows for which the mask is evaluated.
+                                       Defaults to None in which case all rows are used.
+
+        Returns:
+            np.array: A boolean mask over the rows
+        """
+        if rows is None:
+            rows = slice(None)
+        mask = self['alive'][rows].copy()
+        if material is not None:
+            if material not in self._material_codes:
+                return np.zeros(len(mask), dtype=bool)
+            mask &= self['material'][rows] == self._material_codes[material]
+        return mask
+
+    def _query_candidates(self, box_min: np.array, box_max: np.array,
+                          material: type = None):
+        """Internal function returning the alive rows in all cells overlapping a box.
+
+        Args:
+            box_min (np.array): The minimum corner of the box
+            box_max (np.array): The maximum corner of the box
+            material (type, optional): The particle class. Defaults to None.
+
+        Returns:
+            np.array: The candidate rows
+        """
+        if self.spatial_index is None:
+            return np.zeros(0, dtype=int)
+        rows = self.spatial_index.query_box(box_min, box_max)
+        return rows[self._get_mask(material, rows)]
+
+    def _remove_from_index(self, rows: np.array):
+        """Internal function removing rows from the spatial hash.
+
+        Args:
+            rows (np.array): The rows which should be removed
+        """
+        if self.spatial_index is not None:
+            self.spatial_index.remove(rows, self._columns['position'][rows])
+
+    def _get_material_code(self, material: type):
+        """Internal function converting a particle class into the code stored in the store.
+
+        Args:
+            material (type): A particle class
+
+        Returns:
+            int: The material code
+        """
+        if material not in self._material_codes:
+            self._material_codes[material] = len(self.materials)
+            self.materials.append(material)
+        return self._material_codes[material]
+
+    def _grow(self, minimum_capacity: int):
+        """Internal function which at least doubles the capacity of all columns.
+
+        Args:
+            minimum_capacity (int): The minimal capacity after growing
+        """
+        capacity = max(2*len(self._columns['alive']), minimum_capacity)
+        for name, (dtype, shape, default) in self.column_layout.items():
+            column = np.full((capacity,)+shape, default, dtype)
+            column[:self.size] = self._columns[name][:self.size]
+            self._columns[name] = column
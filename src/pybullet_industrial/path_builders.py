@@ -64,13 +64,8 @@ def build_box_path(center_position: np.array, dimensions: np.array,
     corner_3 = pi.circular_interpolation(
         corner_point_31, corner_point_00, radius, circle_samples)
 
-    box_path.append(corner_0)
-    box_path.append(side_1)
-    box_path.append(corner_1)
-    box_path.append(side_2)
-    box_path.append(corner_2)
-    box_path.append(side_3)
-    box_path.append(corner_3)
+    box_path.extend([corner_0, side_1, corner_1, side_2,
+                     corner_2, side_3, corner_3])
 
     box_path.rotate(orientation)
     box_path.translate(center_position)
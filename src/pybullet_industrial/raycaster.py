@@ -5,6 +5,7 @@ import pybullet as p
 
 from pybullet_industrial.endeffector_tool import EndeffectorTool
 from pybullet_industrial.robot_base import RobotBase
+from pybullet_industrial.transforms import quaternion_rotate
 
 
 class RayCaster(EndeffectorTool):
@@ -72,9 +73,6 @@ class RayCaster(EndeffectorTool):
         opening_angle = self.properties['opening angle']
         number_of_rays = self.properties['number of rays']
         ray_length = self.properties['maximum distance']
-        ray_start_pos = []
-        ray_end_pos = []
-
         phi = np.random.uniform(-np.pi, np.pi, number_of_rays)
         theta = np.random.uniform(-0.5*opening_angle,
                                   0.5*opening_angle, number_of_rays)
@@ -83,15 +81,9 @@ class RayCaster(EndeffectorTool):
         z = np.cos(theta)
         ray_directions = np.array([x, y, z])
 
-        rot_matrix = p.getMatrixFromQuaternion(orientation)
-        rot_matrix = np.array(rot_matrix).reshape(3, 3)
-
-        for i in range(number_of_rays):
-            ray_start_pos.append(position)
-
-            ray_dir = rot_matrix@ray_directions[:, i]
-
-            ray_end_pos.append(position-ray_length*ray_dir)
+        ray_start_pos = np.tile(position, (number_of_rays, 1))
+        ray_end_pos = ray_start_pos - \
+            ray_length*quaternion_rotate(orientation, ray_directions).T
 
-        results = p.rayTestBatch(ray_start_pos, ray_end_pos)
+        results = p.rayTestBatch(ray_start_pos.tolist(), ray_end_pos.tolist())
         return results
@@ -3,8 +3,11 @@ from typing import Dict
 import numpy as np
 import pybullet as p
 
+from pybullet_industrial.event_log import REMOVAL_EVENT
+from pybullet_industrial.material import particle_registry, thaw_body
 from pybullet_industrial.raycaster import RayCaster
 from pybullet_industrial.robot_base import RobotBase
+from pybullet_industrial.workpiece import HeightfieldWorkpiece
 
 
 class Remover(RayCaster):
@@ -22,7 +25,8 @@ class Remover(RayCaster):
                                        During initialization only 'material' has to be set.
                                        Default Values are:
                                        'opening angle':0,'number of rays':1,
-                                       'maximum distance':1
+                                       'maximum distance':1,'cutter':None,
+                                       'removal mode':'rays','event log':None
             coupled_robot (RobotBase, optional): A pybullet_industrial.RobotBase object if
                                                  the robot is coupled from the start.
                                                  Defaults to None.
@@ -37,21 +41,201 @@ class Remover(RayCaster):
         super().__init__(urdf_model, start_position, start_orientation,
                          coupled_robot, tcp_frame, connector_frame)
 
+        self.properties['cutter'] = None
+        self.properties['removal mode'] = 'rays'
+        self.properties['event log'] = None
+        self._last_cut_position = None
+
         self.change_properties(remover_properties)
 
     def remove(self, tcp_frame=None):
         """Removes simulation elements from the simulation environment.
+           In the 'rays' removal mode every object hit by a ray is removed.
+           In the 'volume' removal mode all particles whose position lies within the volume
+           swept by the cutter since the last call are removed.
+           Other bodies such as workpieces or fixtures are never removed in this mode.
+           The candidates are found with a single bounding box query of the broadphase.
+           If an 'event log' is set, every removed particle is recorded in it.
 
         Args:
             tcp_frame (str, optional): the name of the link from which to remove the material.
                                        Defaults to None in which case the default tcp is used
+
+        Raises:
+            ValueError: If the removal mode is invalid or the volume mode is used without a cutter
+
+        Returns:
+            list[Particle]: The removed particles as registered in the particle registry.
+                            Removed bodies which are not particles are not returned.
         """
         position, orientation = self.get_tool_pose(tcp_frame)
+        if self.properties['removal mode'] == 'volume':
+            removed_particles = self._remove_volume(tcp_frame)
+        elif self.properties['removal mode'] == 'rays':
+            hit_objects = self._get_hit_objects(position, orientation)
+            if self._thaw_frozen_objects(hit_objects):
+                hit_objects = self._get_hit_objects(position, orientation)
+            removed_particles = self._remove_objects(hit_objects)
+        else:
+            raise ValueError("Invalid removal mode! Valid modes are: 'rays', 'volume'")
+
+        event_log = self.properties['event log']
+        if event_log is not None and removed_particles:
+            event_log.record(REMOVAL_EVENT,
+                             [particle.get_position()
+                              for particle in removed_particles],
+                             [particle.particle_id for particle in removed_particles],
+                             [type(particle).__name__ for particle in removed_particles],
+                             position, orientation)
+        return removed_particles
+
+    def _get_hit_objects(self, position: np.array, orientation: np.array):
+        """Internal function returning the unique objects hit by the removal rays.
+
+        Args:
+            position (np.array): start position of the raycast
+            orientation (np.array): start orientation of the raycast
+
+        Returns:
+            list: The unique ids of the hit objects
+        """
         ray_cast_results = self.cast_rays(position, orientation)
+        hit_objects = [ray_intersection[0] for ray_intersection in ray_cast_results
+                       if ray_intersection[0] != -1]
+        return list(dict.fromkeys(hit_objects))
+
+    def _remove_volume(self, tcp_frame: str = None):
+        """Internal function removing all particles within the volume swept by the cutter.
+           Frozen bodies are split into their particles first
+           while bodies which are not particles are skipped.
+
+        Args:
+            tcp_frame (str, optional): the name of the link from which to remove the material.
+                                       Defaults to None in which case the default tcp is used
+
+        Raises:
+            ValueError: If no cutter is set in the remover properties
+
+        Returns:
+            list[Particle]: The removed particles
+        """
+        cutter = self.properties['cutter']
+        if cutter is None:
+            raise ValueError(
+                "A cutter needs to be set to remove material by volume")
+        _, orientation = self.get_tool_pose(tcp_frame)
+        positions = self._get_sweep_positions(tcp_frame)
+
+        aabb_min, aabb_max = cutter.get_aabb(positions, orientation)
+        candidates = self._get_overlapping_objects(aabb_min, aabb_max)
+        if self._thaw_frozen_objects(candidates):
+            candidates = self._get_overlapping_objects(aabb_min, aabb_max)
+        rows = [particle_registry.get_row(object_id) for object_id in candidates]
+        candidates = [object_id for object_id, row in zip(candidates, rows) if row is not None]
+        if not candidates:
+            return []
+
+        candidate_positions = np.transpose(
+            particle_registry['position'][[row for row in rows if row is not None]])
+        inside = cutter.contains(candidate_positions, positions, orientation)
+
+        return self._remove_objects([object_id for object_id, is_inside
+                                     in zip(candidates, inside) if is_inside])
+
+    def _get_overlapping_objects(self, aabb_min: np.array, aabb_max: np.array):
+        """Internal function returning all objects overlapping a bounding box
+           except for the tool itself and its coupled robot.
+
+        Args:
+            aabb_min (np.array): The minimum corner of the bounding box
+            aabb_max (np.array): The maximum corner of the bounding box
+
+        Returns:
+            list: The sorted unique ids of the overlapping objects
+        """
+        overlapping_objects = p.getOverlappingObjects(aabb_min, aabb_max)
+        if overlapping_objects is None:
+            return []
+        excluded_objects = {self.urdf}
+        if self._coupled_robot is not None:
+            excluded_objects.add(self._coupled_robot.urdf)
+        return sorted({object_id for object_id, _ in overlapping_objects
+                       if object_id not in excluded_objects})
 
-        removed_objects = []
-        for ray_intersection in ray_cast_results:
-            if ray_intersection[0] != -1:
-                p.removeBody(ray_intersection[0])
-                removed_objects.append(ray_intersection[0])
-        return removed_objects
+    @staticmethod
+    def _thaw_frozen_objects(object_ids: list):
+        """Internal function splitting frozen compound bodies back into particles
+           so that they can be removed individually.
+
+        Args:
+            object_ids (list): A list of pybullet body ids
+
+        Returns:
+            bool: True if any of the objects was a frozen body
+        """
+        frozen_objects = [object_id for object_id in object_ids
+                          if object_id in particle_registry.frozen_bodies]
+        for object_id in frozen_objects:
+            thaw_body(object_id)
+        return len(frozen_objects) > 0
+
+    @staticmethod
+    def _remove_objects(object_ids: list):
+        """Internal function removing a batch of unique bodies from the simulation.
+
+        Args:
+            object_ids (list): A list of unique pybullet body ids
+
+        Returns:
+            list[Particle]: The removed particles
+        """
+        for object_id in object_ids:
+            p.removeBody(object_id)
+        return particle_registry.pop(object_ids)
+
+    def remove_from_heightfield(self, workpiece: HeightfieldWorkpiece, tcp_frame: str = None):
+        """Removes the material of a heightfield workpiece which was swept by the cutter
+           since the last call. The tip of the cutter is located at the tool center point.
+           Use reset_sweep to move the tool without cutting.
+
+        Args:
+            workpiece (HeightfieldWorkpiece): The workpiece from which material is removed
+            tcp_frame (str, optional): the name of the link from which to remove the material.
+                                       Defaults to None in which case the default tcp is used
+
+        Raises:
+            ValueError: If no cutter is set in the remover properties
+
+        Returns:
+            int: The number of grid points whose height was lowered
+        """
+        if self.properties['cutter'] is None:
+            raise ValueError(
+                "A cutter needs to be set to remove material from a workpiece")
+        positions = self._get_sweep_positions(tcp_frame)
+        return workpiece.remove(positions, self.properties['cutter'])
+
+    def reset_sweep(self):
+        """Forgets the last cutting position so that the next cut does not
+           sweep the cutter along the intermediate tool movement.
+        """
+        self._last_cut_position = None
+
+    def _get_sweep_positions(self, tcp_frame: str = None):
+        """Internal function returning the positions swept by the cutter since the last cut.
+
+        Args:
+            tcp_frame (str, optional): the name of the link at which the cutter is located.
+                                       Defaults to None in which case the default tcp is used
+
+        Returns:
+            np.array(3,n): The last and the current cutting position
+                           or only the current one after a reset.
+        """
+        position, _ = self.get_tool_pose(tcp_frame)
+        if self._last_cut_position is None:
+            positions = position.reshape(3, 1)
+        else:
+            positions = np.transpose([self._last_cut_position, position])
+        self._last_cut_position = position
+        return positions
@@ -5,6 +5,7 @@ import pybullet as p
 
 from pybullet_industrial.endeffector_tool import EndeffectorTool
 from pybullet_industrial.robot_base import RobotBase
+from pybullet_industrial.transforms import quaternion_to_matrix
 
 
 class Camera(EndeffectorTool):
@@ -83,8 +84,7 @@ class Camera(EndeffectorTool):
             self.urdf, self._tcp_id, computeForwardKinematics=True)
         com_p = np.array(link_state[0])
         com_o = np.array(link_state[1])
-        rot_matrix = p.getMatrixFromQuaternion(com_o)
-        rot_matrix = np.array(rot_matrix).reshape(3, 3)
+        rot_matrix = quaternion_to_matrix(com_o)
         # Initial vectors
         init_camera_vector = (0, 0, 1)  # z-axis
         init_up_vector = (0, 1, 0)  # y-axis
@@ -0,0 +1,160 @@
+import os
+from typing import Dict
+
+import numpy as np
+
+from pybullet_industrial.material import (Particle, _group_rows, particle_registry,
+                                          visuals_enabled)
+from pybullet_industrial.particle_store import ParticleStore
+
+SNAPSHOT_COLUMNS = ['position', 'particle size', 'color', 'target id',
+                    'target link id', 'local position']
+
+
+def save_arrays(path: str, arrays: Dict, compressed: bool = True):
+    """Saves a dictionary of arrays to disk.
+
+    Args:
+        path (str): The path of the file or directory
+        arrays (Dict): A dictionary mapping names to arrays
+        compressed (bool, optional): Whether to write a compressed .npz file.
+                                     Otherwise a directory with one .npy file per array
+                                     is written which can be loaded memory mapped.
+                                     Defaults to True.
+    """
+    if compressed:
+        with open(path, 'wb') as snapshot_file:
+            np.savez_compressed(snapshot_file, **arrays)
+    else:
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name+'.npy'), array)
+
+
+def load_arrays(path: str):
+    """Loads a dictionary of arrays written by save_arrays.
+       Uncompressed snapshots are memory mapped.
+
+    Args:
+        path (str): The path of the file or directory
+
+    Returns:
+        Dict: A dictionary mapping names to arrays
+    """
+    if os.path.isdir(path):
+        return {file_name[:-4]: np.load(os.path.join(path, file_name), mmap_mode='r')
+                for file_name in os.listdir(path) if file_name.endswith('.npy')}
+    with np.load(path) as snapshot_file:
+        return {name: snapshot_file[name] for name in snapshot_file.files}
+
+
+def save_particles(path: str, previous_alive: np.array = None, compressed: bool = True,
+                   store: ParticleStore = particle_registry):
+    """Saves the particles of a store to disk.
+       Particles are saved by their data so that frozen particles are saved individually.
+       Passing the state returned by a previous call writes a delta snapshot
+       which only contains the particles added and removed since then.
+
+    Args:
+        path (str): The path of the snapshot
+        previous_alive (np.array, optional): The state returned by the previous snapshot.
+                                             Defaults to None in which case
+                                             all particles are saved.
+        compressed (bool, optional): Whether to write a compressed file
+                                     or a memory mappable directory. Defaults to True.
+        store (ParticleStore, optional): The saved store. Defaults to particle_registry.
+
+    Returns:
+        np.array: The state of the store which can be passed to the next delta snapshot
+    """
+    alive = store['alive'].copy()
+    if previous_alive is None:
+        previous_alive = np.zeros(0, dtype=bool)
+    rows = np.flatnonzero(alive)
+    rows = rows[rows >= len(previous_alive)]
+    removed_rows = np.flatnonzero(previous_alive & ~alive[:len(previous_alive)])
+
+    arrays = {name: store[name][rows] for name in SNAPSHOT_COLUMNS}
+    arrays['row'] = rows
+    arrays['removed rows'] = removed_rows
+    arrays['material'] = np.array([store.materials[code].__name__
+                                   for code in store['material'][rows]], dtype='S32')
+    save_arrays(path, arrays, compressed)
+    return alive
+
+
+def load_particles(paths: list, store: ParticleStore = particle_registry):
+    """Loads a snapshot and its deltas into the current physics client.
+       The snapshots are merged before any body is created
+       so that all bodies are created in bulk.
+       Paint particles keep the target ids they were saved with.
+
+    Args:
+        paths (list): The path of a snapshot or a list of paths
+                      of a full snapshot followed by its deltas
+        store (ParticleStore, optional): The store into which the particles are loaded.
+                                         Defaults to particle_registry.
+
+    Raises:
+        KeyError: If a snapshot contains an unknown material
+
+    Returns:
+        list[Particle]: The loaded particles
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    snapshots = [load_arrays(path) for path in paths]
+    removed_rows = np.concatenate([snapshot['removed rows'] for snapshot in snapshots])
+    saved_rows = np.concatenate([snapshot['row'] for snapshot in snapshots])
+    keep = ~np.isin(saved_rows, removed_rows)
+    columns = {name: np.concatenate([snapshot[name] for snapshot in snapshots])[keep]
+               for name in SNAPSHOT_COLUMNS+['material']}
+
+    materials = _get_materials()
+    visual = visuals_enabled()
+    new_rows = []
+    for material_name in np.unique(columns['material']):
+        if material_name.decode() not in materials:
+            raise KeyError("The snapshot contains the unknown material " +
+                           material_name.decode())
+        material = materials[material_name.decode()]
+        material_mask = columns['material'] == material_name
+        material_columns = {name: columns[name][material_mask]
+                            for name in SNAPSHOT_COLUMNS}
+        rows = store.add_batch(material, int(np.count_nonzero(material_mask)),
+                               material_columns)
+        new_rows.append(rows)
+
+        if material.static_position:
+            for group_rows in _group_rows(store, rows):
+                particle_ids = material._create_bodies(store['position'][group_rows],
+                                                       store['particle size'][group_rows[0]],
+                                                       store['color'][group_rows[0]].tolist(),
+                                                       visual)
+                store.set_particle_ids(group_rows, particle_ids)
+            store['visual'][rows] = visual
+        else:
+            attached = store['target id'][rows] != -1
+            if visual and np.any(attached):
+                material._create_visuals(store, rows[attached])
+            store['visual'][rows] = visual | ~attached
+
+    if not new_rows:
+        return []
+    return [store.get_particle(row) for row in np.concatenate(new_rows)]
+
+
+def _get_materials():
+    """Internal function collecting all particle classes by their name.
+
+    Returns:
+        Dict: A dictionary mapping class names to particle classes
+    """
+    materials = {}
+    classes = [Particle]
+    while classes:
+        material = classes.pop()
+        materials[material.__name__] = material
+        classes.extend(material.__subclasses__())
+    return materials
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class SpatialHash():
+
+    def __init__(self, cell_size: float):
+        """A uniform grid spatial hash mapping grid cells to the indices of the points inside them.
+           The hash only stores indices. Exact filtering against the point positions
+           is left to the owner of the positions.
+
+        Args:
+            cell_size (float): The edge length of the grid cells
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._number_of_entries = 0
+
+    def insert(self, indices: np.array, positions: np.array):
+        """Inserts points into the spatial hash.
+
+        Args:
+            indices (np.array(n)): The indices of the points
+            positions (np.array(n,3)): The positions of the points
+        """
+        for index, cell in zip(np.asarray(indices).tolist(), self._get_cells(positions)):
+            self._cells.setdefault(cell, set()).add(index)
+        self._number_of_entries += len(indices)
+
+    def remove(self, indices: np.array, positions: np.array):
+        """Removes points from the spatial hash.
+
+        Args:
+            indices (np.array(n)): The indices of the points
+            positions (np.array(n,3)): The positions at which the points were inserted
+        """
+        for index, cell in zip(np.asarray(indices).tolist(), self._get_cells(positions)):
+            cell_entries = self._cells.get(cell)
+            if cell_entries is not None and index in cell_entries:
+                cell_entries.remove(index)
+                self._number_of_entries -= 1
+                if not cell_entries:
+                    del self._cells[cell]
+
+    def query_box(self, box_min: np.array, box_max: np.array):
+        """Returns the indices of all points in cells overlapping an axis aligned box.
+           The result may contain points slightly outside of the box.
+
+        Args:
+            box_min (np.array): The minimum corner of the box
+            box_max (np.array): The maximum corner of the box
+
+        Returns:
+            np.array: The candidate indices
+        """
+        cell_min = np.floor(np.asarray(box_min)/self.cell_size).astype(np.int64)
+        cell_max = np.floor(np.asarray(box_max)/self.cell_size).astype(np.int64)
+        number_of_cells = np.prod(np.maximum(cell_max-cell_min+1, 0))
+
+        candidates = []
+        if number_of_cells > len(self._cells):
+            for cell, cell_entries in self._cells.items():
+                if all(cell_min[i] <= cell[i] <= cell_max[i] for i in range(3)):
+                    candidates.extend(cell_entries)
+        else:
+            for x in range(cell_min[0], cell_max[0]+1):
+                for y in range(cell_min[1], cell_max[1]+1):
+                    for z in range(cell_min[2], cell_max[2]+1):
+                        candidates.extend(self._cells.get((x, y, z), ()))
+        return np.array(candidates, dtype=int)
+
+    def clear(self):
+        """Removes all points from the spatial hash.
+        """
+        self._cells.clear()
+        self._number_of_entries = 0
+
+    def __len__(self):
+        return self._number_of_entries
+
+    def _get_cells(self, positions: np.array):
+        """Internal function converting positions into grid cells.
+
+        Args:
+            positions (np.array(n,3)): The positions
+
+        Returns:
+            list: A list of cell index tuples
+        """
+        cells = np.floor(np.asarray(positions).reshape(-1, 3) /
+                         self.cell_size).astype(np.int64)
+        return [tuple(cell) for cell in cells.tolist()]
@@ -1,7 +1,13 @@
+import json
+import struct
+
 import numpy as np
-import pybullet as p
 
 import pybullet_industrial as pi
+from pybullet_industrial.transforms import (quaternion_multiply, quaternion_rotate,
+                                            quaternion_slerp)
+
+_MAGIC = b'PBITPATH'
 
 
 class ToolPath:
@@ -26,33 +32,74 @@ class ToolPath:
         Raises:
             ValueError: If all given input arrays are different lengths.
         """
-        self.positions = positions
+        # translations and rotations are collected in a pending transform
+        # which is only applied to the path arrays once they are read
+        self._reset_position_transform()
+        self._reset_orientation_transform()
+
+        self._positions = positions
         if orientations is None:
-            self.orientations = np.zeros((4, len(self.positions[0])))
-            self.orientations[3] = 1
+            self._orientations = np.zeros((4, len(positions[0])))
+            self._orientations[3] = 1
         else:
             if len(orientations[0]) != len(positions[0]):
                 raise ValueError(
                     "The position and orientation paths need to have the same length")
-            self.orientations = orientations
+            self._orientations = orientations
 
         if tool_acivations is None:
             self.tool_activations = np.zeros(len(self.positions[0]))
         else:
-            if len(tool_acivations[0]) != len(positions[0]):
+            if len(tool_acivations) != len(positions[0]):
                 raise ValueError(
                     "The position and tool activation paths need to have the same length")
             self.tool_activations = tool_acivations
 
+    @property
+    def positions(self):
+        """The positions of the path with all pending transforms applied.
+
+        Returns:
+            np.array(3,n): The path positions
+        """
+        if self._position_transform_pending:
+            self._positions = quaternion_rotate(self._position_rotation, self._positions) + \
+                self._translation[:, None]
+            self._reset_position_transform()
+        return self._positions
+
+    @positions.setter
+    def positions(self, positions: np.array):
+        self._positions = positions
+        self._reset_position_transform()
+
+    @property
+    def orientations(self):
+        """The orientations of the path with all pending rotations applied.
+
+        Returns:
+            np.array(4,n): The path orientations
+        """
+        if self._orientation_transform_pending:
+            self._orientations = quaternion_multiply(self._orientations,
+                                                     self._orientation_rotation)
+            self._reset_orientation_transform()
+        return self._orientations
+
+    @orientations.setter
+    def orientations(self, orientations: np.array):
+        self._orientations = orientations
+        self._reset_orientation_transform()
+
     def translate(self, vector: np.array):
-        """Translates the whole path by a given vector
+        """Translates the whole path by a given vector.
+           The translation is applied lazily once the positions are read.
 
         Args:
             vector (np.array): A 3D vector describing the path translation
         """
-        self.positions[0] += vector[0]
-        self.positions[1] += vector[1]
-        self.positions[2] += vector[2]
+        self._translation = self._translation+np.asarray(vector, dtype=float)
+        self._position_transform_pending = True
 
     def get_start_pose(self):
         """Returns the start pose of the trajectory for initial positioning
@@ -61,29 +108,40 @@ class ToolPath:
             np.array: a 3D position vector
             np.array: a 4D quaternion describing the orientation
         """
-        return self.positions[:, 0], self.orientations[:, 0]
+        position = quaternion_rotate(self._position_rotation, self._positions[:, 0]) + \
+            self._translation
+        orientation = quaternion_multiply(self._orientations[:, 0],
+                                          self._orientation_rotation)
+        return position, orientation
 
     def rotate(self, quaternion: np.array):
         """Rotates the vector by a given quaternion.
            Can be combined with pybullet.getQuaternionFromEuler() for easier usage.
+           The rotation is applied lazily once the path is read.
 
         Args:
             quaternion (np.array): A 4 dimensional quaternion as a list or numpy array
         """
-        path_positions = np.transpose(self.positions)
-        path_orientations = np.transpose(self.orientations)
+        quaternion = np.asarray(quaternion, dtype=float)
+        self._position_rotation = quaternion_multiply(quaternion, self._position_rotation)
+        self._translation = quaternion_rotate(quaternion, self._translation)
+        self._orientation_rotation = quaternion_multiply(self._orientation_rotation,
+                                                         quaternion)
+        self._position_transform_pending = True
+        self._orientation_transform_pending = True
 
-        rot_matrix = p.getMatrixFromQuaternion(quaternion)
-        rot_matrix = np.array(rot_matrix).reshape(3, 3)
-        for i in range(len(self)):
-            path_positions[i] = rot_matrix@path_positions[i]
-            _, path_orientations[i] = p.multiplyTransforms([0, 0, 0],
-                                                           path_orientations[i],
-                                                           [0, 0, 0],
-                                                           quaternion)
+    def _reset_position_transform(self):
+        """Internal function resetting the pending transform of the positions.
+        """
+        self._translation = np.zeros(3)
+        self._position_rotation = np.array([0.0, 0.0, 0.0, 1.0])
+        self._position_transform_pending = False
 
-        self.positions = np.transpose(path_positions)
-        self.orientations = np.transpose(path_orientations)
+    def _reset_orientation_transform(self):
+        """Internal function resetting the pending rotation of the orientations.
+        """
+        self._orientation_rotation = np.array([0.0, 0.0, 0.0, 1.0])
+        self._orientation_transform_pending = False
 
     def draw(self, pose: bool = False, color: list = [0, 0, 1]):
         """Function which draws the path into the Debugin GUI.
@@ -117,6 +175,22 @@ class ToolPath:
         self.tool_activations = np.append(
             self.tool_activations, tool_path.tool_activations)
 
+    def extend(self, tool_paths: list):
+        """Appends a list of ToolPath objects to the end of this tool path.
+           All paths are concatenated at once which avoids
+           copying the growing path for every appended segment.
+
+        Args:
+            tool_paths (list[ToolPath]): The ToolPath objects in their path order.
+        """
+        tool_paths = [self]+list(tool_paths)
+        self.positions = np.concatenate(
+            [tool_path.positions for tool_path in tool_paths], axis=1)
+        self.orientations = np.concatenate(
+            [tool_path.orientations for tool_path in tool_paths], axis=1)
+        self.tool_activations = np.concatenate(
+            [tool_path.tool_activations for tool_path in tool_paths])
+
     def prepend(self, tool_path):
         """Prepends a given ToolPath object to the start of this tool path.
 
@@ -129,17 +203,371 @@ class ToolPath:
         self.tool_activations = np.append(
             tool_path.tool_activations, self.tool_activations)
 
+    def resample(self, max_distance: float, tolerance: float = None,
+                 max_angle: float = None, corner_angle: float = np.pi/6):
+        """Resamples the path by arc length with a density adapted to its shape.
+           Straight runs are sampled with the maximum distance while curved parts
+           and orientation changes are sampled more densely.
+           Corners and the poses where the tool activation changes are kept exactly.
+
+        Args:
+            max_distance (float): The maximum distance between two poses
+            tolerance (float, optional): The maximum deviation of the straight connection
+                                         of two poses from the curved path.
+                                         Defaults to None in which case
+                                         the curvature is not considered.
+            max_angle (float, optional): The maximum orientation change in radians
+                                         between two poses. Defaults to None in which case
+                                         the orientation change is not considered.
+            corner_angle (float, optional): The direction change in radians above which
+                                            a pose is kept as a corner. Defaults to pi/6.
+        """
+        if len(self) < 2:
+            return
+        positions = self.positions
+        orientations = self.orientations
+        segments = np.diff(positions, axis=1)
+        lengths = np.linalg.norm(segments, axis=0)
+        turning_angles = self._get_turning_angles(segments, lengths)
+        corners = turning_angles > corner_angle
+
+        spacing = np.full(len(lengths), float(max_distance))
+        if tolerance is not None:
+            curvature = np.zeros(len(self))
+            chord_lengths = np.linalg.norm(positions[:, 2:]-positions[:, :-2], axis=0)
+            curvature[1:-1] = 2*np.sin(turning_angles[1:-1]) / \
+                np.maximum(chord_lengths, 1e-12)
+            curvature[corners] = 0
+            # the sagitta of a chord with length h on a circle with radius r is h²/(8r)
+            spacing = np.minimum(spacing, np.sqrt(
+                8*tolerance/np.maximum(np.maximum(curvature[:-1], curvature[1:]), 1e-12)))
+        weights = lengths/spacing
+        if max_angle is not None:
+            weights = np.maximum(weights, _get_orientation_angles(
+                orientations[:, :-1], orientations[:, 1:])/max_angle)
+        cumulative_weights = np.concatenate([[0], np.cumsum(weights)])
+
+        breakpoints = np.union1d(self._get_activation_breakpoints(),
+                                 np.flatnonzero(corners))
+        piece_weights = np.diff(cumulative_weights[breakpoints])
+        samples = np.maximum(np.ceil(piece_weights-1e-9), 1).astype(int)
+        piece_index = np.repeat(np.arange(len(samples)), samples)
+        sample_number = np.arange(len(piece_index)) - \
+            np.repeat(np.cumsum(samples)-samples, samples)+1
+        targets = cumulative_weights[breakpoints[piece_index]] + \
+            sample_number/samples[piece_index]*piece_weights[piece_index]
+        # each sample is placed on the first original segment reaching its weight
+        segment_index = np.clip(np.searchsorted(cumulative_weights, targets)-1,
+                                0, len(weights)-1)
+        segment_index = np.maximum(segment_index, breakpoints[piece_index])
+        fractions = np.clip((targets-cumulative_weights[segment_index]) /
+                            np.where(weights[segment_index] > 0, weights[segment_index], 1),
+                            0, 1)
+
+        tool_activations = np.asarray(self.tool_activations)
+        self.positions = np.concatenate(
+            [positions[:, :1],
+             positions[:, segment_index]+fractions*segments[:, segment_index]], axis=1)
+        self.orientations = np.concatenate(
+            [orientations[:, :1], quaternion_slerp(orientations[:, segment_index],
+                                                   orientations[:, segment_index+1],
+                                                   fractions)], axis=1)
+        self.tool_activations = np.concatenate(
+            [tool_activations[:1], tool_activations[segment_index+1]])
+
+    def simplify(self, tolerance: float, angle_tolerance: float = None):
+        """Removes poses which can be interpolated from their neighbours within a tolerance
+           using the Ramer-Douglas-Peucker algorithm.
+           All intervals of a refinement level are evaluated at once.
+           The poses where the tool activation changes are always kept.
+
+        Args:
+            tolerance (float): The maximum distance of a removed position
+                               from the simplified path
+            angle_tolerance (float, optional): The maximum angle in radians between
+                                               a removed orientation and the interpolated one.
+                                               Defaults to None in which case
+                                               the orientations are not considered.
+        """
+        if len(self) < 3:
+            return
+        positions = self.positions
+        orientations = self.orientations
+        keep = np.zeros(len(self), dtype=bool)
+        breakpoints = self._get_activation_breakpoints()
+        keep[breakpoints] = True
+        starts = breakpoints[:-1]
+        ends = breakpoints[1:]
+
+        while len(starts) > 0:
+            counts = ends-starts-1
+            starts = starts[counts > 0]
+            ends = ends[counts > 0]
+            counts = counts[counts > 0]
+            if len(counts) == 0:
+                break
+            offsets = np.cumsum(counts)-counts
+            interval_index = np.repeat(np.arange(len(counts)), counts)
+            pose_index = np.repeat(starts, counts)+np.arange(len(interval_index)) - \
+                offsets[interval_index]+1
+
+            start_positions = positions[:, starts[interval_index]]
+            chords = positions[:, ends[interval_index]]-start_positions
+            offsets_from_start = positions[:, pose_index]-start_positions
+            fractions = np.clip(np.sum(offsets_from_start*chords, axis=0) /
+                                np.maximum(np.sum(chords**2, axis=0), 1e-24), 0, 1)
+            errors = np.linalg.norm(offsets_from_start-fractions*chords, axis=0)/tolerance
+            if angle_tolerance is not None:
+                interpolated_orientations = quaternion_slerp(
+                    orientations[:, starts[interval_index]],
+                    orientations[:, ends[interval_index]], fractions)
+                errors = np.maximum(errors, _get_orientation_angles(
+                    orientations[:, pose_index], interpolated_orientations)/angle_tolerance)
+
+            maximum_errors = np.maximum.reduceat(errors, offsets)
+            is_maximum = errors == maximum_errors[interval_index]
+            first_maximum = np.unique(interval_index[is_maximum], return_index=True)[1]
+            split_index = pose_index[is_maximum][first_maximum]
+
+            split = maximum_errors > 1
+            keep[split_index[split]] = True
+            starts, ends = (np.concatenate([starts[split], split_index[split]]),
+                            np.concatenate([split_index[split], ends[split]]))
+
+        self.positions = positions[:, keep]
+        self.orientations = orientations[:, keep]
+        self.tool_activations = np.asarray(self.tool_activations)[keep]
+
+    def _get_activation_breakpoints(self):
+        """Internal function returning the poses which have to be kept when reducing the path.
+           These are the first and last pose and both poses around each activation change.
+
+        Returns:
+            np.array: The sorted indices of the kept poses
+        """
+        changes = np.flatnonzero(np.diff(np.asarray(self.tool_activations)) != 0)
+        return np.unique(np.concatenate([[0, len(self)-1], changes, changes+1]))
+
+    @staticmethod
+    def _get_turning_angles(segments: np.array, lengths: np.array):
+        """Internal function returning the direction change of the path at each pose.
+
+        Args:
+            segments (np.array(3,n-1)): The vectors between subsequent positions
+            lengths (np.array(n-1)): The lengths of the segments
+
+        Returns:
+            np.array(n): The direction change in radians which is zero for the end poses
+        """
+        directions = segments/np.maximum(lengths, 1e-12)
+        turning_angles = np.zeros(len(lengths)+1)
+        turning_angles[1:-1] = np.arccos(np.clip(
+            np.sum(directions[:, :-1]*directions[:, 1:], axis=0), -1, 1))
+        return turning_angles
+
+    def save(self, path: str, single_precision: bool = False):
+        """Saves the tool path into a binary file which can be loaded memory mapped.
+           The file contains a header followed by the contiguous positions,
+           orientations and tool activations.
+           The tool activations are stored with the precision of the poses
+           so that activation levels like extrusion rates are kept.
+
+        Args:
+            path (str): The path of the file. An existing file is overwritten.
+            single_precision (bool, optional): Whether the poses and tool activations
+                                               are stored as float32. Defaults to False.
+        """
+        dtype = np.float32 if single_precision else np.float64
+        header = json.dumps({'length': len(self), 'dtype': np.dtype(dtype).str,
+                             'activation dtype': np.dtype(dtype).str}).encode()
+        # the header is padded so that the path arrays start aligned
+        header_length = -(-(len(_MAGIC)+4+len(header))//64)*64-len(_MAGIC)-4
+        with open(path, 'wb') as path_file:
+            path_file.write(_MAGIC+struct.pack('<I', header_length) +
+                            header.ljust(header_length))
+            path_file.write(np.ascontiguousarray(self.positions, dtype=dtype).tobytes())
+            path_file.write(np.ascontiguousarray(self.orientations, dtype=dtype).tobytes())
+            path_file.write(np.asarray(self.tool_activations, dtype=dtype).tobytes())
+
+    @classmethod
+    def load(cls, path: str, mode: str = 'r'):
+        """Loads a tool path saved with ToolPath.save as memory mapped arrays.
+           Many processes can share the same file without copying it.
+
+        Args:
+            path (str): The path of the file
+            mode (str, optional): The numpy.memmap mode of the arrays.
+                                  Defaults to 'r' in which case the arrays are read only,
+                                  'c' allows changes which are not written to the file.
+
+        Raises:
+            ValueError: If the file is not a tool path
+
+        Returns:
+            ToolPath: The loaded tool path
+        """
+        with open(path, 'rb') as path_file:
+            if path_file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("The file "+path+" is not a tool path")
+            header_length = struct.unpack('<I', path_file.read(4))[0]
+            header = json.loads(path_file.read(header_length).decode())
+        length = header['length']
+        dtype = np.dtype(header['dtype'])
+        # files written without an activation dtype stored the activations as booleans
+        activation_dtype = np.dtype(header.get('activation dtype', '|b1'))
+        offset = len(_MAGIC)+4+header_length
+
+        arrays = []
+        for shape, array_dtype in (((3, length), dtype), ((4, length), dtype),
+                                   ((length,), activation_dtype)):
+            if length == 0:
+                arrays.append(np.zeros(shape, dtype=array_dtype))
+            else:
+                arrays.append(np.memmap(path, dtype=array_dtype, mode=mode,
+                                        offset=offset, shape=shape))
+            offset += int(np.prod(shape))*array_dtype.itemsize
+        return cls(*arrays)
+
+    def __getitem__(self, index: slice):
+        """Returns a window of the tool path.
+           The window shares the path arrays instead of copying them.
+
+        Args:
+            index (slice): The slice of poses
+
+        Raises:
+            TypeError: If the index is not a slice
+
+        Returns:
+            ToolPath: The tool path window
+        """
+        if not isinstance(index, slice):
+            raise TypeError("Tool paths can only be indexed by slices")
+        window = ToolPath(self._positions[:, index], self._orientations[:, index],
+                          self.tool_activations[index])
+        window._translation = self._translation
+        window._position_rotation = self._position_rotation
+        window._position_transform_pending = self._position_transform_pending
+        window._orientation_rotation = self._orientation_rotation
+        window._orientation_transform_pending = self._orientation_transform_pending
+        return window
+
     def __len__(self):
-        return len(self.positions[0])
+        return len(self._positions[0])
 
     def __iter__(self):
         self.current_index = 0
+        self._iteration_positions = self.positions
+        self._iteration_orientations = self.orientations
         return self
 
     def __next__(self):
         if self.current_index <= len(self)-1:
             i = self.current_index
             self.current_index += 1
-            return self.positions[:, i], self.orientations[:, i], self.tool_activations[i]
+            return (self._iteration_positions[:, i], self._iteration_orientations[:, i],
+                    self.tool_activations[i])
         else:
             raise StopIteration
+
+
+def _get_orientation_angles(orientations_1: np.array, orientations_2: np.array):
+    """Internal function returning the rotation angles between unit quaternions.
+
+    Args:
+        orientations_1 (np.array(4,n)): The first orientations
+        orientations_2 (np.array(4,n)): The second orientations
+
+    Returns:
+        np.array(n): The angles in radians
+    """
+    return 2*np.arccos(np.clip(np.abs(np.sum(orientations_1*orientations_2, axis=0)), 0, 1))
+
+
+class ToolPathBuilder:
+
+    def __init__(self, initial_capacity: int = 1024):
+        """A builder assembling a ToolPath from many segments.
+           Segments are copied into growable buffers whose capacity is doubled
+           when they are full, so that building a path takes linear time.
+
+        Args:
+            initial_capacity (int, optional): The number of poses the buffers can hold
+                                              before they are first enlarged.
+                                              Defaults to 1024.
+        """
+        self._positions = np.zeros((3, initial_capacity))
+        self._orientations = np.zeros((4, initial_capacity))
+        self._tool_activations = np.zeros(initial_capacity)
+        self._length = 0
+
+    def append(self, tool_path: ToolPath):
+        """Appends a ToolPath object to the end of the built path.
+
+        Args:
+            tool_path (ToolPath): Another ToolPath object.
+        """
+        self.append_poses(tool_path.positions, tool_path.orientations,
+                          tool_path.tool_activations)
+
+    def append_poses(self, positions: np.array, orientations: np.array = None,
+                     tool_activations: np.array = None):
+        """Appends poses to the end of the built path.
+
+        Args:
+            positions (np.array(3,n)): The positions of the poses
+            orientations (np.array(4,n), optional): The orientations of the poses.
+                                                     Defaults to None in which case
+                                                     the orientation [0,0,0,1] is assumed.
+            tool_activations (np.array(n), optional): The tool activations of the poses.
+                                                      Defaults to None in which case
+                                                      the tool is inactive.
+        """
+        number_of_poses = len(positions[0])
+        self._reserve(self._length+number_of_poses)
+        new_poses = slice(self._length, self._length+number_of_poses)
+
+        self._positions[:, new_poses] = positions
+        if orientations is None:
+            self._orientations[:3, new_poses] = 0
+            self._orientations[3, new_poses] = 1
+        else:
+            self._orientations[:, new_poses] = orientations
+        if tool_activations is None:
+            self._tool_activations[new_poses] = 0
+        else:
+            self._tool_activations[new_poses] = tool_activations
+        self._length += number_of_poses
+
+    def build(self):
+        """Builds a contiguous ToolPath from all appended poses.
+           The builder can be used further afterwards.
+
+        Returns:
+            ToolPath: The resulting ToolPath
+        """
+        tool_path = ToolPath(self._positions[:, :self._length].copy(),
+                             self._orientations[:, :self._length].copy())
+        tool_path.tool_activations = self._tool_activations[:self._length].copy()
+        return tool_path
+
+    def _reserve(self, capacity: int):
+        """Internal function enlarging the buffers to hold at least the given number of poses.
+
+        Args:
+            capacity (int): The required number of poses
+        """
+        current_capacity = len(self._tool_activations)
+        if capacity <= current_capacity:
+            return
+        new_capacity = max(capacity, 2*current_capacity)
+        for name, rows in (('_positions', 3), ('_orientations', 4)):
+            buffer = np.zeros((rows, new_capacity))
+            buffer[:, :self._length] = getattr(self, name)[:, :self._length]
+            setattr(self, name, buffer)
+        tool_activations = np.zeros(new_capacity)
+        tool_activations[:self._length] = self._tool_activations[:self._length]
+        self._tool_activations = tool_activations
+
+    def __len__(self):
+        return self._length
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+def quaternion_multiply(quaternion_1: np.array, quaternion_2: np.array):
+    """Multiplies quaternions using the pybullet convention [x,y,z,w].
+       The result describes the rotation quaternion_2 followed by quaternion_1,
+       equivalent to the orientation returned by p.multiplyTransforms.
+
+    Args:
+        quaternion_1 (np.array(4,n)): The left quaternions or a single quaternion
+        quaternion_2 (np.array(4,n)): The right quaternions or a single quaternion
+
+    Returns:
+        np.array(4,n): The quaternion products
+    """
+    x_1, y_1, z_1, w_1 = np.asarray(quaternion_1, dtype=float)
+    x_2, y_2, z_2, w_2 = np.asarray(quaternion_2, dtype=float)
+    return np.array([w_1*x_2+x_1*w_2+y_1*z_2-z_1*y_2,
+                     w_1*y_2-x_1*z_2+y_1*w_2+z_1*x_2,
+                     w_1*z_2+x_1*y_2-y_1*x_2+z_1*w_2,
+                     w_1*w_2-x_1*x_2-y_1*y_2-z_1*z_2])
+
+
+def quaternion_inverse(quaternion: np.array):
+    """Inverts quaternions.
+
+    Args:
+        quaternion (np.array(4,n)): The quaternions or a single quaternion
+
+    Returns:
+        np.array(4,n): The inverse quaternions
+    """
+    quaternion = np.asarray(quaternion, dtype=float)
+    conjugate = quaternion*np.array([-1, -1, -1, 1]).reshape((4,)+(1,)*(quaternion.ndim-1))
+    return conjugate/np.sum(quaternion**2, axis=0)
+
+
+def quaternion_rotate(quaternion: np.array, vectors: np.array):
+    """Rotates vectors by unit quaternions.
+
+    Args:
+        quaternion (np.array(4,n)): The quaternions or a single quaternion
+        vectors (np.array(3,n)): The vectors or a single vector
+
+    Returns:
+        np.array(3,n): The rotated vectors
+    """
+    quaternion = np.asarray(quaternion, dtype=float)
+    vectors = np.asarray(vectors, dtype=float)
+    if vectors.ndim < quaternion.ndim:
+        vectors = vectors[:, None]
+    imaginary = quaternion[:3]
+    twice_cross = 2*np.cross(imaginary, vectors, axis=0)
+    return vectors+quaternion[3]*twice_cross+np.cross(imaginary, twice_cross, axis=0)
+
+
+def quaternion_to_matrix(quaternion: np.array):
+    """Converts quaternions into rotation matrices.
+
+    Args:
+        quaternion (np.array(4,n)): The quaternions or a single quaternion
+
+    Returns:
+        np.array(n,3,3): The rotation matrices or a single 3x3 matrix
+    """
+    x, y, z, w = np.asarray(quaternion, dtype=float)
+    scale = 2/(x**2+y**2+z**2+w**2)
+    matrix = np.array([[1-scale*(y**2+z**2), scale*(x*y-z*w), scale*(x*z+y*w)],
+                       [scale*(x*y+z*w), 1-scale*(x**2+z**2), scale*(y*z-x*w)],
+                       [scale*(x*z-y*w), scale*(y*z+x*w), 1-scale*(x**2+y**2)]])
+    return np.moveaxis(matrix, [0, 1], [-2, -1])
+
+
+def quaternion_slerp(start_quaternion: np.array, end_quaternion: np.array,
+                     fraction: np.array):
+    """Spherically interpolates between unit quaternions along the shorter arc.
+
+    Args:
+        start_quaternion (np.array(4,n)): The start quaternions or a single quaternion
+        end_quaternion (np.array(4,n)): The end quaternions or a single quaternion
+        fraction (np.array(n)): The interpolation fractions between 0 and 1
+
+    Returns:
+        np.array(4,n): The interpolated unit quaternions
+    """
+    start_quaternion = np.asarray(start_quaternion, dtype=float)
+    end_quaternion = np.asarray(end_quaternion, dtype=float)
+    fraction = np.asarray(fraction, dtype=float)
+    single_quaternion = start_quaternion.ndim == 1 and end_quaternion.ndim == 1 and \
+        fraction.ndim == 0
+    start_quaternion = start_quaternion.reshape(4, -1)
+    end_quaternion = end_quaternion.reshape(4, -1)
+
+    dot_product = np.sum(start_quaternion*end_quaternion, axis=0)
+    end_quaternion = np.where(dot_product < 0, -end_quaternion, end_quaternion)
+    dot_product = np.clip(np.abs(dot_product), -1, 1)
+
+    angle = np.arccos(dot_product)
+    sin_angle = np.sin(angle)
+    # nearly identical quaternions are interpolated linearly to avoid a division by zero
+    linear = sin_angle < 1e-6
+    safe_sin_angle = np.where(linear, 1, sin_angle)
+    start_weight = np.where(linear, 1-fraction, np.sin((1-fraction)*angle)/safe_sin_angle)
+    end_weight = np.where(linear, fraction, np.sin(fraction*angle)/safe_sin_angle)
+
+    result = start_weight*start_quaternion+end_weight*end_quaternion
+    result = result/np.linalg.norm(result, axis=0)
+    return result[:, 0] if single_quaternion else result
+
+
+def multiply_transforms(position_1: np.array, orientation_1: np.array,
+                        position_2: np.array, orientation_2: np.array):
+    """Chains rigid transforms like p.multiplyTransforms for many poses at once.
+
+    Args:
+        position_1 (np.array(3,n)): The positions of the first transforms or a single position
+        orientation_1 (np.array(4,n)): The orientations of the first transforms
+                                       or a single orientation
+        position_2 (np.array(3,n)): The positions of the second transforms or a single position
+        orientation_2 (np.array(4,n)): The orientations of the second transforms
+                                       or a single orientation
+
+    Returns:
+        np.array(3,n): The positions of the chained transforms
+        np.array(4,n): The orientations of the chained transforms
+    """
+    position_1 = np.asarray(position_1, dtype=float)
+    rotated_position = quaternion_rotate(orientation_1, position_2)
+    if position_1.ndim < rotated_position.ndim:
+        position_1 = position_1[:, None]
+    return position_1+rotated_position, quaternion_multiply(orientation_1, orientation_2)
+
+
+def invert_transform(position: np.array, orientation: np.array):
+    """Inverts rigid transforms like p.invertTransform for many poses at once.
+
+    Args:
+        position (np.array(3,n)): The positions of the transforms
+        orientation (np.array(4,n)): The orientations of the transforms
+
+    Returns:
+        np.array(3,n): The positions of the inverse transforms
+        np.array(4,n): The orientations of the inverse transforms
+    """
+    inverse_orientation = quaternion_inverse(orientation)
+    return -quaternion_rotate(inverse_orientation, position), inverse_orientation
@@ -0,0 +1,187 @@
+import numpy as np
+import pybullet as p
+
+from pybullet_industrial.cutter import Cutter
+from pybullet_industrial.snapshot import load_arrays, save_arrays
+
+
+class HeightfieldWorkpiece:
+
+    def __init__(self, base_position: np.array, dimensions: np.array, resolution: float,
+                 color: list = [0.6, 0.6, 0.6, 1]):
+        """A 2.5D workpiece for milling simulations whose surface is described by a height map.
+           The heights are stored in a NumPy array and mirrored
+           by a pybullet heightfield collision shape which is updated in place.
+
+        Args:
+            base_position (np.array): The position of the lower left base corner of the workpiece
+            dimensions (np.array): The dimensions of the workpiece in [width,breath,height]
+            resolution (float): The distance between two neighbouring grid points
+            color (list, optional): The color of the workpiece. Defaults to [0.6, 0.6, 0.6, 1].
+        """
+        self.base_position = np.array(base_position, dtype=float)
+        self.resolution = resolution
+        self.stock_height = dimensions[2]
+        self.color = color
+
+        x_points = int(round(dimensions[0]/resolution))+1
+        y_points = int(round(dimensions[1]/resolution))+1
+        self.x = self.base_position[0]+np.arange(x_points)*resolution
+        self.y = self.base_position[1]+np.arange(y_points)*resolution
+
+        # The grid is surrounded by a rim of grid points at floor height.
+        # This fixes the height range of the pybullet heightfield
+        # which is only set during creation and keeps the body origin constant.
+        self._height_data = np.zeros((x_points+2, y_points+2))
+        self._height_data[1:-1, 1:-1] = self.stock_height
+        self.heights = self._height_data[1:-1, 1:-1]
+
+        self._collision_shape = p.createCollisionShape(
+            shapeType=p.GEOM_HEIGHTFIELD,
+            meshScale=[resolution, resolution, 1],
+            heightfieldData=self._height_data.ravel(order='F').tolist(),
+            numHeightfieldRows=x_points+2,
+            numHeightfieldColumns=y_points+2)
+
+        center_position = self.base_position + \
+            np.array([0.5*(x_points-1)*resolution,
+                      0.5*(y_points-1)*resolution,
+                      0.5*self.stock_height])
+        self.urdf = p.createMultiBody(baseMass=0,
+                                      baseCollisionShapeIndex=self._collision_shape,
+                                      basePosition=center_position)
+        p.changeVisualShape(self.urdf, -1, rgbaColor=color)
+
+    def get_height(self, positions: np.array):
+        """Returns the surface height of the workpiece at given positions
+
+        Args:
+            positions (np.array(2,n)): An array of x and y world coordinates
+
+        Returns:
+            np.array(n): The world z coordinate of the closest grid point.
+                         Positions outside of the workpiece return the base height.
+        """
+        x_index, y_index = self._closest_grid_points(positions)
+        inside_grid = ((x_index >= 0) & (x_index < len(self.x)) &
+                       (y_index >= 0) & (y_index < len(self.y)))
+        x_index = np.clip(x_index, 0, len(self.x)-1)
+        y_index = np.clip(y_index, 0, len(self.y)-1)
+        return self.base_position[2]+np.where(inside_grid,
+                                              self.heights[x_index, y_index], 0)
+
+    def remove(self, positions: np.array, cutter: Cutter, tolerance: float = None):
+        """Removes the material swept by a cutter whose tip moves linearly
+           between the given positions.
+           All segments are processed in vectorized chunks
+           and reduced onto the height array with a single minimum operation per chunk.
+
+        Args:
+            positions (np.array(3,n)): Subsequent positions of the cutter tip in world coordinates,
+                                       for example the positions of a ToolPath.
+                                       A single position removes the cutter footprint.
+            cutter (Cutter): The cutter geometry.
+                             A float is interpreted as the radius of a flat end mill.
+            tolerance (float, optional): The maximum height change per evaluated segment.
+                                         Defaults to None in which case
+                                         a tenth of the cutter radius is used.
+
+        Returns:
+            int: The number of grid points whose height was lowered
+        """
+        if not isinstance(cutter, Cutter):
+            cutter = Cutter(cutter)
+        starts, ends = cutter.split_path(positions, tolerance)
+        midpoints = 0.5*(starts+ends)
+
+        # every segment is at most one cutter radius long,
+        # a fixed stencil around its midpoint therefore covers the swept footprint
+        stencil_size = int(np.ceil(1.5*cutter.radius/self.resolution))+1
+        stencil = np.arange(-stencil_size, stencil_size+1)
+        x_offset, y_offset = np.meshgrid(stencil, stencil, indexing='ij')
+        x_offset = x_offset.ravel()
+        y_offset = y_offset.ravel()
+
+        previous_heights = self.heights.copy()
+        chunk_size = max(1, 2**20//len(x_offset))
+        for chunk_start in range(0, starts.shape[1], chunk_size):
+            chunk = slice(chunk_start, chunk_start+chunk_size)
+            x_center, y_center = self._closest_grid_points(midpoints[:2, chunk])
+            x_index = x_center[:, None]+x_offset[None, :]
+            y_index = y_center[:, None]+y_offset[None, :]
+            inside_grid = ((x_index >= 0) & (x_index < len(self.x)) &
+                           (y_index >= 0) & (y_index < len(self.y)))
+            x_index = np.clip(x_index, 0, len(self.x)-1)
+            y_index = np.clip(y_index, 0, len(self.y)-1)
+
+            envelope = cutter.lower_envelope(starts[:, chunk], ends[:, chunk],
+                                             self.x[x_index], self.y[y_index])
+            in_footprint = inside_grid & np.isfinite(envelope)
+            np.minimum.at(self.heights,
+                          (x_index[in_footprint], y_index[in_footprint]),
+                          np.maximum(envelope[in_footprint]-self.base_position[2], 0))
+
+        changed_points = np.count_nonzero(self.heights < previous_heights)
+        if changed_points:
+            self.update()
+        return changed_points
+
+    def update(self):
+        """Pushes the current height array into the pybullet heightfield collision shape.
+        """
+        p.createCollisionShape(shapeType=p.GEOM_HEIGHTFIELD,
+                               meshScale=[self.resolution, self.resolution, 1],
+                               heightfieldData=self._height_data.ravel(
+                                   order='F').tolist(),
+                               numHeightfieldRows=self._height_data.shape[0],
+                               numHeightfieldColumns=self._height_data.shape[1],
+                               replaceHeightfieldIndex=self._collision_shape)
+
+    def save(self, path: str, compressed: bool = True):
+        """Saves the height map of the workpiece to disk.
+
+        Args:
+            path (str): The path of the file
+            compressed (bool, optional): Whether to write a compressed file
+                                         or a memory mappable directory. Defaults to True.
+        """
+        save_arrays(path, {'heights': self.heights,
+                           'base position': self.base_position,
+                           'dimensions': np.array([self.x[-1]-self.x[0],
+                                                   self.y[-1]-self.y[0],
+                                                   self.stock_height]),
+                           'resolution': np.array(self.resolution),
+                           'color': np.array(self.color)}, compressed)
+
+    @classmethod
+    def load(cls, path: str):
+        """Creates a workpiece from a saved height map in the current physics client.
+
+        Args:
+            path (str): The path of the file
+
+        Returns:
+            HeightfieldWorkpiece: The loaded workpiece
+        """
+        arrays = load_arrays(path)
+        workpiece = cls(arrays['base position'], arrays['dimensions'],
+                        float(arrays['resolution']), arrays['color'].tolist())
+        workpiece.heights[:] = arrays['heights']
+        workpiece.update()
+        return workpiece
+
+    def _closest_grid_points(self, positions: np.array):
+        """Internal function returning the indices of the grid points closest to given positions
+
+        Args:
+            positions (np.array(2,n)): An array of x and y world coordinates
+
+        Returns:
+            np.array(n): The x indices of the closest grid points
+            np.array(n): The y indices of the closest grid points
+        """
+        x_index = np.rint(
+            (positions[0]-self.base_position[0])/self.resolution).astype(int)
+        y_index = np.rint(
+            (positions[1]-self.base_position[1])/self.resolution).astype(int)
+        return x_index, y_index
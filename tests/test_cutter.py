@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestCutter(unittest.TestCase):
+
+    def test_profiles(self):
+        """This test checks the lower surface of flat, ball and bull-nose cutters.
+        """
+        radial_distance = np.array([0, 0.05, 0.1, 0.2])
+        flat = pi.Cutter(0.1).profile(radial_distance)
+        ball = pi.Cutter(0.1, 0.1).profile(radial_distance)
+        bull_nose = pi.Cutter(0.1, 0.05).profile(radial_distance)
+
+        self.assertTrue(np.allclose(flat, [0, 0, 0, np.inf]))
+        self.assertTrue(np.allclose(
+            ball, [0, 0.1-np.sqrt(0.1**2-0.05**2), 0.1, np.inf]))
+        self.assertTrue(np.allclose(bull_nose, [0, 0, 0.05, np.inf]))
+
+    def test_swept_removal(self):
+        """This test checks that sweeping a cutter between two distant poses removes
+           the same material as densely stepping along the path.
+        """
+        p.connect(p.DIRECT)
+        cutter = pi.Cutter(0.05, 0.05)
+        swept_workpiece = pi.HeightfieldWorkpiece([0, 0, 0], [1, 1, 0.2], 0.01)
+        stepped_workpiece = pi.HeightfieldWorkpiece([2, 0, 0], [1, 1, 0.2], 0.01)
+
+        test_path = pi.linear_interpolation(
+            np.array([0.2, 0.3, 0.15]), np.array([0.8, 0.6, 0.15]), 2)
+        swept_workpiece.remove(test_path.positions, cutter)
+
+        test_path = pi.linear_interpolation(
+            np.array([2.2, 0.3, 0.15]), np.array([2.8, 0.6, 0.15]), 700)
+        for position in test_path.positions.transpose():
+            stepped_workpiece.remove(position, cutter)
+        p.disconnect()
+
+        self.assertTrue(np.allclose(swept_workpiece.heights,
+                                    stepped_workpiece.heights, atol=1e-4))
+
+    def test_contains(self):
+        """This test checks which points lie within the volume swept by a tilted cutter.
+        """
+        cutter = pi.Cutter(0.05, length=0.2)
+        positions = np.array([[0, 1], [0, 0], [0, 0]])
+        orientation = p.getQuaternionFromEuler([np.pi, 0, 0])
+        points = np.array([[0.5, 0.5, 0.5, 1.5],
+                           [0.0, 0.06, 0.0, 0.0],
+                           [-0.1, -0.1, 0.1, -0.1]])
+
+        inside = cutter.contains(points, positions, orientation)
+        self.assertTrue((inside == [True, False, False, False]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
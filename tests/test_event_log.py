@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_data
+import pybullet_industrial as pi
+
+dirname = os.path.dirname(__file__)
+parentDir = os.path.dirname(dirname)
+urdf_file = os.path.join(parentDir, 'examples',
+                         'robot_descriptions', 'milling_head.urdf')
+
+
+class TestEventLog(unittest.TestCase):
+
+    def test_buffered_writing(self):
+        """This test checks that events are written in chunks and read back memory mapped.
+        """
+        path = os.path.join(tempfile.mkdtemp(), 'events.log')
+        event_log = pi.EventLog(path, buffer_size=4, clock=lambda: 2.0)
+        event_log.record(pi.EXTRUSION_EVENT, np.arange(18).reshape(6, 3), np.arange(6),
+                         ['Plastic']*6, [1, 2, 3], [0, 0, 0, 1])
+        flushed_events = len(pi.read_event_log(path))
+        event_log.record(pi.REMOVAL_EVENT, [[0, 0, 1]], [7], ['MetalVoxel'],
+                         [1, 2, 3], [0, 0, 0, 1])
+        event_log.close()
+        events = pi.read_event_log(path)
+
+        self.assertEqual(flushed_events, 4)
+        self.assertEqual(len(events), 7)
+        self.assertTrue(np.array_equal(events['position'][5], [15, 16, 17]))
+        self.assertTrue(np.all(events['time'] == 2.0))
+        self.assertEqual(events['material'][6], b'MetalVoxel')
+        self.assertEqual(events['event'][6], pi.REMOVAL_EVENT)
+
+    def test_tool_events(self):
+        """This test checks that extruders and removers record their particles in an event log.
+        """
+        path = os.path.join(tempfile.mkdtemp(), 'events.log')
+        p.connect(p.DIRECT)
+        p.setAdditionalSearchPath(pybullet_data.getDataPath())
+        p.loadURDF("cube.urdf", [1.9, 0, 0.5], useFixedBase=True)
+        pi.particle_registry.clear()
+
+        start_orientation = p.getQuaternionFromEuler([0, 0, 0])
+        with pi.EventLog(path) as event_log:
+            extruder = pi.Extruder(urdf_file, [1.9, 0, 1.2], start_orientation,
+                                   {'maximum distance': 0.5, 'material': pi.Plastic,
+                                    'material properties': {'particle size': 0.01},
+                                    'event log': event_log})
+            for _ in range(20):
+                extruder.set_tool_pose([1.9, 0, 1.2], start_orientation)
+                p.stepSimulation()
+            extruded_particles = extruder.extrude()
+            p.removeBody(extruder.urdf)
+
+            remover = pi.Remover(urdf_file, [1.9, 0, 1.2], start_orientation,
+                                 {'maximum distance': 0.5, 'event log': event_log})
+            for _ in range(20):
+                remover.set_tool_pose([1.9, 0, 1.2], start_orientation)
+                p.stepSimulation()
+            removed_particles = remover.remove()
+        p.disconnect()
+        events = pi.read_event_log(path)
+
+        self.assertEqual(len(extruded_particles), 1)
+        self.assertEqual(removed_particles, extruded_particles)
+        self.assertTrue(np.array_equal(events['event'], [pi.EXTRUSION_EVENT,
+                                                         pi.REMOVAL_EVENT]))
+        self.assertTrue(np.all(events['body id'] == extruded_particles[0].particle_id))
+        self.assertTrue(np.allclose(events['position'],
+                                    extruded_particles[0].get_position()))
+        self.assertTrue(np.all(events['material'] == b'Plastic'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -180,6 +180,83 @@ class TestExtruder(unittest.TestCase):
         p.disconnect()
         self.assertTrue(material_distributed_uniform)
 
+    def test_distance_triggered_extrusion(self):
+        """This test checks that the extrusion distance decouples the number of particles
+           from the number of extrude calls and that the spacing rejects overlapping particles.
+        """
+        p.connect(p.DIRECT)
+        p.setAdditionalSearchPath(pybullet_data.getDataPath())
+        p.loadURDF("cube.urdf", [1.9, 0, 0.5], useFixedBase=True)
+        pi.particle_registry.clear()
+
+        start_orientation = p.getQuaternionFromEuler([0, 0, 0])
+        extruder_properties = {'maximum distance': 0.5,
+                               'material': pi.Plastic,
+                               'material properties': {'particle size': 0.01},
+                               'extrusion distance': 0.05}
+        extruder = pi.Extruder(
+            urdf_file2, [1.8, 0, 1.2], start_orientation, extruder_properties)
+
+        particle_list = []
+        tcp_positions = []
+        for x_position in np.linspace(1.7, 2.1, 41):
+            extruder.set_tool_pose([x_position, 0, 1.2], start_orientation)
+            for _ in range(20):
+                p.stepSimulation()
+            for _ in range(3):
+                particle_list.extend(extruder.extrude())
+            tcp_positions.append(extruder.get_tool_pose()[0])
+        particle_positions = np.array([particle.get_position()
+                                       for particle in particle_list])
+        travelled_distance = np.sum(np.linalg.norm(np.diff(tcp_positions, axis=0), axis=1))
+
+        extruder.reset_extrusion()
+        extruder.change_properties({'extrusion distance': 0, 'spacing': 0.02})
+        repeated_particles = []
+        for _ in range(10):
+            repeated_particles.extend(extruder.extrude())
+        p.disconnect()
+
+        particle_distances = np.linalg.norm(np.diff(particle_positions, axis=0), axis=1)
+        self.assertEqual(len(particle_list), int(travelled_distance/0.05)+1)
+        self.assertTrue(np.allclose(particle_distances, 0.05, atol=0.005))
+        self.assertTrue(len(repeated_particles) <= 1)
+
+    def test_flow_rate_extrusion(self):
+        """This test checks that the flow rate emits material according to the passed
+           simulation time regardless of how often extrude is called.
+        """
+        p.connect(p.DIRECT)
+        p.setAdditionalSearchPath(pybullet_data.getDataPath())
+        p.loadURDF("cube.urdf", [1.9, 0, 0.5], useFixedBase=True)
+        pi.particle_registry.clear()
+
+        start_orientation = p.getQuaternionFromEuler([0, 0, 0])
+        extruder_properties = {'maximum distance': 0.5,
+                               'material': pi.Plastic,
+                               'material properties': {'particle size': 0.01},
+                               'flow rate': 100}
+        extruder = pi.Extruder(
+            urdf_file2, [1.8, 0, 1.2], start_orientation, extruder_properties)
+        for _ in range(20):
+            p.stepSimulation()
+
+        extruder.extrude(time_step=0.01)
+        particle_list = []
+        for x_position in np.linspace(1.7, 2.1, 11):
+            extruder.set_tool_pose([x_position, 0, 1.2], start_orientation)
+            for _ in range(4):
+                p.stepSimulation()
+            particle_list.extend(extruder.extrude(time_step=4/240))
+        with self.assertRaises(ValueError):
+            extruder.extrude()
+        extruder.change_properties({'material': pi.Paint, 'spacing': 0.01})
+        with self.assertRaises(ValueError):
+            extruder.extrude(time_step=0.01)
+        p.disconnect()
+
+        self.assertEqual(len(particle_list), int(100*11*4/240))
+
 
 if __name__ == '__main__':
     p.connect(p.DIRECT)
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pybullet_industrial as pi
+
+program = """; test program
+G21 G90
+M83
+G0 X10 Y0 Z1 ; rapid move
+G1 X20 E1.5 F1200
+G2 X30 Y10 I0 J10 E2
+G3 X20 Y20 R10 E1
+G91
+G1 X-5 Y0 E0
+G90 G20 G1 X0 Y0
+G21 G18 G2 X5 Z6 R5
+M3
+G1 X1
+M5
+G1 X2 ( comment X99 )
+"""
+
+
+class TestGCode(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'program.gcode')
+        with open(self.path, 'w') as gcode_file:
+            gcode_file.write(program)
+
+    def read_path(self, **kwargs):
+        tool_path = pi.ToolPath(np.zeros((3, 0)))
+        chunks = list(pi.read_gcode(self.path, scale=1, **kwargs))
+        tool_path.extend(chunks)
+        return tool_path, chunks
+
+    def test_moves(self):
+        """This test checks the linear moves, arcs, modal states and tool activations.
+        """
+        tool_path, _ = self.read_path(arc_resolution=0.1)
+        positions = tool_path.positions
+
+        self.assertTrue(np.allclose(positions[:, :2].T, [[10, 0, 1], [20, 0, 1]]))
+        # clockwise arc around (20,10) from the bottom to the right side of the circle
+        first_arc = np.flatnonzero(np.isclose(np.linalg.norm(
+            positions[:2]-np.array([[20], [10]]), axis=0), 10))
+        self.assertTrue(np.allclose(positions[:, first_arc[-1]], [20, 20, 1]))
+        self.assertLess(positions[0, 2], 20)
+
+        relative_move = np.flatnonzero(np.all(np.isclose(positions.T, [15, 20, 1]), axis=1))
+        self.assertEqual(len(relative_move), 1)
+        self.assertFalse(tool_path.tool_activations[relative_move[0]])
+        self.assertTrue(np.all(tool_path.tool_activations[1:relative_move[0]]))
+        self.assertFalse(tool_path.tool_activations[0])
+        # the move in inches ends at the origin
+        self.assertTrue(np.allclose(positions[:, relative_move[0]+1], [0, 0, 1]))
+
+        arc_end = np.flatnonzero(np.all(np.isclose(positions.T, [5, 0, 6]), axis=1))[0]
+        xz_arc = positions[:, relative_move[0]+2:arc_end+1]
+        self.assertTrue(np.allclose(xz_arc[1], 0))
+        self.assertTrue(np.allclose(tool_path.tool_activations[-2:], [True, False]))
+
+    def test_chunks(self):
+        """This test checks that chunks are bounded and independent of the block size.
+        """
+        tool_path, chunks = self.read_path(chunk_size=7)
+        small_block_path, _ = self.read_path(chunk_size=7, block_size=8)
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+        self.assertTrue(np.allclose(tool_path.positions, small_block_path.positions))
+        self.assertTrue(np.array_equal(tool_path.tool_activations,
+                                       small_block_path.tool_activations))
+        self.assertTrue(np.allclose(chunks[0].orientations[:, 0], [0, 0, 0, 1]))
+
+    def test_coordinate_offsets_and_full_circles(self):
+        """This test checks that G92 shifts the following moves without moving the machine
+           and that arcs with only center words are full circles.
+        """
+        with open(self.path, 'w') as gcode_file:
+            gcode_file.write("G21 G90\nG1 X10\nG92 X0\nG1 X5\nG91\nG1 X1\n"
+                             "G90\nG1 X0 Y0\nG2 I5 J0\n")
+        for block_size in (1 << 20, 8):
+            tool_path, _ = self.read_path(arc_resolution=0.1, block_size=block_size)
+            positions = tool_path.positions
+            self.assertTrue(np.allclose(positions[:, :4].T, [[10, 0, 0], [15, 0, 0],
+                                                             [16, 0, 0], [10, 0, 0]]))
+            circle = positions[:, 4:]
+            self.assertGreater(circle.shape[1], 300)
+            self.assertTrue(np.allclose(np.linalg.norm(circle[:2]-np.array([[15], [0]]),
+                                                       axis=0), 5))
+            self.assertTrue(np.allclose(circle[:, -1], [10, 0, 0]))
+            self.assertGreater(np.max(circle[1]), 4.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestInterpolation(unittest.TestCase):
+
+    def assert_orientations_equal(self, orientations_1, orientations_2):
+        """Orientations are compared up to the sign of the quaternions.
+        """
+        self.assertTrue(np.allclose(np.abs(np.sum(np.asarray(orientations_1) *
+                                                  np.asarray(orientations_2), axis=0)), 1))
+
+    def test_linear_orientations(self):
+        """This test checks that linear paths rotate uniformly between two orientations.
+        """
+        start_orientation = p.getQuaternionFromEuler([0, 0, 0])
+        end_orientation = p.getQuaternionFromEuler([0, np.pi/2, 0])
+        test_path = pi.linear_interpolation([0, 0, 0], [1, 0, 0], 5,
+                                            start_orientation, end_orientation)
+        expected = np.array([p.getQuaternionFromEuler([0, angle, 0])
+                             for angle in np.linspace(0, np.pi/2, 5)]).T
+        self.assert_orientations_equal(test_path.orientations, expected)
+
+        constant_path = pi.circular_interpolation(np.array([0, 0, 0]), np.array([1, 1, 0]),
+                                                  1, 10, end_orientation=end_orientation)
+        self.assert_orientations_equal(constant_path.orientations,
+                                       np.repeat(np.array(end_orientation)[:, None], 10, axis=1))
+        default_path = pi.linear_interpolation([0, 0, 0], [1, 0, 0], 3)
+        self.assertTrue(np.allclose(default_path.orientations[3], 1))
+
+    def test_spline_key_frames(self):
+        """This test checks that spline paths pass through their orientation key frames.
+        """
+        points = np.array([[0, 1, 2], [0, 1, 0], [0, 0, 0]])
+        orientations = np.array([p.getQuaternionFromEuler([0, 0, angle])
+                                 for angle in [0, 1, -1]]).T
+        test_path = pi.spline_interpolation(points, 21, orientations)
+        self.assert_orientations_equal(test_path.orientations[:, [0, 10, 20]], orientations)
+        self.assert_orientations_equal(test_path.orientations[:, 5],
+                                       p.getQuaternionFromEuler([0, 0, 0.5]))
+
+    def test_batch_interpolation(self):
+        """This test checks that batch interpolation matches the joined single segments.
+        """
+        random = np.random.default_rng(0)
+        start_points = random.uniform(-1, 1, (3, 6))
+        end_points = random.uniform(-1, 1, (3, 6))
+        radii = np.linalg.norm(end_points-start_points, axis=0)
+        samples = np.arange(2, 8)
+        axes = np.array([0, 1, 2, 0, 1, 2])
+        clockwise = np.array([True, True, True, False, False, False])
+        orientations = np.array([p.getQuaternionFromEuler([0, 0, angle])
+                                 for angle in np.linspace(0, 1, 6)]).T
+
+        circular_path = pi.batch_circular_interpolation(start_points, end_points, radii,
+                                                        samples, axes, clockwise,
+                                                        end_orientations=orientations)
+        linear_path = pi.batch_linear_interpolation(start_points, end_points, samples,
+                                                    [0, 0, 0, 1], orientations)
+        single_circular_path = pi.ToolPath(np.zeros((3, 0)))
+        single_circular_path.extend(
+            [pi.circular_interpolation(start_points[:, i], end_points[:, i], radii[i],
+                                       samples[i], axes[i], clockwise[i],
+                                       end_orientation=orientations[:, i])
+             for i in range(6)])
+        single_linear_path = pi.ToolPath(np.zeros((3, 0)))
+        single_linear_path.extend(
+            [pi.linear_interpolation(start_points[:, i], end_points[:, i], samples[i],
+                                     [0, 0, 0, 1], orientations[:, i]) for i in range(6)])
+
+        self.assertEqual(len(circular_path), np.sum(samples))
+        self.assertTrue(np.allclose(circular_path.positions, single_circular_path.positions))
+        self.assert_orientations_equal(circular_path.orientations,
+                                       single_circular_path.orientations)
+        self.assertTrue(np.allclose(linear_path.positions, single_linear_path.positions))
+        self.assert_orientations_equal(linear_path.orientations,
+                                       single_linear_path.orientations)
+
+        with self.assertRaises(ValueError):
+            pi.batch_circular_interpolation(start_points, end_points, radii/4, samples)
+
+    def test_arc_interpolation(self):
+        """This test checks three point arcs in arbitrary planes and their batch evaluation.
+        """
+        rotation = np.array(p.getMatrixFromQuaternion(
+            p.getQuaternionFromEuler([0.4, -0.7, 1.2]))).reshape(3, 3)
+        center = np.array([0.5, -0.2, 1.0])
+        angles = np.array([0, 2.5, 4])
+        points = center[:, None]+0.3*rotation@np.array([np.cos(angles), np.sin(angles),
+                                                          np.zeros(3)])
+
+        test_path = pi.arc_interpolation(points[:, 0], points[:, 1], points[:, 2], 41)
+        self.assertTrue(np.allclose(np.linalg.norm(test_path.positions-center[:, None],
+                                                   axis=0), 0.3))
+        self.assertTrue(np.allclose(test_path.positions[:, [0, -1]], points[:, [0, 2]]))
+        self.assertTrue(np.allclose(test_path.positions[:, 25], points[:, 1]))
+        normal_offsets = (test_path.positions-center[:, None]).T@rotation[:, 2]
+        self.assertTrue(np.allclose(normal_offsets, 0))
+
+        batch_path = pi.batch_arc_interpolation(np.repeat(points[:, :1], 2, axis=1),
+                                                np.repeat(points[:, 1:2], 2, axis=1),
+                                                np.repeat(points[:, 2:], 2, axis=1), 41)
+        self.assertTrue(np.allclose(batch_path.positions[:, 41:], test_path.positions))
+
+        with self.assertRaises(ValueError):
+            pi.arc_interpolation([0, 0, 0], [1, 1, 1], [2, 2, 2], 10)
+
+    def test_helical_interpolation(self):
+        """This test checks that helices advance by their pitch around tilted axes.
+        """
+        normal = np.array([1.0, 1.0, 0])
+        test_path = pi.helical_interpolation([0, 0, 1], [0, 0, 0], normal, 4*np.pi, 81,
+                                             pitch=0.2)
+        axial_positions = test_path.positions.T@normal/np.linalg.norm(normal)
+        self.assertTrue(np.allclose(axial_positions, np.linspace(0, 0.4, 81)))
+        radial_offsets = test_path.positions - \
+            np.outer(normal/np.linalg.norm(normal), axial_positions)
+        self.assertTrue(np.allclose(np.linalg.norm(radial_offsets, axis=0), 1))
+        self.assertTrue(np.allclose(test_path.positions[:, 40], [0.1414214, 0.1414214, 1]))
+
+    def test_spline_path(self):
+        """This test checks the arc length parameterization of spline paths.
+        """
+        # the parametric speed along a half ellipse varies strongly
+        angles = np.linspace(0, np.pi, 9)
+        points = np.array([2*np.cos(angles), 0.5*np.sin(angles), np.zeros(9)])
+        orientations = np.array([p.getQuaternionFromEuler([0, 0, angle])
+                                 for angle in angles]).T
+        spline_path = pi.SplinePath(points, orientations)
+        self.assertAlmostEqual(spline_path.length, 4.2892, places=2)
+
+        test_path = spline_path.resample(0.01)
+        distances = np.linalg.norm(np.diff(test_path.positions, axis=1), axis=0)
+        self.assertLessEqual(np.max(distances), 0.01)
+        self.assertTrue(np.allclose(distances, distances[0], rtol=1e-3))
+        self.assertTrue(np.allclose(test_path.positions[:, [0, -1]], points[:, [0, -1]]))
+
+        timed_path = spline_path.sample_time(0.5, 0.1)
+        self.assertEqual(len(timed_path), 87)
+        self.assertTrue(np.allclose(timed_path.positions[:, -1], points[:, -1]))
+        # the chords are slightly shorter than the arc on the tightly curved ends
+        self.assertTrue(np.allclose(np.linalg.norm(np.diff(timed_path.positions[:, :-1],
+                                                           axis=1), axis=0), 0.05, rtol=1e-2))
+        with self.assertRaises(ValueError):
+            spline_path.sample_time(0, 0.1)
+        with self.assertRaises(ValueError):
+            spline_path.sample_time(0.5, -0.1)
+
+        interpolated_path = pi.spline_interpolation(points, 33, orientations)
+        self.assertTrue(np.allclose(interpolated_path.positions[:, ::4], points))
+        self.assert_orientations_equal(interpolated_path.orientations[:, ::4], orientations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,7 +68,164 @@ class TestMaterials(unittest.TestCase):
         output=np.allclose(painted_position, expected_position)
         p.disconnect()
         self.assertTrue(output)
-       
+
+    def test_paint_world_positions(self):
+        """This test checks that the world positions of paint particles on several moving
+           bodies are computed in one batch and match the single particle positions.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.5, 0.5, 0.05])
+        target_ids = [p.createMultiBody(0, box_shape, -1, [x, 0, 0]) for x in (0, 2)]
+        paint_particles = []
+        for x in [-0.4, -0.2, 0.2, 0.4, 1.6, 1.8, 2.2, 2.4]:
+            ray_cast_result = p.rayTest([x, 0.1, 1], [x, 0.1, -1])[0]
+            paint_particles.append(pi.Paint(ray_cast_result, {'particle size': 0.01}))
+
+        p.resetBasePositionAndOrientation(target_ids[0], [0, 1, 0],
+                                          p.getQuaternionFromEuler([0, 0, np.pi/2]))
+        p.resetBasePositionAndOrientation(target_ids[1], [2, 0, 1], [0, 0, 0, 1])
+        world_positions = pi.Paint.get_world_positions()
+        single_positions = [particle.get_position() for particle in paint_particles]
+        p.disconnect()
+
+        self.assertEqual(world_positions.shape, (8, 3))
+        self.assertTrue(np.allclose(world_positions, single_positions))
+        self.assertTrue(np.allclose(world_positions[0], [-0.1, 0.6, 0.05]))
+        self.assertTrue(np.allclose(world_positions[-1], [2.4, 0.1, 1.05]))
+
+    def test_unattached_paint(self):
+        """This test checks that paint particles which did not hit a body
+           keep their stored position while attached particles follow their body.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.5, 0.5, 0.05])
+        target_id = p.createMultiBody(0, box_shape, -1, [0, 0, 0])
+        pi.Paint(p.rayTest([0.2, 0.1, 1], [0.2, 0.1, -1])[0], {'particle size': 0.01})
+        unattached_particle = pi.Paint([-1, -1, 1.0, [3, 2, 1], [0, 0, 0]],
+                                       {'particle size': 0.01})
+
+        p.resetBasePositionAndOrientation(target_id, [0, 0, 1], [0, 0, 0, 1])
+        world_positions = pi.Paint.get_world_positions()
+        unattached_position = unattached_particle.get_position()
+        p.disconnect()
+
+        self.assertTrue(np.allclose(world_positions, [[0.2, 0.1, 1.05], [3, 2, 1]]))
+        self.assertTrue(np.allclose(unattached_position, [3, 2, 1]))
+
+    def test_particle_registry(self):
+        """This test checks that particles can be looked up and popped by their body id."""
+        physics_client = p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        spawned_particles = pi.spawn_material_block(
+            [0, 0, 0], [0.4, 0.4, 0.2], pi.MetalVoxel, {'particle size': 0.2})
+        registered_particles = [pi.particle_registry.get(particle.particle_id)
+                                for particle in spawned_particles]
+
+        spawned_particles[0].remove()
+        popped_particles = pi.particle_registry.pop(
+            [spawned_particles[1].particle_id, spawned_particles[1].particle_id, -1])
+        remaining_particles = len(pi.particle_registry)
+        p.disconnect()
+
+        self.assertEqual(registered_particles, spawned_particles)
+        self.assertEqual(popped_particles, [spawned_particles[1]])
+        self.assertEqual(remaining_particles, len(spawned_particles)-2)
+
+    def test_freezing(self):
+        """This test checks that frozen particles are merged into few bodies,
+           stay queryable and are thawed when a single particle is removed.
+        """
+        physics_client = p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        spawned_particles = pi.spawn_material_block(
+            [0, 0, 0], [1, 1, 0.4], pi.Plastic, {'particle size': 0.1})
+        bodies_before_freezing = p.getNumBodies()
+
+        frozen_bodies = pi.freeze_region([0, 0, 0], [1, 1, 0.2], pi.Plastic,
+                                         max_shapes=60)
+        bodies_after_freezing = p.getNumBodies()
+        ray_hit = p.rayTest([0.55, 0.55, -1], [0.55, 0.55, 1])[0]
+        frozen_positions = [particle.get_position() for particle in spawned_particles]
+
+        spawned_particles[0].remove()
+        bodies_after_removal = p.getNumBodies()
+        remaining_particles = len(pi.particle_registry)
+        p.disconnect()
+
+        self.assertEqual(len(frozen_bodies), 4)
+        self.assertEqual(bodies_after_freezing, bodies_before_freezing-200+4)
+        self.assertTrue(ray_hit[0] in frozen_bodies)
+        self.assertEqual(len(frozen_positions), 400)
+        self.assertEqual(bodies_after_removal, bodies_after_freezing-1+59)
+        self.assertEqual(remaining_particles, 399)
+
+    def test_collision_policy(self):
+        """This test checks that particles do not collide with bodies in the particle group
+           while other bodies rest on them and that policies are applied to existing bodies.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        p.setGravity(0, 0, -10)
+        pi.spawn_material_block([0, 0, 0], [0.4, 0.4, 0.1], pi.Plastic,
+                                {'particle size': 0.1})
+
+        box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.1, 0.1, 0.05])
+        regular_box = p.createMultiBody(1, box_shape, -1, [0.2, 0.2, 0.3])
+        particle_box = p.createMultiBody(1, box_shape, -1, [0.2, 0.2, 0.6])
+        p.setCollisionFilterGroupMask(particle_box, -1, pi.PARTICLE_COLLISION_GROUP,
+                                      ~pi.PARTICLE_COLLISION_GROUP)
+        p.setCollisionFilterPair(regular_box, particle_box, -1, -1, 0)
+        for _ in range(240):
+            p.stepSimulation()
+        resting_height = p.getBasePositionAndOrientation(regular_box)[0][2]
+        falling_height = p.getBasePositionAndOrientation(particle_box)[0][2]
+
+        pi.set_collision_policy(pi.Plastic, 0b100, ~0b100)
+        p.resetBasePositionAndOrientation(particle_box, [0.2, 0.2, 0.3], [0, 0, 0, 1])
+        p.resetBaseVelocity(particle_box, [0, 0, 0])
+        for _ in range(240):
+            p.stepSimulation()
+        policy_height = p.getBasePositionAndOrientation(particle_box)[0][2]
+        pi.set_collision_policy(pi.Plastic, pi.PARTICLE_COLLISION_GROUP,
+                                ~pi.PARTICLE_COLLISION_GROUP)
+        p.disconnect()
+
+        self.assertTrue(resting_height > 0.1)
+        self.assertTrue(falling_height < 0)
+        self.assertTrue(policy_height > 0.1)
+
+    def test_headless_particles(self):
+        """This test checks that particles in DIRECT clients are created without visuals
+           and that missing visuals can be created later.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        spawned_particles = pi.spawn_material_block(
+            [0, 0, 0], [0.4, 0.4, 0.2], pi.MetalVoxel, {'particle size': 0.1})
+        pi.freeze_particles(spawned_particles[:8])
+        headless_shapes = p.getVisualShapeData(spawned_particles[-1].particle_id)
+
+        number_of_visuals = pi.create_missing_visuals()
+        particle_shapes = p.getVisualShapeData(spawned_particles[-1].particle_id)
+        frozen_shapes = p.getVisualShapeData(spawned_particles[0].particle_id)
+        hit_particle = pi.particle_registry.get(
+            p.rayTest([0.35, 0.35, 1], [0.35, 0.35, -1])[0][0])
+
+        pi.particle_registry.visuals = True
+        visual_particle = pi.MetalVoxel([0, 0, 0, [1, 1, 1]], {'particle size': 0.1})
+        visual_particle_shapes = p.getVisualShapeData(visual_particle.particle_id)
+        pi.particle_registry.visuals = None
+        p.disconnect()
+
+        self.assertNotEqual(headless_shapes[0][7], (1, 0, 0, 1))
+        self.assertEqual(number_of_visuals, 32)
+        self.assertEqual(particle_shapes[0][7], (1, 0, 0, 1))
+        self.assertEqual(frozen_shapes[0][7], (1, 0, 0, 1))
+        self.assertTrue(np.allclose(hit_particle.get_position(), [0.35, 0.35, 0.15]))
+        self.assertEqual(visual_particle_shapes[0][7], (1, 0, 0, 1))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestPaintTexture(unittest.TestCase):
+
+    def test_droplet_accumulation(self):
+        """This test checks that droplets are accumulated in the grid of the hit link
+           and that the texture follows the grid.
+        """
+        p.connect(p.DIRECT)
+        pi.paint_textures.clear()
+        box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.5, 0.5, 0.05])
+        box_visual = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.5, 0.5, 0.05])
+        target_id = p.createMultiBody(0, box_shape, box_visual, [1, 0, 0],
+                                      p.getQuaternionFromEuler([0, 0, np.pi/2]))
+
+        droplets = []
+        for x in np.linspace(0.611, 1.391, 40):
+            ray_cast_result = p.rayTest([x, 0.2, 1], [x, 0.2, -1])[0]
+            droplets.append(pi.TexturePaint(ray_cast_result,
+                                            {'particle size': 0.01, 'color': [0, 0, 1, 1],
+                                             'resolution': 0.02}))
+        texture = pi.get_paint_texture(target_id)
+        droplet_position = droplets[0].get_position()
+        coverage = texture.get_coverage()
+        pixels = texture.get_pixels()
+        texture_updated = texture.update_texture(force=True)
+        droplets[0].remove()
+        droplets[0].set_material_properties({'color': [0, 1, 0, 1]})
+        p.disconnect()
+
+        self.assertEqual(len(pi.paint_textures), 1)
+        self.assertTrue(texture.thickness.shape >= (50, 50))
+        self.assertAlmostEqual(coverage, 40/texture.thickness.size)
+        self.assertTrue(np.allclose(droplet_position, [0.611, 0.2, 0.05]))
+        self.assertTrue(np.allclose(texture.thickness.sum()*0.02**2,
+                                    40*4/3*np.pi*0.01**3))
+        self.assertEqual(np.count_nonzero(np.all(pixels == [0, 0, 255], axis=2)), 40)
+        self.assertTrue(texture_updated)
+        self.assertEqual(droplets[0].properties['color'], [0, 1, 0, 1])
+        self.assertEqual(droplets[1].properties['color'], [0, 0, 1, 1])
+
+    def test_paint_analysis(self):
+        """This test checks the coverage and thickness metrics of paint particles on a link.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.5, 0.5, 0.05])
+        target_id = p.createMultiBody(0, box_shape, -1, [1, 0, 0])
+        for x in np.linspace(0.611, 1.391, 40):
+            for _ in range(2):
+                ray_cast_result = p.rayTest([x, 0.2, 1], [x, 0.2, -1])[0]
+                pi.Paint(ray_cast_result, {'particle size': 0.01})
+        p.resetBasePositionAndOrientation(target_id, [3, 2, 1],
+                                          p.getQuaternionFromEuler([0, 0, 1]))
+        statistics = pi.analyze_paint(target_id, resolution=0.02)
+        p.disconnect()
+
+        droplet_thickness = 4/3*np.pi*0.01**3/0.02**2
+        self.assertAlmostEqual(statistics['coverage'],
+                               40/statistics['heatmap'].size)
+        self.assertAlmostEqual(statistics['mean thickness'], 2*droplet_thickness)
+        self.assertAlmostEqual(statistics['thickness deviation'], 0)
+        self.assertEqual(np.count_nonzero(~statistics['uncovered']), 40)
+
+    def test_rotated_coverage(self):
+        """This test checks that the grid of a fully painted face
+           does not depend on the rotation of the link.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.4, 0.4, 0.05])
+        local_x, local_y = np.meshgrid(np.linspace(-0.39, 0.39, 40),
+                                       np.linspace(-0.39, 0.39, 40))
+        statistics = []
+        for angle in (0, np.pi/4):
+            target_id = p.createMultiBody(0, box_shape, -1, [3*angle, 0, 0],
+                                          p.getQuaternionFromEuler([0, 0, angle]))
+            world_x = 3*angle+np.cos(angle)*local_x.ravel()-np.sin(angle)*local_y.ravel()
+            world_y = np.sin(angle)*local_x.ravel()+np.cos(angle)*local_y.ravel()
+            ray_starts = np.column_stack([world_x, world_y, np.ones(world_x.size)])
+            ray_ends = ray_starts*[1, 1, -1]
+            for ray_cast_result in p.rayTestBatch(ray_starts.tolist(), ray_ends.tolist()):
+                pi.Paint(ray_cast_result, {'particle size': 0.01})
+            statistics.append(pi.analyze_paint(target_id, resolution=0.02))
+        p.disconnect()
+
+        for angle_statistics in statistics:
+            self.assertEqual(angle_statistics['heatmap'].shape, (40, 40))
+            self.assertAlmostEqual(angle_statistics['coverage'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
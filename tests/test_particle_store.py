@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestParticleStore(unittest.TestCase):
+
+    def test_growth_and_queries(self):
+        """This test checks that the store grows beyond its initial capacity
+           and that material queries return the correct slices.
+        """
+        store = pi.ParticleStore(capacity=2)
+        plastic_rows = store.add_batch(pi.Plastic, 5, {'particle size': 0.1,
+                                                       'position': [1, 2, 3]})
+        voxel_row = store.add(pi.MetalVoxel, {'particle id': 7,
+                                              'position': [4, 5, 6]})
+        store.remove_rows(plastic_rows[:2])
+
+        self.assertEqual(len(store), 4)
+        self.assertTrue((store.get_rows(pi.Plastic) == plastic_rows[2:]).all())
+        self.assertTrue(np.allclose(store.get_positions(pi.MetalVoxel), [[4, 5, 6]]))
+        self.assertEqual(store.get(7), store.get_particle(voxel_row))
+        self.assertEqual(len(store.get_positions(pi.Paint)), 0)
+
+    def test_particle_handles(self):
+        """This test checks that particle handles keep the particle interface
+           while storing their data in the particle registry.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        particle = pi.Plastic([0, 0, 0, [1, 2, 3]], {'particle size': 0.05})
+        particle.set_material_properties({'color': [0, 1, 0, 1]})
+        position = particle.get_position()
+        registered_particle = pi.particle_registry.get(particle.particle_id)
+        p.disconnect()
+
+        self.assertFalse(hasattr(particle, '__dict__'))
+        self.assertTrue(np.allclose(position, [1, 2, 3]))
+        self.assertEqual(particle.properties, {'particle size': 0.05,
+                                               'color': [0, 1, 0, 1]})
+        self.assertEqual(registered_particle, particle)
+        with self.assertRaises(KeyError):
+            particle.set_material_properties({'density': 1})
+
+    def test_spatial_queries(self):
+        """This test checks the radius and box queries of the spatial hash
+           against a brute force search and the bulk removal of a region.
+        """
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        pi.particle_registry.rebuild_spatial_index(0.1)
+        pi.spawn_material_block([0, 0, 0], [0.5, 0.5, 0.5], pi.MetalVoxel,
+                                {'particle size': 0.05})
+        positions = pi.particle_registry['position']
+
+        center = np.array([0.2, 0.3, 0.25])
+        radius_rows = pi.particle_registry.query_radius(center, 0.12)
+        expected_radius_rows = np.flatnonzero(
+            np.linalg.norm(positions-center, axis=1) <= 0.12)
+
+        box_min = np.array([0, 0, 0.3])
+        box_max = np.array([0.5, 0.5, 0.5])
+        box_rows = pi.particle_registry.query_box(box_min, box_max)
+        removed_particles = pi.particle_registry.remove_region(box_min, box_max)
+        remaining_box_rows = pi.particle_registry.query_box(box_min, box_max)
+        remaining_particles = len(pi.particle_registry)
+        p.disconnect()
+
+        self.assertEqual(sorted(radius_rows), sorted(expected_radius_rows))
+        self.assertEqual(len(box_rows), 10*10*4)
+        self.assertEqual(len(removed_particles), 10*10*4)
+        self.assertEqual(len(remaining_box_rows), 0)
+        self.assertEqual(remaining_particles, 10*10*6)
+
+
+if __name__ == '__main__':
+    unittest.main()
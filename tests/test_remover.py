@@ -61,7 +61,7 @@ class TestRemover(unittest.TestCase):
         for target_position, target_orientation, _ in test_path:
             extruder.set_tool_pose(target_position, target_orientation)
             particle = extruder.extrude()
-            current_particles.append(particle[0].particle_id)
+            current_particles.append(particle[0])
 
             for _ in range(30):
                 p.stepSimulation()
@@ -90,6 +90,50 @@ class TestRemover(unittest.TestCase):
         p.disconnect()
         self.assertTrue(current_particles == [])
 
+    def test_volume_removal(self):
+        """This test checks that the volume removal mode removes exactly the voxels
+           within the volume swept by the cutter between two tool poses.
+        """
+        physics_client = p.connect(p.DIRECT)
+        particle_size = 0.02
+        voxels = pi.spawn_material_block([0, 0, 0], [0.2, 0.2, 0.1],
+                                         pi.MetalVoxel, {'particle size': particle_size})
+        voxel_positions = np.array([voxel.get_position() for voxel in voxels])
+
+        cutter = pi.Cutter(0.03, length=0.1)
+        remover_properties = {'removal mode': 'volume',
+                              'cutter': cutter}
+        start_orientation = p.getQuaternionFromEuler([0, 0, 0])
+        remover = pi.Remover(
+            urdf_file2, [0.05, 0.1, 1.2], start_orientation, remover_properties)
+
+        start_position = np.array([0.05, 0.1, 0.055])
+        end_position = np.array([0.15, 0.1, 0.055])
+        fixture = p.createMultiBody(0, p.createCollisionShape(p.GEOM_SPHERE, radius=0.01),
+                                    basePosition=[0.1, 0.1, 0.15])
+        removed_voxels = []
+        tool_positions = []
+        for target_position in (start_position, end_position):
+            remover.set_tool_pose(target_position, start_orientation)
+            for _ in range(100):
+                p.stepSimulation()
+            removed_voxels.extend(remover.remove())
+            tool_positions.append(remover.get_tool_pose()[0])
+        # bodies which are not particles are never removed by volume
+        self.assertEqual(p.getNumBodies(), len(voxels)-len(removed_voxels)+2)
+        self.assertIsNotNone(p.getBodyInfo(fixture))
+        p.disconnect()
+
+        expected_voxels = [voxel.particle_id for voxel, inside in
+                           zip(voxels, cutter.contains(voxel_positions.transpose(),
+                                                       np.transpose(tool_positions)))
+                           if inside]
+
+        self.assertTrue(len(removed_voxels) > 0)
+        removed_ids = [voxel.particle_id for voxel in removed_voxels]
+        self.assertEqual(len(removed_ids), len(set(removed_ids)))
+        self.assertEqual(sorted(removed_ids), sorted(expected_voxels))
+
 
 if __name__ == '__main__':
     unittest.main()
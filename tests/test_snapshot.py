@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_particle_snapshots(self):
+        """This test checks that a snapshot and its deltas restore the particles
+           of a simulation in a new physics client.
+        """
+        snapshot_directory = tempfile.mkdtemp()
+        paths = [os.path.join(snapshot_directory, name)
+                 for name in ('base.npz', 'delta_1', 'delta_2.npz')]
+
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        spawned_particles = pi.spawn_material_block(
+            [0, 0, 0], [0.4, 0.4, 0.2], pi.MetalVoxel,
+            {'particle size': 0.1, 'color': [0, 1, 0, 1]})
+        state = pi.save_particles(paths[0])
+
+        pi.particle_registry.remove_region([0, 0, 0], [0.2, 0.4, 0.1])
+        pi.spawn_material_block([0, 0, 0.2], [0.2, 0.2, 0.1], pi.Plastic,
+                                {'particle size': 0.1})
+        state = pi.save_particles(paths[1], state, compressed=False)
+        pi.freeze_region([0, 0, 0], [1, 1, 1], pi.MetalVoxel)
+        pi.Plastic([0, 0, 0, [0.05, 0.05, 0.35]], {'particle size': 0.1})
+        pi.save_particles(paths[2], state)
+        expected_positions = pi.particle_registry.get_positions()
+        p.disconnect()
+
+        p.connect(p.DIRECT)
+        pi.particle_registry.clear()
+        loaded_particles = pi.load_particles(paths)
+        ray_hit = pi.particle_registry.get(
+            p.rayTest([0.35, 0.35, 1], [0.35, 0.35, -1])[0][0])
+        number_of_bodies = p.getNumBodies()
+        p.disconnect()
+
+        loaded_positions = np.array([particle.get_position()
+                                     for particle in loaded_particles])
+        self.assertEqual(len(loaded_particles), 32-8+4+1)
+        self.assertEqual(number_of_bodies, len(loaded_particles))
+        self.assertTrue(np.allclose(np.sort(loaded_positions, axis=0),
+                                    np.sort(expected_positions, axis=0)))
+        self.assertTrue(isinstance(ray_hit, pi.MetalVoxel))
+        self.assertEqual(ray_hit.properties['color'], [0, 1, 0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
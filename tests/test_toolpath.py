@@ -0,0 +1,207 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestToolPath(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.default_rng(0)
+        self.positions = random.uniform(-1, 1, (3, 50))
+        orientations = random.normal(size=(4, 50))
+        self.orientations = orientations/np.linalg.norm(orientations, axis=0)
+
+    def test_lazy_transforms(self):
+        """This test checks that chained lazy transforms match
+           the transforms applied one after another.
+        """
+        transforms = [('translate', np.array([0.1, -0.4, 0.3])),
+                      ('rotate', np.array(p.getQuaternionFromEuler([0.3, -0.2, 1.1]))),
+                      ('translate', np.array([1.0, 0.5, 0.0])),
+                      ('rotate', np.array(p.getQuaternionFromEuler([-1.2, 0.4, 0.1])))]
+        test_path = pi.ToolPath(self.positions.copy(), self.orientations.copy())
+
+        positions = self.positions.copy()
+        orientations = self.orientations.copy()
+        for transform, value in transforms:
+            getattr(test_path, transform)(value)
+            if transform == 'translate':
+                positions = positions+value[:, None]
+            else:
+                for i in range(50):
+                    positions[:, i] = p.multiplyTransforms(
+                        [0, 0, 0], value, positions[:, i], [0, 0, 0, 1])[0]
+                    orientations[:, i] = p.multiplyTransforms(
+                        [0, 0, 0], orientations[:, i], [0, 0, 0], value)[1]
+
+        start_position, start_orientation = test_path.get_start_pose()
+        self.assertTrue(np.allclose(start_position, positions[:, 0]))
+        self.assertTrue(np.allclose(np.abs(start_orientation @ orientations[:, 0]), 1))
+
+        for i, (position, orientation, _) in enumerate(test_path):
+            self.assertTrue(np.allclose(position, positions[:, i]))
+            self.assertTrue(np.allclose(np.abs(orientation @ orientations[:, i]), 1))
+
+        test_path.positions = self.positions.copy()
+        self.assertTrue(np.allclose(test_path.positions, self.positions))
+
+    def test_box_path(self):
+        """This test checks that a box path is placed at its center and orientation.
+        """
+        center = np.array([1.0, 2.0, 0.5])
+        orientation = p.getQuaternionFromEuler([0, 0, np.pi/2])
+        box_path = pi.build_box_path(center, [0.4, 0.2], 0.05, orientation, 200)
+        extent = np.ptp(box_path.positions, axis=1)
+        self.assertTrue(np.allclose(extent, [0.2, 0.4, 0], atol=1e-2))
+        self.assertTrue(np.allclose(np.mean(box_path.positions, axis=1), center,
+                                    atol=1e-2))
+
+    def test_builder(self):
+        """This test checks that the builder and extend produce the same path as append.
+        """
+        segments = [pi.ToolPath(self.positions[:, i:i+5], self.orientations[:, i:i+5],
+                                np.full(len(self.positions[0, i:i+5]), i % 2))
+                    for i in range(0, 50, 5)]
+        appended_path = pi.ToolPath(np.zeros((3, 0)))
+        for segment in segments:
+            appended_path.append(segment)
+        extended_path = pi.ToolPath(np.zeros((3, 0)))
+        extended_path.extend(segments)
+        builder = pi.ToolPathBuilder(initial_capacity=4)
+        for segment in segments:
+            builder.append(segment)
+        built_path = builder.build()
+
+        self.assertEqual(len(builder), 50)
+        for test_path in (extended_path, built_path):
+            self.assertTrue(np.array_equal(test_path.positions, appended_path.positions))
+            self.assertTrue(np.array_equal(test_path.orientations,
+                                           appended_path.orientations))
+            self.assertTrue(np.array_equal(test_path.tool_activations,
+                                           appended_path.tool_activations))
+
+        builder.append_poses(np.ones((3, 2)))
+        self.assertEqual(len(builder.build()), 52)
+        self.assertTrue(np.array_equal(builder.build().orientations[:, -1], [0, 0, 0, 1]))
+
+    def test_save_and_load(self):
+        """This test checks that saved paths are loaded memory mapped and sliced as views.
+        """
+        test_path = pi.ToolPath(self.positions.copy(), self.orientations.copy(),
+                                np.arange(50) % 3 == 0)
+        test_path.translate([0, 0, 1])
+        directory = tempfile.mkdtemp()
+        test_path.save(os.path.join(directory, 'path.bin'))
+        test_path.save(os.path.join(directory, 'path_32.bin'), single_precision=True)
+
+        loaded_path = pi.ToolPath.load(os.path.join(directory, 'path.bin'))
+        single_precision_path = pi.ToolPath.load(os.path.join(directory, 'path_32.bin'))
+        self.assertIsInstance(loaded_path.positions, np.memmap)
+        self.assertTrue(np.array_equal(loaded_path.positions, test_path.positions))
+        self.assertTrue(np.array_equal(loaded_path.orientations, test_path.orientations))
+        self.assertTrue(np.array_equal(loaded_path.tool_activations,
+                                       test_path.tool_activations))
+        self.assertEqual(single_precision_path.positions.dtype, np.float32)
+        self.assertTrue(np.allclose(single_precision_path.positions, test_path.positions,
+                                    atol=1e-6))
+
+        activation_levels = np.tile([0, 0.5, 2.0], 17)[:50]
+        level_path = pi.ToolPath(self.positions.copy(), tool_acivations=activation_levels)
+        level_path.save(os.path.join(directory, 'levels.bin'))
+        level_path.save(os.path.join(directory, 'levels_32.bin'), single_precision=True)
+        for file_name in ('levels.bin', 'levels_32.bin'):
+            loaded_levels = pi.ToolPath.load(os.path.join(directory, file_name))
+            self.assertTrue(np.array_equal(loaded_levels.tool_activations,
+                                           activation_levels))
+
+        window = loaded_path[10:20]
+        self.assertEqual(len(window), 10)
+        self.assertTrue(np.shares_memory(window.positions, loaded_path.positions))
+        window.rotate(p.getQuaternionFromEuler([0, 0, 1]))
+        self.assertTrue(np.allclose(window.get_start_pose()[0],
+                                    window.positions[:, 0]))
+        self.assertTrue(np.array_equal(loaded_path.positions, test_path.positions))
+        with self.assertRaises(TypeError):
+            loaded_path[0]
+
+    def test_resample(self):
+        """This test checks that resampling thins straight runs, keeps corners and
+           activation changes and stays within the tolerance on curves.
+        """
+        line = pi.linear_interpolation([0, 0, 0], [1, 0, 0], 1001)
+        line.tool_activations[500:] = 1
+        circle = pi.linear_interpolation([1, 0, 0], [1, 0, 0], 2)
+        angles = np.linspace(0, np.pi, 2001)
+        circle.positions = np.array([1+0.1*np.sin(angles), 0.1-0.1*np.cos(angles),
+                                     np.zeros(2001)])
+        circle.orientations = np.repeat([[0], [0], [0], [1.0]], 2001, axis=1)
+        circle.tool_activations = np.ones(2001)
+        test_path = pi.ToolPath(line.positions.copy(), line.orientations.copy(),
+                                line.tool_activations.copy())
+        test_path.append(circle)
+        original_positions = test_path.positions.copy()
+
+        test_path.resample(0.05, tolerance=1e-4)
+        self.assertLess(len(test_path), len(original_positions[0])/10)
+        self.assertTrue(np.allclose(test_path.positions[:, [0, -1]],
+                                    original_positions[:, [0, -1]]))
+        for position in ([0.5, 0, 0], [0.499, 0, 0]):
+            self.assertTrue(np.any(np.all(np.isclose(test_path.positions.T, position),
+                                          axis=1)))
+        self.assertEqual(np.count_nonzero(np.diff(test_path.tool_activations)), 1)
+        self.assertLessEqual(np.max(np.linalg.norm(np.diff(test_path.positions), axis=0)),
+                             0.05+1e-9)
+        # the chords of the half circle deviate at most by the tolerance
+        on_circle = test_path.positions[0] > 1
+        midpoints = 0.5*(test_path.positions[:, 1:]+test_path.positions[:, :-1])
+        deviation = 0.1-np.linalg.norm(midpoints[:2]-np.array([[1], [0.1]]), axis=0)
+        self.assertLess(np.max(deviation[on_circle[1:]]), 1e-4+1e-9)
+
+        rotating_path = pi.linear_interpolation([0, 0, 0], [0.01, 0, 0], 2)
+        rotating_path.orientations = np.array([[0, 0, 0, 1],
+                                               p.getQuaternionFromEuler([0, 0, 1])]).T
+        rotating_path.resample(0.05, max_angle=0.1)
+        self.assertEqual(len(rotating_path), 11)
+
+    def test_simplify(self):
+        """This test checks that simplification stays within the tolerances
+           and keeps activation changes.
+        """
+        random = np.random.default_rng(1)
+        positions = np.array([np.linspace(0, 1, 1000), np.zeros(1000), np.zeros(1000)])
+        positions[1] += random.uniform(-1e-4, 1e-4, 1000)
+        positions[1, 700] = 0.01
+        activations = np.zeros(1000)
+        activations[300:] = 1
+        test_path = pi.ToolPath(positions.copy(), tool_acivations=activations)
+
+        test_path.simplify(1e-3)
+        self.assertLessEqual(len(test_path), 10)
+        self.assertTrue(np.any(np.isclose(test_path.positions[1], 0.01)))
+        self.assertEqual(np.count_nonzero(np.diff(test_path.tool_activations)), 1)
+        kept_x = test_path.positions[0]
+        for i in range(1000):
+            segment = min(np.searchsorted(kept_x, positions[0, i], side='right'),
+                          len(kept_x)-1)
+            start = test_path.positions[:, segment-1]
+            end = test_path.positions[:, segment]
+            fraction = np.clip((positions[:, i]-start)@(end-start) /
+                               ((end-start)@(end-start)), 0, 1)
+            self.assertLess(np.linalg.norm(positions[:, i]-(start+fraction*(end-start))),
+                            1e-3+1e-9)
+
+        orientations = np.array([p.getQuaternionFromEuler([0, 0, angle])
+                                 for angle in np.linspace(0, 1, 1000)**2]).T
+        rotating_path = pi.ToolPath(positions.copy(), orientations)
+        rotating_path.simplify(1e-3, angle_tolerance=0.01)
+        position_only_path = pi.ToolPath(positions.copy(), orientations)
+        position_only_path.simplify(1e-3)
+        self.assertGreater(len(rotating_path), len(position_only_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
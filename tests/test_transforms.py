@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestTransforms(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.default_rng(0)
+        self.positions = random.uniform(-1, 1, (3, 20))
+        orientations = random.normal(size=(4, 20))
+        self.orientations = orientations/np.linalg.norm(orientations, axis=0)
+
+    def assert_quaternions_equal(self, quaternion_1, quaternion_2):
+        """Quaternions are compared up to their sign.
+        """
+        self.assertTrue(np.allclose(quaternion_1, quaternion_2) or
+                        np.allclose(quaternion_1, -np.asarray(quaternion_2)))
+
+    def test_multiply_transforms(self):
+        """This test checks the vectorized transforms against pybullet.
+        """
+        positions, orientations = pi.multiply_transforms(
+            self.positions, self.orientations,
+            self.positions[:, ::-1], self.orientations[:, ::-1])
+        inverse_positions, inverse_orientations = pi.invert_transform(
+            self.positions, self.orientations)
+        for i in range(20):
+            position, orientation = p.multiplyTransforms(
+                self.positions[:, i], self.orientations[:, i],
+                self.positions[:, 19-i], self.orientations[:, 19-i])
+            self.assertTrue(np.allclose(positions[:, i], position))
+            self.assert_quaternions_equal(orientations[:, i], orientation)
+
+            inverse_position, inverse_orientation = p.invertTransform(
+                self.positions[:, i], self.orientations[:, i])
+            self.assertTrue(np.allclose(inverse_positions[:, i], inverse_position))
+            self.assert_quaternions_equal(inverse_orientations[:, i], inverse_orientation)
+
+        position, orientation = pi.multiply_transforms(
+            self.positions[:, 0], self.orientations[:, 0],
+            self.positions[:, 1], self.orientations[:, 1])
+        self.assertEqual(position.shape, (3,))
+        self.assertEqual(orientation.shape, (4,))
+
+        # a single transform is chained with every transform of a batch
+        for batch_size in (3, 20):
+            batch = slice(0, batch_size)
+            left_positions, left_orientations = pi.multiply_transforms(
+                self.positions[:, 0], self.orientations[:, 0],
+                self.positions[:, batch], self.orientations[:, batch])
+            right_positions, right_orientations = pi.multiply_transforms(
+                self.positions[:, batch], self.orientations[:, batch],
+                self.positions[:, 0], self.orientations[:, 0])
+            for i in range(batch_size):
+                position, orientation = p.multiplyTransforms(
+                    self.positions[:, 0], self.orientations[:, 0],
+                    self.positions[:, i], self.orientations[:, i])
+                self.assertTrue(np.allclose(left_positions[:, i], position))
+                self.assert_quaternions_equal(left_orientations[:, i], orientation)
+                position, orientation = p.multiplyTransforms(
+                    self.positions[:, i], self.orientations[:, i],
+                    self.positions[:, 0], self.orientations[:, 0])
+                self.assertTrue(np.allclose(right_positions[:, i], position))
+                self.assert_quaternions_equal(right_orientations[:, i], orientation)
+
+    def test_rotation_matrix(self):
+        """This test checks rotation matrices and vector rotation against pybullet.
+        """
+        matrices = pi.quaternion_to_matrix(self.orientations)
+        rotated = pi.quaternion_rotate(self.orientations, self.positions)
+        for i in range(20):
+            matrix = np.array(p.getMatrixFromQuaternion(
+                self.orientations[:, i])).reshape(3, 3)
+            self.assertTrue(np.allclose(matrices[i], matrix))
+            self.assertTrue(np.allclose(rotated[:, i], matrix@self.positions[:, i]))
+        self.assertEqual(pi.quaternion_to_matrix(self.orientations[:, 0]).shape, (3, 3))
+
+    def test_slerp(self):
+        """This test checks that slerp interpolates along the shorter arc.
+        """
+        start = np.array(p.getQuaternionFromEuler([0, 0, 0]))
+        end = -np.array(p.getQuaternionFromEuler([0, 0, np.pi/2]))
+        halfway = pi.quaternion_slerp(start, end, 0.5)
+        self.assert_quaternions_equal(halfway, p.getQuaternionFromEuler([0, 0, np.pi/4]))
+        path = pi.quaternion_slerp(start, end, np.linspace(0, 1, 5))
+        self.assertEqual(path.shape, (4, 5))
+        self.assert_quaternions_equal(path[:, -1], end)
+
+    def test_toolpath_rotation(self):
+        """This test checks the vectorized tool path rotation against pybullet.
+        """
+        test_path = pi.ToolPath(self.positions.copy(), self.orientations.copy())
+        rotation = p.getQuaternionFromEuler([0.3, -0.2, 1.1])
+        test_path.rotate(rotation)
+        for i in range(20):
+            position, orientation = p.multiplyTransforms(
+                [0, 0, 0], rotation, self.positions[:, i], [0, 0, 0, 1])
+            orientation = p.multiplyTransforms(
+                [0, 0, 0], self.orientations[:, i], [0, 0, 0], rotation)[1]
+            self.assertTrue(np.allclose(test_path.positions[:, i], position))
+            self.assert_quaternions_equal(test_path.orientations[:, i], orientation)
+
+
+if __name__ == '__main__':
+    unittest.main()
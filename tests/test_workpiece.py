@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pybullet as p
+import pybullet_industrial as pi
+
+
+class TestHeightfieldWorkpiece(unittest.TestCase):
+
+    def test_pocket_removal(self):
+        """This test checks that removing material along a path only lowers the heights
+           inside the cutter footprint and that the pybullet heightfield follows the array.
+        """
+        p.connect(p.DIRECT)
+        workpiece = pi.HeightfieldWorkpiece([0, 0, 0], [1, 1, 0.2], 0.02)
+
+        test_path = pi.linear_interpolation(
+            np.array([0.3, 0.5, 0.15]), np.array([0.7, 0.5, 0.15]), 20)
+        changed_points = workpiece.remove(test_path.positions, 0.05)
+
+        cut_height = workpiece.get_height(np.array([[0.5], [0.5]]))
+        untouched_height = workpiece.get_height(np.array([[0.5], [0.7]]))
+        ray_hit = p.rayTest([0.5, 0.5, 1], [0.5, 0.5, -1])[0]
+        p.disconnect()
+
+        self.assertTrue(changed_points > 0)
+        self.assertTrue(np.allclose(cut_height, 0.15))
+        self.assertTrue(np.allclose(untouched_height, 0.2))
+        self.assertAlmostEqual(ray_hit[3][2], 0.15, places=5)
+
+    def test_removal_below_floor(self):
+        """This test checks that the workpiece can not be cut below its base.
+        """
+        p.connect(p.DIRECT)
+        workpiece = pi.HeightfieldWorkpiece([1, 1, 0.5], [0.2, 0.2, 0.1], 0.01)
+        workpiece.remove(np.array([1.1, 1.1, 0.2]), 0.03)
+        floor_height = workpiece.get_height(np.array([[1.1], [1.1]]))
+        p.disconnect()
+        self.assertTrue(np.allclose(floor_height, 0.5))
+
+    def test_save_and_load(self):
+        """This test checks that a saved workpiece is restored in a new physics client.
+        """
+        path = os.path.join(tempfile.mkdtemp(), 'workpiece.npz')
+        p.connect(p.DIRECT)
+        workpiece = pi.HeightfieldWorkpiece([0, 0, 0], [1, 1, 0.2], 0.02)
+        workpiece.remove(np.array([0.5, 0.5, 0.1]), 0.1)
+        workpiece.save(path)
+        p.disconnect()
+
+        p.connect(p.DIRECT)
+        loaded_workpiece = pi.HeightfieldWorkpiece.load(path)
+        ray_hit = p.rayTest([0.5, 0.5, 1], [0.5, 0.5, -1])[0]
+        p.disconnect()
+
+        self.assertTrue(np.array_equal(loaded_workpiece.heights, workpiece.heights))
+        self.assertAlmostEqual(ray_hit[3][2], 0.1, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()